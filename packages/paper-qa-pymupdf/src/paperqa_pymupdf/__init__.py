@@ -1,7 +1,13 @@
-from .reader import BLOCK_TEXT_INDEX, parse_pdf_to_pages, setup_pymupdf_python_logging
+from .reader import (
+    BLOCK_TEXT_INDEX,
+    iter_pdf_pages,
+    parse_pdf_to_pages,
+    setup_pymupdf_python_logging,
+)
 
 __all__ = [
     "BLOCK_TEXT_INDEX",
+    "iter_pdf_pages",
     "parse_pdf_to_pages",
     "setup_pymupdf_python_logging",
 ]
@@ -1,5 +1,6 @@
 import json
 import os
+from collections.abc import Iterator
 from itertools import starmap
 from multiprocessing import Pool
 
@@ -124,6 +125,106 @@ def _parse_single_page_screenshot(
     return page_num, text, media
 
 
+def iter_pdf_pages(
+    path: str | os.PathLike,
+    page_size_limit: int | None = None,
+    page_range: int | tuple[int, int] | None = None,
+    use_block_parsing: bool = False,
+    parse_media: bool = True,
+    full_page: bool = False,
+    image_cluster_tolerance: float | tuple[float, float] = 25,
+    dpi: float | None = None,
+    **_,
+) -> Iterator[tuple[str, str | tuple[str, list[ParsedMedia]]]]:
+    """Parse a PDF page by page, yielding each page once it's parsed.
+
+    Only the page being parsed is held in memory, so pages can be chunked
+    (e.g. by `paperqa.readers.iter_chunk_pages`) while the PDF is still parsing.
+    Arguments are the same as `parse_pdf_to_pages`, except full-page screenshots
+    are taken one page at a time.
+
+    Yields:
+        Two-tuples of one-indexed page number and the page's contents.
+    """
+    x_tol, y_tol = (
+        image_cluster_tolerance
+        if isinstance(image_cluster_tolerance, tuple)
+        else (image_cluster_tolerance, image_cluster_tolerance)
+    )
+
+    with pymupdf.open(path) as file:
+        for i in resolve_page_range(page_range, file.page_count):
+            if full_page and parse_media:  # Capture the entire page as one image
+                _page_num, text, media = _parse_single_page_screenshot(
+                    str(path), i, dpi, page_size_limit, use_block_parsing
+                )
+                yield str(i + 1), (text, media)
+                continue
+            page, text = _extract_page_text(
+                file, i, path, use_block_parsing, page_size_limit
+            )
+            if not parse_media:
+                yield str(i + 1), text
+                continue
+            media = []
+            # Capture drawings/figures
+            for box_i, box in enumerate(
+                page.cluster_drawings(
+                    drawings=page.get_drawings(),
+                    x_tolerance=x_tol,
+                    y_tolerance=y_tol,
+                )
+            ):
+                pix = page.get_pixmap(clip=box, dpi=dpi)
+                media_metadata = {"bbox": tuple(box), "type": "drawing"} | {
+                    a: getattr(pix, a) for a in PYMUPDF_PIXMAP_ATTRS
+                }
+                media_metadata["info_hashable"] = json.dumps(
+                    media_metadata, sort_keys=True
+                )
+                # Add page number after info_hashable so differing pages
+                # don't break the cache key
+                media_metadata["page_num"] = i + 1
+                media.append(
+                    ParsedMedia(index=box_i, data=pix.tobytes(), info=media_metadata)
+                )
+
+            # Capture tables
+            for table_i, table in enumerate(page.find_tables()):
+                pix = page.get_pixmap(clip=table.bbox, dpi=dpi)
+                media_metadata = {
+                    "bbox": tuple(table.bbox),
+                    "type": "table",
+                } | {a: getattr(pix, a) for a in PYMUPDF_PIXMAP_ATTRS}
+                media_metadata["info_hashable"] = json.dumps(
+                    media_metadata, sort_keys=True
+                )
+                # Add page number after info_hashable so differing pages
+                # don't break the cache key
+                media_metadata["page_num"] = i + 1
+                media.append(
+                    ParsedMedia(
+                        index=table_i,
+                        data=pix.tobytes(),
+                        # On 9/14/2025, a `pymupdf.table.Table.to_markdown` stripped call returned:
+                        # '|Col1|Col2|Col3|Col4|Col5|Col6|Col7|Col8|\n|---|---|---|---|---|---|---|---|\n||\x02\x03<br>|\x04\x05\x06\x07\x08<br> <br>|\x07\x08\x08<br>\n\x08<br>\x0e\x0f<br>\x17\x18\x18\x08<br>|\x02<br>\x0c\x10<br>\x11<br>\x19\r\x02\x1a\x00\x01\x02\x03<br>|\x11<br>\x12\x06\x05<br>\x0e\x13\x14\x15<br>\x04\x05\x06\x07<br>|\x05\x08<br>\x0c\x10<br>\x12\x06\x05<br>\x0e\x16\x13<br>|\x05\x08<br>\x0c\x10<br>\x12\x06\x05<br>\x0e\x16\x13<br>|'  # noqa: E501, W505
+                        # This garbage led to `asyncpg==0.30.0` with a PostgreSQL 15 DB throwing:
+                        # > asyncpg.exceptions.CharacterNotInRepertoireError:
+                        # > invalid byte sequence for encoding "UTF8": 0x00
+                        # On 12/30/2025 with pymupdf==1.26.7, a `pymupdf.table.Table.to_markdown` call on
+                        # https://arxiv.org/pdf/1711.07566's page 3's Figure 2a's mesh and pixels example
+                        # outputs an orphaned low surrogate (U+DC3C), which is interpreted as an
+                        # incomplete UTF-16 surrogate pair downstream and causes:
+                        # > UnicodeEncodeError: 'utf-8' codec can't encode character '\udc3c'
+                        # > in position 46888: surrogates not allowed
+                        # Thus, the extracted markdown is cleaned
+                        text=(clean_invalid_unicode(table.to_markdown().strip())),
+                        info=media_metadata,
+                    )
+                )
+            yield str(i + 1), (text, media)
+
+
 def parse_pdf_to_pages(
     path: str | os.PathLike,
     page_size_limit: int | None = None,
@@ -186,77 +287,21 @@ def parse_pdf_to_pages(
             total_length += len(text)
             count_media += len(media)
     else:
-        with pymupdf.open(path) as file:
-            for i in resolve_page_range(page_range, file.page_count):
-                page, text = _extract_page_text(
-                    file, i, path, use_block_parsing, page_size_limit
-                )
-                media = []
-                if parse_media:
-                    # Capture drawings/figures
-                    for box_i, box in enumerate(
-                        page.cluster_drawings(
-                            drawings=page.get_drawings(),
-                            x_tolerance=x_tol,
-                            y_tolerance=y_tol,
-                        )
-                    ):
-                        pix = page.get_pixmap(clip=box, dpi=dpi)
-                        media_metadata = {"bbox": tuple(box), "type": "drawing"} | {
-                            a: getattr(pix, a) for a in PYMUPDF_PIXMAP_ATTRS
-                        }
-                        media_metadata["info_hashable"] = json.dumps(
-                            media_metadata, sort_keys=True
-                        )
-                        # Add page number after info_hashable so differing pages
-                        # don't break the cache key
-                        media_metadata["page_num"] = i + 1
-                        media.append(
-                            ParsedMedia(
-                                index=box_i, data=pix.tobytes(), info=media_metadata
-                            )
-                        )
-
-                    # Capture tables
-                    for table_i, table in enumerate(page.find_tables()):
-                        pix = page.get_pixmap(clip=table.bbox, dpi=dpi)
-                        media_metadata = {
-                            "bbox": tuple(table.bbox),
-                            "type": "table",
-                        } | {a: getattr(pix, a) for a in PYMUPDF_PIXMAP_ATTRS}
-                        media_metadata["info_hashable"] = json.dumps(
-                            media_metadata, sort_keys=True
-                        )
-                        # Add page number after info_hashable so differing pages
-                        # don't break the cache key
-                        media_metadata["page_num"] = i + 1
-                        media.append(
-                            ParsedMedia(
-                                index=table_i,
-                                data=pix.tobytes(),
-                                # On 9/14/2025, a `pymupdf.table.Table.to_markdown` stripped call returned:
-                                # '|Col1|Col2|Col3|Col4|Col5|Col6|Col7|Col8|\n|---|---|---|---|---|---|---|---|\n||\x02\x03<br>|\x04\x05\x06\x07\x08<br> <br>|\x07\x08\x08<br>\n\x08<br>\x0e\x0f<br>\x17\x18\x18\x08<br>|\x02<br>\x0c\x10<br>\x11<br>\x19\r\x02\x1a\x00\x01\x02\x03<br>|\x11<br>\x12\x06\x05<br>\x0e\x13\x14\x15<br>\x04\x05\x06\x07<br>|\x05\x08<br>\x0c\x10<br>\x12\x06\x05<br>\x0e\x16\x13<br>|\x05\x08<br>\x0c\x10<br>\x12\x06\x05<br>\x0e\x16\x13<br>|'  # noqa: E501, W505
-                                # This garbage led to `asyncpg==0.30.0` with a PostgreSQL 15 DB throwing:
-                                # > asyncpg.exceptions.CharacterNotInRepertoireError:
-                                # > invalid byte sequence for encoding "UTF8": 0x00
-                                # On 12/30/2025 with pymupdf==1.26.7, a `pymupdf.table.Table.to_markdown` call on
-                                # https://arxiv.org/pdf/1711.07566's page 3's Figure 2a's mesh and pixels example
-                                # outputs an orphaned low surrogate (U+DC3C), which is interpreted as an
-                                # incomplete UTF-16 surrogate pair downstream and causes:
-                                # > UnicodeEncodeError: 'utf-8' codec can't encode character '\udc3c'
-                                # > in position 46888: surrogates not allowed
-                                # Thus, the extracted markdown is cleaned
-                                text=(
-                                    clean_invalid_unicode(table.to_markdown().strip())
-                                ),
-                                info=media_metadata,
-                            )
-                        )
-                    content[str(i + 1)] = text, media
-                else:
-                    content[str(i + 1)] = text
-                total_length += len(text)
-                count_media += len(media)
+        for page_key, page_contents in iter_pdf_pages(
+            path,
+            page_size_limit=page_size_limit,
+            page_range=page_range,
+            use_block_parsing=use_block_parsing,
+            parse_media=parse_media,
+            image_cluster_tolerance=image_cluster_tolerance,
+            dpi=dpi,
+        ):
+            content[page_key] = page_contents
+            if isinstance(page_contents, str):
+                total_length += len(page_contents)
+            else:
+                total_length += len(page_contents[0])
+                count_media += len(page_contents[1])
 
     multimodal_string = f"|multimodal|dpi={dpi}" + (
         "|mode=full-page"
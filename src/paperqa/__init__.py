@@ -14,6 +14,8 @@ from paperqa.agents import ask
 from paperqa.agents.main import agent_query
 from paperqa.docs import Docs, PQASession
 from paperqa.llms import (
+    IVFVectorStore,
+    MemmapVectorStore,
     NumpyVectorStore,
     QdrantVectorStore,
     VectorStore,
@@ -29,10 +31,12 @@ __all__ = [
     "Docs",
     "EmbeddingModel",
     "HybridEmbeddingModel",
+    "IVFVectorStore",
     "LLMModel",
     "LLMResult",
     "LiteLLMEmbeddingModel",
     "LiteLLMModel",
+    "MemmapVectorStore",
     "NumpyVectorStore",
     "PQASession",
     "QdrantVectorStore",
@@ -0,0 +1,269 @@
+import asyncio
+import atexit
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable, Sequence
+from pathlib import Path
+from typing import Generic, TypeVar
+
+from paperqa.utils import hexdigest
+
+T = TypeVar("T")
+
+
+class LRUCache(Generic[T]):
+    """Thread-safe least recently used cache, optionally persisted to SQLite.
+
+    When a path is set, every entry is also written to a SQLite file there,
+    so entries evicted from memory (or from a previous run) are still hits.
+    Persisted entries are evicted least recently used first
+    once there are more than max_persisted of them.
+    """
+
+    # Fraction of max_persisted to evict beyond the overflow, so eviction
+    # (a recount and a delete) runs once per many writes instead of every write
+    EVICTION_SLACK = 0.1
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        path: str | os.PathLike | None = None,
+        max_persisted: int | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.max_persisted = max_persisted
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, T] = OrderedDict()
+        self._lock = threading.RLock()
+        self._path: Path | None = None
+        self._connection: sqlite3.Connection | None = None
+        # Persisted row count, lazily counted and then tracked across writes
+        self._num_persisted: int | None = None
+        self.path = path
+
+    @property
+    def path(self) -> Path | None:
+        """Optional SQLite file persisting the entries."""
+        return self._path
+
+    @path.setter
+    def path(self, path: str | os.PathLike | None) -> None:
+        with self._lock:
+            self.close()
+            self._path = None if path is None else Path(path)
+
+    def close(self) -> None:
+        """Close any SQLite connection, which is reopened on the next use."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            self._num_persisted = None
+
+    def _get_connection(self) -> sqlite3.Connection | None:
+        if self._path is None:
+            return None
+        if self._connection is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            # Calls are serialized by our lock, so cross-thread use is safe
+            self._connection = sqlite3.connect(self._path, check_same_thread=False)
+            # Write-ahead logging lets multiple processes share one file
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            with self._connection:
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY,"
+                    " value BLOB NOT NULL, accessed REAL NOT NULL)"
+                )
+                self._connection.execute(
+                    "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)"
+                )
+        return self._connection
+
+    @staticmethod
+    def _persisted_key(key: Hashable) -> str:
+        return hexdigest(repr(key))
+
+    def _set_in_memory(self, key: Hashable, value: T) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key: Hashable) -> T | None:
+        """Get the value for the key, or None upon a miss."""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[Hashable]) -> list[T | None]:
+        """Get the values for the keys, with None for each miss."""
+        with self._lock:
+            values: list[T | None] = [None] * len(keys)
+            to_load: dict[str, list[int]] = {}
+            for i, key in enumerate(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    values[i] = self._entries[key]
+                else:
+                    to_load.setdefault(self._persisted_key(key), []).append(i)
+            for persisted_key, value in self._load_persisted(list(to_load)).items():
+                for i in to_load[persisted_key]:
+                    values[i] = value
+                    self._set_in_memory(keys[i], value)
+            n_misses = sum(v is None for v in values)
+            self.hits += len(values) - n_misses
+            self.misses += n_misses
+            return values
+
+    async def aget(self, key: Hashable) -> T | None:
+        """Async version of get, doing any SQLite I/O off the event loop."""
+        return (await self.aget_many([key]))[0]
+
+    async def aget_many(self, keys: Sequence[Hashable]) -> list[T | None]:
+        """Async version of get_many, doing any SQLite I/O off the event loop."""
+        if self._path is None:
+            return self.get_many(keys)
+        return await asyncio.to_thread(self.get_many, keys)
+
+    def _load_persisted(self, persisted_keys: list[str]) -> dict[str, T]:
+        """Load persisted values for the keys present, marking them as used."""
+        connection = self._get_connection()
+        if not persisted_keys or connection is None:
+            return {}
+        loaded: dict[str, T] = {}
+        with connection:
+            # Chunk to stay under SQLite's limit on bound parameters
+            for start in range(0, len(persisted_keys), 500):
+                chunk = persisted_keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = connection.execute(
+                    f"SELECT key, value FROM cache WHERE key IN ({placeholders})",  # noqa: S608
+                    chunk,
+                ).fetchall()
+                connection.execute(
+                    f"UPDATE cache SET accessed = ? WHERE key IN ({placeholders})",  # noqa: S608
+                    [time.time(), *chunk],
+                )
+                loaded.update(
+                    (key, pickle.loads(blob)) for key, blob in rows  # noqa: S301
+                )
+        return loaded
+
+    def set(self, key: Hashable, value: T) -> None:
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Iterable[tuple[Hashable, T]]) -> None:
+        """Set many values, persisting them in one transaction."""
+        with self._lock:
+            items = list(items)
+            for key, value in items:
+                self._set_in_memory(key, value)
+            if not items or (connection := self._get_connection()) is None:
+                return
+            accessed = time.time()
+            rows = {
+                self._persisted_key(key): pickle.dumps(value) for key, value in items
+            }
+            with connection:
+                if self.max_persisted is not None:
+                    num_new = len(rows) - self._count_persisted(connection, list(rows))
+                connection.executemany(
+                    "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                    ((key, blob, accessed) for key, blob in rows.items()),
+                )
+                if self.max_persisted is not None:
+                    self._num_persisted = (
+                        self._count_persisted(connection)
+                        if self._num_persisted is None
+                        else self._num_persisted + num_new
+                    )
+                    if self._num_persisted > self.max_persisted:
+                        self._evict(connection, self.max_persisted)
+
+    @staticmethod
+    def _count_persisted(
+        connection: sqlite3.Connection, persisted_keys: list[str] | None = None
+    ) -> int:
+        """Count the persisted rows, or only those with the keys if specified."""
+        if persisted_keys is None:
+            return connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        count = 0
+        # Chunk to stay under SQLite's limit on bound parameters
+        for start in range(0, len(persisted_keys), 500):
+            chunk = persisted_keys[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            count += connection.execute(
+                f"SELECT COUNT(*) FROM cache WHERE key IN ({placeholders})",  # noqa: S608
+                chunk,
+            ).fetchone()[0]
+        return count
+
+    def _evict(self, connection: sqlite3.Connection, max_persisted: int) -> None:
+        """Evict the least recently used rows, leaving some room for new ones."""
+        # Recount, as other processes sharing the file may have written to it
+        num_persisted = self._count_persisted(connection)
+        target = max_persisted - int(max_persisted * self.EVICTION_SLACK)
+        if num_persisted > max_persisted:
+            # The index on accessed makes this a scan of only the evicted rows
+            connection.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache"
+                " ORDER BY accessed ASC LIMIT ?)",
+                (num_persisted - target,),
+            )
+            num_persisted = target
+        self._num_persisted = num_persisted
+
+    async def aset(self, key: Hashable, value: T) -> None:
+        """Async version of set, doing any SQLite I/O off the event loop."""
+        await self.aset_many([(key, value)])
+
+    async def aset_many(self, items: Iterable[tuple[Hashable, T]]) -> None:
+        """Async version of set_many, doing any SQLite I/O off the event loop."""
+        if self._path is None:
+            self.set_many(items)
+        else:
+            await asyncio.to_thread(self.set_many, list(items))
+
+    def clear(self) -> None:
+        """Clear the in-memory entries and counters, leaving any persisted entries."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_PERSISTENT_CACHES: dict[tuple[Path, int | None, int], LRUCache] = {}
+_PERSISTENT_CACHES_LOCK = threading.Lock()
+
+
+def get_persistent_cache(
+    path: str | os.PathLike, max_persisted: int | None = None, maxsize: int = 1024
+) -> LRUCache:
+    """Get the one cache persisted at the path, so its connection is reused.
+
+    Memoized caches are closed when the interpreter exits.
+    """
+    key = (Path(path).resolve(), max_persisted, maxsize)
+    with _PERSISTENT_CACHES_LOCK:
+        if key not in _PERSISTENT_CACHES:
+            _PERSISTENT_CACHES[key] = LRUCache(
+                maxsize=maxsize, path=path, max_persisted=max_persisted
+            )
+        return _PERSISTENT_CACHES[key]
+
+
+@atexit.register
+def close_persistent_caches() -> None:
+    """Close and forget every memoized persistent cache."""
+    with _PERSISTENT_CACHES_LOCK:
+        for cache in _PERSISTENT_CACHES.values():
+            cache.close()
+        _PERSISTENT_CACHES.clear()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import json
 import logging
 import os
@@ -8,7 +9,7 @@ import re
 import tempfile
 import urllib.request
 import warnings
-from collections.abc import Callable, Sequence
+from collections.abc import Callable, Iterable, Sequence
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
@@ -21,16 +22,23 @@ from lmi.types import set_llm_session_ids
 from lmi.utils import gather_with_concurrency
 from pydantic import BaseModel, ConfigDict, Field
 
+from paperqa.caches import LRUCache
 from paperqa.clients import DEFAULT_CLIENTS, DocMetadataClient
 from paperqa.core import llm_parse_json, map_fxn_summary
 from paperqa.llms import (
     NumpyVectorStore,
     VectorStore,
+    embed_texts,
 )
 from paperqa.prompts import CANNOT_ANSWER_PHRASE, EMPTY_CONTEXTS
-from paperqa.readers import read_doc
-from paperqa.settings import MaybeSettings, get_settings
-from paperqa.types import Doc, DocDetails, DocKey, PQASession, Text
+from paperqa.readers import (
+    derive_parsed_text,
+    is_text_file,
+    read_doc,
+    read_doc_stream,
+)
+from paperqa.settings import MaybeSettings, Settings, get_settings
+from paperqa.types import Doc, DocDetails, DocKey, ParsedText, PQASession, Text
 from paperqa.utils import (
     citation_to_docname,
     maybe_is_html,
@@ -42,6 +50,173 @@ from paperqa.utils import (
 logger = logging.getLogger(__name__)
 
 
+async def _call_citation_llm(
+    llm_model: LLMModel,
+    prompt: str,
+    content_hash: str | None,
+    cache: LRUCache[str] | None = None,
+) -> str:
+    """Get the LLM's response to a citation prompt about a document, maybe cached."""
+    key = (content_hash, llm_model.name, prompt)
+    if cache is not None and (text := await cache.aget(key)) is not None:
+        return text
+    result = await llm_model.call_single(messages=[Message(content=prompt)])
+    text = cast("str", result.text)
+    if cache is not None:
+        await cache.aset(key, text)
+    return text
+
+
+# Number of chunks to embed per request while streaming a document's chunks
+STREAM_EMBEDDING_BATCH_SIZE = 32
+
+
+async def _embed_chunks(
+    embedding_model: EmbeddingModel,
+    texts: Sequence[Text],
+    settings: Settings,
+    with_enrichment: bool = False,
+) -> None:
+    """Embed the texts in place, via the settings' embedding cache and batching."""
+    for t, t_embedding in zip(
+        texts,
+        await embed_texts(
+            embedding_model,
+            texts=await asyncio.gather(
+                *(t.get_embeddable_text(with_enrichment) for t in texts)
+            ),
+            cache=settings.get_embedding_cache(),
+            batch_token_limit=settings.embedding_batch_token_limit,
+            concurrency=settings.embedding_concurrency,
+        ),
+        strict=True,
+    ):
+        t.embedding = t_embedding
+
+
+# Number of leading chunks checked to look like text, before adding a document
+NUM_CHECKED_CHUNKS = 5
+
+
+def _check_is_text_document(
+    texts: Sequence[Text], path: str | os.PathLike, disable_doc_valid_check: bool
+) -> None:
+    """Loosely check the document's leading chunks were loaded as text."""
+    if (
+        not texts
+        or len(texts[0].text) < 10  # noqa: PLR2004
+        or (
+            not disable_doc_valid_check
+            and (
+                (
+                    # Quick sanity check the text is not just some terse one-page
+                    # 404 message interspersed with newlines. Check here
+                    # instead of maybe_is_text because a 404 HTML page is text
+                    sum(len(t.text.replace("\n", "")) for t in texts[:2])
+                    < 20  # noqa: PLR2004
+                )
+                # Use the first few text chunks to avoid potential issues with
+                # title page parsing in the first chunk
+                or not maybe_is_text(
+                    "".join(t.text for t in texts[:NUM_CHECKED_CHUNKS])
+                )
+            )
+        )
+    ):
+        raise ValueError(
+            f"This does not look like a text document: {path}. Pass disable_check"
+            " to ignore this error."
+        )
+
+
+async def _read_and_embed_chunks(
+    path: str | os.PathLike,
+    doc: Doc,
+    settings: Settings,
+    embedding_model: EmbeddingModel | None,
+    parse_limit: contextlib.AbstractAsyncContextManager,
+    embedding_limit: contextlib.AbstractAsyncContextManager,
+    **read_kwargs,
+) -> list[Text]:
+    """Read a document's chunks as it's parsed, embedding batches of them meanwhile.
+
+    Embedding starts only once the leading chunks pass the text document check,
+    so documents failing it make no embedding calls.
+
+    Args:
+        path: Path of the document to read.
+        doc: The document the chunks are from.
+        settings: Settings for embedding.
+        embedding_model: Optional embedding model, if unspecified the settings'
+            model is used unless deferring embedding.
+        parse_limit: Limit to hold while reading, but not while finishing embedding.
+        embedding_limit: Limit to hold while embedding each batch.
+        read_kwargs: Keyword arguments for `read_doc_stream`.
+    """
+    if not settings.parsing.defer_embedding and not embedding_model:
+        embedding_model = settings.get_embedding_model()
+
+    async def embed(model: EmbeddingModel, batch: list[Text]) -> None:
+        async with embedding_limit:
+            await _embed_chunks(model, batch, settings)
+
+    texts: list[Text] = []
+    embeddings: list[asyncio.Task[None]] = []
+    num_embedding = 0
+
+    def embed_batches(final: bool = False) -> None:
+        nonlocal num_embedding
+        while embedding_model and (
+            len(texts) - num_embedding >= STREAM_EMBEDDING_BATCH_SIZE
+            or (final and num_embedding < len(texts))
+        ):
+            batch = texts[num_embedding : num_embedding + STREAM_EMBEDDING_BATCH_SIZE]
+            embeddings.append(asyncio.create_task(embed(embedding_model, batch)))
+            num_embedding += len(batch)
+
+    try:
+        async with parse_limit:
+            async for text in read_doc_stream(path, doc, **read_kwargs):
+                texts.append(text)
+                if len(texts) == NUM_CHECKED_CHUNKS:
+                    _check_is_text_document(
+                        texts, path, settings.parsing.disable_doc_valid_check
+                    )
+                if len(texts) >= NUM_CHECKED_CHUNKS:
+                    embed_batches()
+        if len(texts) < NUM_CHECKED_CHUNKS:
+            _check_is_text_document(
+                texts, path, settings.parsing.disable_doc_valid_check
+            )
+        embed_batches(final=True)
+        await asyncio.gather(*embeddings)
+    finally:
+        for task in embeddings:  # Upon failure, don't leave batches embedding
+            task.cancel()
+    return texts
+
+
+class _AddStageLimits:
+    """Concurrency limits on the stages of adding documents, shared across them."""
+
+    def __init__(
+        self,
+        parse: int | None = None,
+        llm: int | None = None,
+        metadata: int | None = None,
+        embedding: int | None = None,
+    ) -> None:
+        def limit(value: int | None) -> contextlib.AbstractAsyncContextManager:
+            return (
+                contextlib.nullcontext() if value is None else asyncio.Semaphore(value)
+            )
+
+        self.parse = limit(parse)
+        self.llm = limit(llm)
+        self.metadata = limit(metadata)
+        self.embedding = limit(embedding)
+
+
 class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
     """A collection of documents to be used for answering questions."""
 
@@ -53,7 +228,13 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
     docnames: set[str] = Field(default_factory=set)
     texts_index: VectorStore = Field(default_factory=NumpyVectorStore)
     name: str = Field(default="default", description="Name of this docs collection")
-    deleted_dockeys: set[DocKey] = Field(default_factory=set)
+    deleted_dockeys: set[DocKey] = Field(
+        default_factory=set,
+        description=(
+            "Keys of deleted documents whose texts remain in a texts index that"
+            " doesn't support removing texts, to filter out of retrieved texts."
+        ),
+    )
 
     def __eq__(self, other) -> bool:
         if (
@@ -153,7 +334,7 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
                 embedding_model=embedding_model,
             )
 
-    async def aadd(  # noqa: PLR0912
+    async def aadd(
         self,
         path: str | os.PathLike,
         citation: str | None = None,
@@ -168,49 +349,153 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
         **kwargs,
     ) -> str | None:
         """Add a document to the collection."""
+        return await self._aadd(
+            path,
+            citation=citation,
+            docname=docname,
+            dockey=dockey,
+            title=title,
+            doi=doi,
+            authors=authors,
+            settings=settings,
+            llm_model=llm_model,
+            embedding_model=embedding_model,
+            **kwargs,
+        )
+
+    async def _aadd(  # noqa: PLR0912
+        self,
+        path: str | os.PathLike,
+        citation: str | None = None,
+        docname: str | None = None,
+        dockey: DocKey | None = None,
+        title: str | None = None,
+        doi: str | None = None,
+        authors: list[str] | None = None,
+        settings: MaybeSettings = None,
+        llm_model: LLMModel | None = None,
+        embedding_model: EmbeddingModel | None = None,
+        *,
+        content_hash: str | None = None,
+        stage_limits: _AddStageLimits | None = None,
+        **kwargs,
+    ) -> str | None:
+        """Add a document to the collection, maybe limiting each stage's concurrency.
+
+        Args:
+            path: Path of the document to add.
+            citation: Optional citation, otherwise inferred by the LLM.
+            docname: Optional document name, otherwise derived from the citation.
+            dockey: Optional document key, otherwise the content hash.
+            title: Optional title for the metadata lookup.
+            doi: Optional DOI for the metadata lookup.
+            authors: Optional authors for the metadata lookup.
+            settings: Optional settings.
+            llm_model: Optional LLM for citation inference.
+            embedding_model: Optional embedding model for the document's texts.
+            content_hash: Optional precomputed md5sum of the path.
+            stage_limits: Optional limits shared with concurrent additions, on
+                parsing, LLM calls, metadata lookups, and embedding.
+            kwargs: Keyword arguments for the metadata lookup.
+        """
         all_settings = get_settings(settings)
         parse_config = all_settings.parsing
-        content_hash = md5sum(path)
+        if stage_limits is None:
+            stage_limits = _AddStageLimits()
+        if content_hash is None:
+            content_hash = md5sum(path)
         dockey_is_content_hash = False
         if dockey is None:
             dockey = content_hash
             dockey_is_content_hash = True
         if llm_model is None:
             llm_model = all_settings.get_llm()
+        citation_cache = parse_config.get_citation_cache()
+        parse_media, enrich_media = parse_config.should_parse_and_enrich_media
+        # Streamed documents (text files, and PDFs when streaming their pages)
+        # are chunked (and embedded) as they're parsed,
+        # instead of being parsed whole up front
+        iter_pdf_pages = (
+            parse_config.get_pdf_page_iterator() if str(path).endswith(".pdf") else None
+        )
+        stream_kwargs: dict[str, Any] | None = None
+        if iter_pdf_pages is not None or is_text_file(path):
+            stream_kwargs = {
+                "iter_pdf_pages": iter_pdf_pages,
+                "page_size_limit": parse_config.page_size_limit,
+                "parse_media": parse_media,
+                **parse_config.reader_config,
+            }
+        parsed_text: ParsedText | None = None
+        if stream_kwargs is None:
+            # Parse once, for both peeking and chunking
+            async with stage_limits.parse:
+                parsed_text = await read_doc(
+                    path,
+                    Doc(  # Fake doc
+                        docname="",
+                        citation="",
+                        dockey=dockey,
+                        content_hash=content_hash,
+                    ),
+                    parsed_text_only=True,
+                    page_size_limit=parse_config.page_size_limit,
+                    parse_media=parse_media,
+                    parse_pdf=parse_config.parse_pdf,
+                    parsed_text_cache=parse_config.get_parsed_text_cache(),
+                    parse_executor=parse_config.get_parse_executor(),
+                    **parse_config.reader_config,
+                )
         if citation is None:
             # Peek first chunk
-            texts = await read_doc(
-                path,
-                Doc(  # Fake doc
-                    docname="", citation="", dockey=dockey, content_hash=content_hash
-                ),
-                page_size_limit=parse_config.page_size_limit,
-                parse_media=False,  # Peeking is text only
-                # We only use the first chunk, so let's peek just enough pages for that.
-                # Usually pages 1 - 2 give that,
-                # but in the event page 2 is blank (true for some PDFs),
-                # we read pages 1 - 3 to be safe
-                page_range=(1, 3),
-                parse_pdf=parse_config.parse_pdf,
-                **parse_config.reader_config,
+            fake_doc = Doc(
+                docname="", citation="", dockey=dockey, content_hash=content_hash
             )
+            if parsed_text is None:
+                # Streaming, so parse only as much as the first chunk needs, text only
+                async with (
+                    stage_limits.parse,
+                    contextlib.aclosing(
+                        read_doc_stream(
+                            path,
+                            fake_doc,
+                            **{**(stream_kwargs or {}), "parse_media": False},
+                        )
+                    ) as chunks,
+                ):
+                    texts = [await anext(chunks)]
+            else:
+                texts = await read_doc(
+                    path,
+                    fake_doc,
+                    # We only use the first chunk, so let's chunk just enough pages
+                    # for that, text only. Usually pages 1 - 2 give that,
+                    # but in the event page 2 is blank (true for some PDFs),
+                    # we chunk pages 1 - 3 to be safe
+                    parsed_text=(
+                        derive_parsed_text(
+                            parsed_text, page_range=(1, 3), parse_media=False
+                        )
+                        or parsed_text
+                    ),
+                    **parse_config.reader_config,
+                )
             if not texts or not texts[0].text.strip():
                 raise ValueError(f"Could not read document {path}. Is it empty?")
-            result = await llm_model.call_single(
-                messages=[
-                    Message(
-                        content=parse_config.citation_prompt.format(text=texts[0].text)
-                    ),
-                ],
-            )
-            citation = cast("str", result.text)
+            async with stage_limits.llm:
+                citation = await _call_citation_llm(
+                    llm_model,
+                    parse_config.citation_prompt.format(text=texts[0].text),
+                    content_hash,
+                    citation_cache,
+                )
             if (
                 len(citation) < 3  # noqa: PLR2004
                 or "Unknown" in citation
                 or "insufficient" in citation
             ):
                 citation = f"Unknown, {os.path.basename(path)}, {datetime.now().year}"
-            del result, texts  # Ensure we don't reuse
+            del texts  # Ensure we don't reuse
 
         doc = Doc(
             docname=self._get_unique_name(
@@ -224,23 +509,20 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
         # try to extract DOI / title from the citation
         if (doi is title is None) and parse_config.use_doc_details:
             # TODO: specify a JSON schema here when many LLM providers support this
-            messages = [
-                Message(
-                    content=parse_config.structured_citation_prompt.format(
-                        citation=citation
-                    ),
-                ),
-            ]
-            result = await llm_model.call_single(
-                messages=messages,
-            )
+            async with stage_limits.llm:
+                structured_citation = await _call_citation_llm(
+                    llm_model,
+                    parse_config.structured_citation_prompt.format(citation=citation),
+                    content_hash,
+                    citation_cache,
+                )
             # This code below tries to isolate the JSON
             # based on observed messages from LLMs
             # it does so by isolating the content between
             # the first { and last } in the response.
             # Since the anticipated structure should  not be nested,
             # we don't have to worry about nested curlies.
-            clean_text = cast("str", result.text).split("{", 1)[-1].split("}", 1)[0]
+            clean_text = structured_citation.split("{", 1)[-1].split("}", 1)[0]
             clean_text = "{" + clean_text + "}"
             try:
                 citation_json = json.loads(clean_text)
@@ -290,52 +572,140 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
                     if d not in {"dockey", "doc_id"}
                 }
 
-            doc = await metadata_client.upgrade_doc_to_doc_details(
-                doc, **(query_kwargs | kwargs)
-            )
+            async with stage_limits.metadata:
+                doc = await metadata_client.upgrade_doc_to_doc_details(
+                    doc, **(query_kwargs | kwargs)
+                )
 
-        parse_media, enrich_media = parse_config.should_parse_and_enrich_media
-        multimodal_kwargs: dict[str, Any] = {"parse_media": parse_media}
-        if enrich_media:
-            multimodal_kwargs["multimodal_enricher"] = (
-                all_settings.make_media_enricher()
+        if stream_kwargs is not None:
+            # Chunks are embedded as they're read, so first skip documents
+            # aadd_texts would skip, before making any embedding calls
+            if doc.dockey in self.docs or not self._matches_doc_filters(
+                doc, all_settings
+            ):
+                return None
+            texts = await _read_and_embed_chunks(
+                path,
+                doc,
+                all_settings,
+                embedding_model,
+                stage_limits.parse,
+                stage_limits.embedding,
+                **stream_kwargs,
             )
-        texts, metadata = await read_doc(
-            path,
-            doc,
-            page_size_limit=parse_config.page_size_limit,
-            parse_pdf=parse_config.parse_pdf,
-            include_metadata=True,
-            **multimodal_kwargs,
-            **parse_config.reader_config,
+        else:
+            multimodal_kwargs: dict[str, Any] = {}
+            if enrich_media:
+                multimodal_kwargs["multimodal_enricher"] = (
+                    all_settings.make_media_enricher()
+                )
+            # Chunking enriches media with LLM calls
+            async with stage_limits.llm if enrich_media else contextlib.nullcontext():
+                texts, metadata = await read_doc(
+                    path,
+                    doc,
+                    parsed_text=parsed_text,
+                    include_metadata=True,
+                    **multimodal_kwargs,
+                    **parse_config.reader_config,
+                )
+            # loose check to see if document was loaded
+            if metadata.name != "image":
+                _check_is_text_document(
+                    texts, path, parse_config.disable_doc_valid_check
+                )
+        async with stage_limits.embedding:
+            if await self.aadd_texts(texts, doc, all_settings, embedding_model):
+                return doc.docname
+        return None
+
+    async def aadd_many(
+        self,
+        paths: Iterable[str | os.PathLike],
+        concurrency: int = 8,
+        llm_concurrency: int = 4,
+        metadata_concurrency: int = 4,
+        embedding_concurrency: int = 2,
+        settings: MaybeSettings = None,
+        llm_model: LLMModel | None = None,
+        embedding_model: EmbeddingModel | None = None,
+        **kwargs,
+    ) -> list[str | Exception | None]:
+        """Add many documents to the collection, pipelining their stages.
+
+        Each document goes through parsing, citation inference, metadata lookup,
+        and embedding. Documents move through these stages independently,
+        each stage with its own concurrency limit, so one document's parsing
+        overlaps other documents' LLM, metadata, and embedding calls.
+        Parsing is limited to the settings' parse workers (or one at a time
+        without workers), since it's CPU-bound.
+
+        Args:
+            paths: Paths of the documents to add.
+            concurrency: Maximum number of documents to be adding at once.
+            llm_concurrency: Maximum number of concurrent citation LLM calls.
+            metadata_concurrency: Maximum number of concurrent metadata lookups.
+            embedding_concurrency: Maximum number of documents embedding at once.
+            settings: Optional settings, used for all documents.
+            llm_model: Optional LLM for citation inference.
+            embedding_model: Optional embedding model for the documents' texts.
+            kwargs: Keyword arguments passed to `aadd` for every document.
+
+        Returns:
+            Per path in order, the added document's name, None if the document was
+            not added (e.g. its contents were already present), or the exception
+            raised adding it.
+        """
+        all_settings = get_settings(settings)
+        if llm_model is None:
+            llm_model = all_settings.get_llm()
+        paths = list(paths)
+        stage_limits = _AddStageLimits(
+            parse=max(all_settings.parsing.parse_workers, 1),
+            llm=llm_concurrency,
+            metadata=metadata_concurrency,
+            embedding=embedding_concurrency,
         )
-        # loose check to see if document was loaded
-        if metadata.name != "image" and (
-            not texts
-            or len(texts[0].text) < 10  # noqa: PLR2004
-            or (
-                not parse_config.disable_doc_valid_check
-                and (
-                    (
-                        # Quick sanity check the text is not just some terse one-page
-                        # 404 message interspersed with newlines. Check here
-                        # instead of maybe_is_text because a 404 HTML page is text
-                        sum(len(t.text.replace("\n", "")) for t in texts[:2])
-                        < 20  # noqa: PLR2004
-                    )
-                    # Use the first few text chunks to avoid potential issues with
-                    # title page parsing in the first chunk
-                    or not maybe_is_text("".join(t.text for t in texts[:5]))
+
+        async def add(
+            path: str | os.PathLike, content_hash: str
+        ) -> str | Exception | None:
+            try:
+                return await self._aadd(
+                    path,
+                    settings=all_settings,
+                    llm_model=llm_model,
+                    embedding_model=embedding_model,
+                    content_hash=content_hash,
+                    stage_limits=stage_limits,
+                    **kwargs,
                 )
-            )
+            except Exception as exc:
+                logger.warning(f"Failed to add document {path}: {exc!r}")
+                return exc
+
+        results: list[str | Exception | None] = [None] * len(paths)
+        # Dedupe by contents before dispatching, so duplicates aren't parsed or cited
+        present_hashes = {d.content_hash for d in self.docs.values()}
+        to_add: dict[str, int] = {}
+        for i, path in enumerate(paths):
+            try:
+                content_hash = await asyncio.to_thread(md5sum, path)
+            except OSError as exc:
+                logger.warning(f"Failed to add document {path}: {exc!r}")
+                results[i] = exc
+                continue
+            if content_hash not in present_hashes:
+                to_add.setdefault(content_hash, i)
+        for i, result in zip(
+            to_add.values(),
+            await gather_with_concurrency(
+                concurrency, [add(paths[i], h) for h, i in to_add.items()]
+            ),
+            strict=True,
         ):
-            raise ValueError(
-                f"This does not look like a text document: {path}. Pass disable_check"
-                " to ignore this error."
-            )
-        if await self.aadd_texts(texts, doc, all_settings, embedding_model):
-            return doc.docname
-        return None
+            results[i] = result
+        return results
 
     async def aadd_texts(
         self,
@@ -363,27 +733,19 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
             embedding_model = all_settings.get_embedding_model()
 
         # 0. Short-circuit if it is caught by a filter
-        for doc_filter in all_settings.parsing.doc_filters or []:
-            if not doc.matches_filter_criteria(doc_filter):
-                return False
+        if not self._matches_doc_filters(doc, all_settings):
+            return False
 
         # 1. Calculate text embeddings if not already present
         if embedding_model and texts[0].embedding is None:
-            for t, t_embedding in zip(
+            await _embed_chunks(
+                embedding_model,
                 texts,
-                await embedding_model.embed_documents(
-                    texts=await asyncio.gather(
-                        *(
-                            t.get_embeddable_text(
-                                all_settings.parsing.should_parse_and_enrich_media[1]
-                            )
-                            for t in texts
-                        )
-                    )
-                ),
-                strict=True,
-            ):
-                t.embedding = t_embedding
+                all_settings,
+                all_settings.parsing.should_parse_and_enrich_media[1],
+            )
+        if doc.dockey in self.docs:  # Added concurrently while we were embedding
+            return False
         # 2. Update texts' and Doc's name
         if doc.docname in self.docnames:
             new_docname = self._get_unique_name(doc.docname)
@@ -400,13 +762,20 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
             return True
         return False
 
-    def delete(
+    @staticmethod
+    def _matches_doc_filters(doc: Doc, settings: Settings) -> bool:
+        return all(
+            doc.matches_filter_criteria(doc_filter)
+            for doc_filter in settings.parsing.doc_filters or []
+        )
+
+    def _pop_doc(
         self,
         name: str | None = None,
         docname: str | None = None,
         dockey: DocKey | None = None,
-    ) -> None:
-        """Delete a document from the collection."""
+    ) -> tuple[DocKey, list[Text]] | None:
+        """Remove a document and its texts, returning its key and texts if present."""
         # name is an alias for docname
         if name and docname and name != docname:
             raise ValueError(
@@ -418,7 +787,7 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
                 "The 'name' argument is deprecated in favor of 'docname',"
                 " this deprecation will conclude in version 6.",
                 category=DeprecationWarning,
-                stacklevel=2,
+                stacklevel=3,
             )
         else:
             name = docname
@@ -426,33 +795,85 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
         if name is not None:
             doc = next((doc for doc in self.docs.values() if doc.docname == name), None)
             if doc is None:
-                return
+                return None
             if doc.docname and doc.dockey:
                 self.docnames.remove(doc.docname)
                 dockey = doc.dockey
         del self.docs[dockey]
-        self.deleted_dockeys.add(dockey)
-        self.texts = list(filter(lambda x: x.doc.dockey != dockey, self.texts))
+        kept_texts: list[Text] = []
+        deleted_texts: list[Text] = []
+        for t in self.texts:
+            (deleted_texts if t.doc.dockey == dockey else kept_texts).append(t)
+        self.texts = kept_texts
+        return cast("DocKey", dockey), deleted_texts
+
+    def delete(
+        self,
+        name: str | None = None,
+        docname: str | None = None,
+        dockey: DocKey | None = None,
+    ) -> None:
+        """Delete a document from the collection.
+
+        Texts indexes only removing texts asynchronously (e.g. Qdrant) instead
+        have the document's texts filtered out of retrieval, see adelete.
+        """
+        if (popped := self._pop_doc(name, docname, dockey)) is None:
+            return
+        dockey, deleted_texts = popped
+        try:
+            self.texts_index.remove_texts(deleted_texts)
+        except NotImplementedError:
+            self.deleted_dockeys.add(dockey)
+
+    async def adelete(
+        self,
+        name: str | None = None,
+        docname: str | None = None,
+        dockey: DocKey | None = None,
+    ) -> None:
+        """Delete a document from the collection, including from the texts index."""
+        if (popped := self._pop_doc(name, docname, dockey)) is None:
+            return
+        dockey, deleted_texts = popped
+        try:
+            await self.texts_index.aremove_texts(deleted_texts)
+        except NotImplementedError:
+            self.deleted_dockeys.add(dockey)
 
     async def _build_texts_index(
-        self, embedding_model: EmbeddingModel, with_enrichment: bool = False
+        self,
+        embedding_model: EmbeddingModel,
+        with_enrichment: bool = False,
+        settings: MaybeSettings = None,
     ) -> None:
+        settings = get_settings(settings)
         texts = [t for t in self.texts if t not in self.texts_index]
         # For any embeddings we are supposed to lazily embed, embed them now
         to_embed = [t for t in texts if t.embedding is None]
         if to_embed:
-            for t, t_embedding in zip(
-                to_embed,
-                await embedding_model.embed_documents(
-                    texts=await asyncio.gather(
-                        *(t.get_embeddable_text(with_enrichment) for t in to_embed)
-                    )
-                ),
-                strict=True,
-            ):
-                t.embedding = t_embedding
+            await _embed_chunks(embedding_model, to_embed, settings, with_enrichment)
         await self.texts_index.add_texts_and_embeddings(texts)
 
+    async def _prepare_texts_index(
+        self, settings: Settings, embedding_model: EmbeddingModel
+    ) -> None:
+        # TODO: should probably happen elsewhere
+        self.texts_index.mmr_lambda = settings.texts_index_mmr_lambda
+
+        await self._build_texts_index(
+            embedding_model,
+            with_enrichment=settings.parsing.should_parse_and_enrich_media[1],
+            settings=settings,
+        )
+
+    def _filter_deleted(self, matches: Sequence[Embeddable], k: int) -> list[Text]:
+        return [
+            m
+            for m in cast("list[Text]", matches)
+            if m.doc.dockey not in self.deleted_dockeys
+        ][:k]
+
     async def retrieve_texts(
         self,
         query: str,
@@ -466,28 +887,46 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
         if embedding_model is None:
             embedding_model = settings.get_embedding_model()
 
-        # TODO: should probably happen elsewhere
-        self.texts_index.mmr_lambda = settings.texts_index_mmr_lambda
-
-        await self._build_texts_index(
-            embedding_model,
-            with_enrichment=settings.parsing.should_parse_and_enrich_media[1],
+        await self._prepare_texts_index(settings, embedding_model)
+        _k = k + len(self.deleted_dockeys)
+        matches, _ = await self.texts_index.max_marginal_relevance_search(
+            query,
+            k=_k,
+            fetch_k=2 * _k,
+            embedding_model=embedding_model,
+            partitioning_fn=partitioning_fn,
+            lexical_weight=settings.texts_index_lexical_weight,
         )
+        return self._filter_deleted(matches, k)
+
+    async def retrieve_texts_many(
+        self,
+        queries: Sequence[str],
+        k: int,
+        settings: MaybeSettings = None,
+        embedding_model: EmbeddingModel | None = None,
+        partitioning_fn: Callable[[Embeddable], int] | None = None,
+    ) -> list[list[Text]]:
+        """Perform MMR search with each of the input queries on the internal index.
+
+        Compared with calling retrieve_texts per query, the queries are embedded
+        in one request and (when not partitioning) scored in one pass over the index.
+        """
+        settings = get_settings(settings)
+        if embedding_model is None:
+            embedding_model = settings.get_embedding_model()
+
+        await self._prepare_texts_index(settings, embedding_model)
         _k = k + len(self.deleted_dockeys)
-        matches: list[Text] = cast(
-            "list[Text]",
-            (
-                await self.texts_index.max_marginal_relevance_search(
-                    query,
-                    k=_k,
-                    fetch_k=2 * _k,
-                    embedding_model=embedding_model,
-                    partitioning_fn=partitioning_fn,
-                )
-            )[0],
+        results = await self.texts_index.max_marginal_relevance_search_batch(
+            queries,
+            k=_k,
+            fetch_k=2 * _k,
+            embedding_model=embedding_model,
+            partitioning_fn=partitioning_fn,
+            lexical_weight=settings.texts_index_lexical_weight,
         )
-        matches = [m for m in matches if m.doc.dockey not in self.deleted_dockeys]
-        return matches[:k]
+        return [self._filter_deleted(matches, k) for matches, _ in results]
 
     async def aget_evidence(
         self,
@@ -501,7 +940,6 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
 
         evidence_settings = get_settings(settings)
         answer_config = evidence_settings.answer
-        prompt_config = evidence_settings.prompts
 
         session = (
             PQASession(question=query, config_md5=evidence_settings.md5)
@@ -529,6 +967,93 @@ class Docs(BaseModel):  # noqa: PLW1641  # TODO: add __hash__
         else:
             matches = self.texts
 
+        return await self._summarize_evidence(
+            session, matches, evidence_settings, callbacks, summary_llm_model
+        )
+
+    async def aget_evidence_many(
+        self,
+        queries: Sequence[PQASession | str],
+        settings: MaybeSettings = None,
+        callbacks: Sequence[Callable] | None = None,
+        embedding_model: EmbeddingModel | None = None,
+        summary_llm_model: LLMModel | None = None,
+        partitioning_fn: Callable[[Embeddable], int] | None = None,
+    ) -> list[PQASession]:
+        """Gather evidence for each of the queries, retrieving texts for all at once.
+
+        Compared with calling aget_evidence per query, texts are retrieved
+        by one retrieve_texts_many call, unless only retrieve_texts is overridden.
+        """
+        evidence_settings = get_settings(settings)
+        answer_config = evidence_settings.answer
+        sessions = [
+            (
+                PQASession(question=query, config_md5=evidence_settings.md5)
+                if isinstance(query, str)
+                else query
+            )
+            for query in queries
+        ]
+
+        if not sessions or (not self.docs and len(self.texts_index) == 0):
+            return sessions
+
+        if embedding_model is None:
+            embedding_model = evidence_settings.get_embedding_model()
+
+        if summary_llm_model is None:
+            summary_llm_model = evidence_settings.get_summary_llm()
+
+        questions = [session.question for session in sessions]
+        all_matches: list[list[Text]]
+        if not answer_config.evidence_retrieval:
+            all_matches = [self.texts] * len(sessions)
+        elif (
+            type(self).retrieve_texts is not Docs.retrieve_texts
+            and type(self).retrieve_texts_many is Docs.retrieve_texts_many
+        ):
+            # Respect a subclass's customized single query retrieval
+            all_matches = [
+                await self.retrieve_texts(
+                    question,
+                    answer_config.evidence_k,
+                    evidence_settings,
+                    embedding_model,
+                    partitioning_fn=partitioning_fn,
+                )
+                for question in questions
+            ]
+        else:
+            all_matches = await self.retrieve_texts_many(
+                questions,
+                answer_config.evidence_k,
+                evidence_settings,
+                embedding_model,
+                partitioning_fn=partitioning_fn,
+            )
+
+        return await asyncio.gather(
+            *(
+                self._summarize_evidence(
+                    session, matches, evidence_settings, callbacks, summary_llm_model
+                )
+                for session, matches in zip(sessions, all_matches, strict=True)
+            )
+        )
+
+    async def _summarize_evidence(
+        self,
+        session: PQASession,
+        matches: list[Text],
+        evidence_settings: Settings,
+        callbacks: Sequence[Callable] | None,
+        summary_llm_model: LLMModel,
+    ) -> PQASession:
+        """Summarize the matched texts into the session's contexts."""
+        answer_config = evidence_settings.answer
+        prompt_config = evidence_settings.prompts
+
         matches = (
             matches[: answer_config.evidence_k]
             if answer_config.evidence_retrieval
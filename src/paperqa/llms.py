@@ -1,17 +1,24 @@
 import asyncio
 import itertools
+import json
 import logging
+import operator
+import re
 import threading
 import uuid
+import warnings
 from abc import ABC, abstractmethod
 from collections.abc import (
     Callable,
+    Coroutine,
     Iterable,
     Sequence,
     Sized,
 )
-from typing import TYPE_CHECKING, Any, cast
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated, Any, ClassVar, Literal, cast
 
+import litellm
 import numpy as np
 from lmi import (
     Embeddable,
@@ -22,18 +29,31 @@ from lmi import (
     SentenceTransformerEmbeddingModel,
     SparseEmbeddingModel,
 )
+from lmi.embeddings import estimate_tokens
+from lmi.utils import gather_with_concurrency
 from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    PrivateAttr,
+    TypeAdapter,
     model_validator,
 )
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 from typing_extensions import override
 
-from paperqa.types import AUTOPOPULATE_VALUE, Doc, Text
+from paperqa.caches import LRUCache
+from paperqa.types import AUTOPOPULATE_VALUE, Doc, DocDetails, DocKey, Text
+from paperqa.utils import hexdigest
 
 if TYPE_CHECKING:
-    from qdrant_client.http.models import Record
+    from qdrant_client.http.models import ExtendedPointId, Record
 
     from paperqa.docs import Docs
 
@@ -46,12 +66,260 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Shared across vector stores, since questions often get repeated
+# (e.g. by an agent), keyed on embedding model fingerprint, mode, and query.
+# Set its path to persist query embeddings across runs
+query_embedding_cache: LRUCache[np.ndarray] = LRUCache(maxsize=1024)
+
+
+def embedding_model_fingerprint(embedding_model: EmbeddingModel) -> str:
+    """Get a digest of an embedding model's type and configuration, for cache keys.
+
+    Models sharing a name can still embed differently
+    (e.g. sparse models of different ndim), so their name alone isn't enough.
+    Fields excluded from serialization (e.g. runtime counters) are left out.
+    """
+    config = embedding_model.model_dump(serialize_as_any=True)
+    model_type = type(embedding_model)
+    return hexdigest(
+        f"{model_type.__module__}.{model_type.__qualname__}:"
+        + json.dumps(config, sort_keys=True, default=repr)
+    )
+
 
 def cosine_similarity(a, b):
-    norm_product = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    norm_product = np.outer(np.linalg.norm(a, axis=1), np.linalg.norm(b, axis=1))
     return a @ b.T / norm_product
 
 
+def normalize_rows(a: np.ndarray) -> np.ndarray:
+    """Scale rows to unit L2 norm, where all-zero rows become NaN like in cosine."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return a / np.linalg.norm(a, axis=1, keepdims=True)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Get indices of the k highest scores in descending order.
+
+    Only the top k are sorted, after an O(n) partition to find them.
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    candidates = (
+        np.argpartition(-scores, k - 1)[:k]
+        if k < len(scores)
+        else np.arange(len(scores))
+    )
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def max_marginal_relevance(
+    embeddings: np.ndarray, scores: np.ndarray, k: int, mmr_lambda: float
+) -> list[int]:
+    """Select k rows by maximal marginal relevance (MMR).
+
+    Rather than a full pairwise similarity matrix, a running max similarity
+    to the selected rows is updated with one row of similarities per selection,
+    taking O(k * n) time and O(n) memory for n rows.
+
+    Args:
+        embeddings: Unit-normalized embeddings, of shape (n, dimension).
+        scores: Relevance scores of the rows, where the first row is the most relevant.
+        k: Number of rows to select.
+        mmr_lambda: Weight of relevance versus dissimilarity to the selected rows.
+
+    Returns:
+        Indices of the selected rows, in order of selection.
+    """
+    # All-zero embeddings are similar to nothing
+    embeddings = np.nan_to_num(embeddings)
+    mmr_relevance = mmr_lambda * scores
+    max_sim_to_selected = np.full(len(scores), -np.inf)
+    is_selected = np.zeros(len(scores), dtype=np.bool_)
+    selected_indices = [0]
+    is_selected[0] = True
+    while len(selected_indices) < min(k, len(scores)):
+        np.maximum(
+            max_sim_to_selected,
+            embeddings @ embeddings[selected_indices[-1]],
+            out=max_sim_to_selected,
+        )
+        mmr_scores = mmr_relevance - (1 - mmr_lambda) * max_sim_to_selected
+        mmr_scores[is_selected] = -np.inf  # Exclude already selected rows
+        max_mmr_index = int(mmr_scores.argmax())
+        selected_indices.append(max_mmr_index)
+        is_selected[max_mmr_index] = True
+    return selected_indices
+
+
+def _ensure_capacity(
+    buffer: np.ndarray | None,
+    n_rows: int,
+    row_shape: tuple[int, ...] = (),
+    dtype: type[np.generic] = np.float32,
+) -> np.ndarray:
+    """Get a buffer able to hold n_rows, doubling capacity to amortize reallocation."""
+    if buffer is not None and buffer.shape[1:] != row_shape:
+        raise ValueError(
+            f"Row shape {row_shape} doesn't match the existing row shape"
+            f" {buffer.shape[1:]}, was the embedding model changed?"
+        )
+    if buffer is not None and buffer.shape[0] >= n_rows:
+        return buffer
+    capacity = max(n_rows, 2 * (0 if buffer is None else buffer.shape[0]))
+    new_buffer = np.empty((capacity, *row_shape), dtype=dtype)
+    if buffer is not None:
+        new_buffer[: buffer.shape[0]] = buffer
+    return new_buffer
+
+
+# Rank offset damping the contribution of top ranks, from the original RRF paper
+RRF_RANK_OFFSET = 60
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Embeddable]], weights: Sequence[float], k: int
+) -> tuple[list[Embeddable], list[float]]:
+    """Fuse rankings of texts by weighted reciprocal rank fusion (RRF).
+
+    Returns:
+        Two-tuple of the top k texts and their fused scores, scaled such that a text
+            ranked first by every ranking scores one.
+    """
+    fused: dict[int, tuple[Embeddable, float]] = {}
+    for ranking, weight in zip(rankings, weights, strict=True):
+        for rank, text in enumerate(ranking, start=1):
+            prior_text, score = fused.get(hash(text), (text, 0.0))
+            fused[hash(text)] = prior_text, score + weight / (RRF_RANK_OFFSET + rank)
+    scale = (RRF_RANK_OFFSET + 1) / (sum(weights) or 1.0)
+    top = sorted(fused.values(), key=operator.itemgetter(1), reverse=True)
+    return [t for t, _ in top[:k]], [score * scale for _, score in top[:k]]
+
+
+LEXICAL_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def lexical_tokenize(text: str) -> list[str]:
+    """Split text into lowercase alphanumeric tokens for lexical search."""
+    return LEXICAL_TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 inverted index over rows of texts, supporting appends.
+
+    Postings (term, row, count) are appended to flat arrays. Searches use a copy of
+    the postings sorted by term, which is lazily re-sorted once the unsorted
+    postings added since outnumber an eighth of the sorted postings.
+    """
+
+    MIN_UNSORTED_POSTINGS: ClassVar[int] = 65536
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._vocabulary: dict[str, int] = {}
+        self._row_lengths: np.ndarray | None = None
+        self._num_rows = 0
+        self._terms: np.ndarray | None = None
+        self._rows: np.ndarray | None = None
+        self._counts: np.ndarray | None = None
+        self._num_postings = 0
+        # Postings sorted by term, and where each term's postings start
+        self._sorted_rows: np.ndarray | None = None
+        self._sorted_counts: np.ndarray | None = None
+        self._term_starts: np.ndarray | None = None
+        self._num_sorted = 0
+
+    def __len__(self) -> int:
+        return self._num_rows
+
+    def add(self, texts: Iterable[str]) -> None:
+        """Append a row for each text."""
+        tokens = [lexical_tokenize(text) for text in texts]
+        lengths = [len(t) for t in tokens]
+        all_tokens = list(itertools.chain.from_iterable(tokens))
+        vocabulary = self._vocabulary
+        for token in dict.fromkeys(all_tokens):
+            if token not in vocabulary:
+                vocabulary[token] = len(vocabulary)
+        token_ids = np.fromiter(
+            map(vocabulary.__getitem__, all_tokens),
+            dtype=np.int64,
+            count=len(all_tokens),
+        )
+        token_rows = np.repeat(
+            np.arange(self._num_rows, self._num_rows + len(lengths)), lengths
+        )
+        # Count each (row, term) pair by uniquely encoding it as one integer
+        pairs, counts = np.unique(
+            token_rows * len(vocabulary) + token_ids, return_counts=True
+        )
+        rows, terms = np.divmod(pairs, len(vocabulary))
+        start, stop = self._num_postings, self._num_postings + len(pairs)
+        self._terms = _ensure_capacity(self._terms, stop, dtype=np.int32)
+        self._rows = _ensure_capacity(self._rows, stop, dtype=np.int32)
+        self._counts = _ensure_capacity(self._counts, stop, dtype=np.int32)
+        self._terms[start:stop] = terms
+        self._rows[start:stop] = rows
+        self._counts[start:stop] = counts
+        self._num_postings = stop
+        n_rows = self._num_rows + len(lengths)
+        self._row_lengths = _ensure_capacity(self._row_lengths, n_rows, dtype=np.int32)
+        self._row_lengths[self._num_rows : n_rows] = lengths
+        self._num_rows = n_rows
+
+    def _sort_postings(self) -> None:
+        terms = cast("np.ndarray", self._terms)[: self._num_postings]
+        order = np.argsort(terms, kind="stable")
+        self._sorted_rows = cast("np.ndarray", self._rows)[order]
+        self._sorted_counts = cast("np.ndarray", self._counts)[order]
+        self._term_starts = np.searchsorted(
+            terms[order], np.arange(len(self._vocabulary) + 1)
+        )
+        self._num_sorted = self._num_postings
+
+    def _get_postings(self, term: int) -> tuple[np.ndarray, np.ndarray]:
+        """Get the rows containing the term, and the term's count in each row."""
+        rows: list[np.ndarray] = []
+        counts: list[np.ndarray] = []
+        term_starts = cast("np.ndarray", self._term_starts)
+        if term + 1 < len(term_starts):
+            start, stop = term_starts[term], term_starts[term + 1]
+            rows.append(cast("np.ndarray", self._sorted_rows)[start:stop])
+            counts.append(cast("np.ndarray", self._sorted_counts)[start:stop])
+        unsorted = slice(self._num_sorted, self._num_postings)
+        in_unsorted = cast("np.ndarray", self._terms)[unsorted] == term
+        rows.append(cast("np.ndarray", self._rows)[unsorted][in_unsorted])
+        counts.append(cast("np.ndarray", self._counts)[unsorted][in_unsorted])
+        return np.concatenate(rows), np.concatenate(counts)
+
+    def score(self, query: str) -> np.ndarray:
+        """Compute the BM25 score of each row for the query, zero for no match."""
+        scores = np.zeros(self._num_rows, dtype=np.float32)
+        terms = {
+            self._vocabulary[token]
+            for token in lexical_tokenize(query)
+            if token in self._vocabulary
+        }
+        if not terms:
+            return scores
+        if self._num_postings - self._num_sorted > max(
+            self.MIN_UNSORTED_POSTINGS, self._num_sorted // 8
+        ):
+            self._sort_postings()
+        elif self._term_starts is None:
+            self._term_starts = np.zeros(1, dtype=np.intp)
+        row_lengths = cast("np.ndarray", self._row_lengths)[: self._num_rows]
+        length_norms = self.k1 * (
+            1 - self.b + self.b * row_lengths / max(row_lengths.mean(), 1.0)
+        )
+        for term in terms:
+            rows, counts = self._get_postings(term)
+            idf = np.log(1 + (self._num_rows - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * counts * (self.k1 + 1) / (counts + length_norms[rows])
+        return scores
+
+
 class VectorStore(BaseModel, ABC):
     """Interface for vector store - very similar to LangChain's VectorStore to be compatible."""
 
@@ -86,6 +354,93 @@ class VectorStore(BaseModel, ABC):
     def clear(self) -> None:
         self.texts_hashes = set()
 
+    def remove_texts(self, texts: Iterable[Embeddable]) -> None:
+        """Remove texts from the store, ignoring texts not in the store."""
+        raise NotImplementedError(
+            f"{type(self).__name__} doesn't support removing texts."
+        )
+
+    async def aremove_texts(self, texts: Iterable[Embeddable]) -> None:
+        """Asynchronously remove texts from the store, ignoring texts not in the store."""
+        self.remove_texts(texts)
+
+    def lexical_search(
+        self, query: str, k: int
+    ) -> tuple[Sequence[Embeddable], list[float]]:
+        """Perform lexical (BM25) search, finding only texts containing a query term.
+
+        Args:
+            query: query string
+            k: Number of results to return
+
+        Returns:
+            Tuple of lists of Embeddables and BM25 scores, of length at most k.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} doesn't support lexical search."
+        )
+
+    async def similarity_search_batch(
+        self, queries: Sequence[str], k: int, embedding_model: EmbeddingModel
+    ) -> list[tuple[Sequence[Embeddable], list[float]]]:
+        """Perform similarity search for each query.
+
+        By default, the queries are embedded in one request, then searched one by one.
+
+        Returns:
+            List of two-tuples of Embeddables and scores, one per query.
+        """
+        await self._embed_queries(queries, embedding_model)  # Caches the embeddings
+        return [
+            await self.similarity_search(query, k, embedding_model) for query in queries
+        ]
+
+    async def _embed_query(
+        self, query: str, embedding_model: EmbeddingModel
+    ) -> np.ndarray:
+        return (await self._embed_queries([query], embedding_model))[0]
+
+    async def _embed_queries(
+        self, queries: Sequence[str], embedding_model: EmbeddingModel
+    ) -> list[np.ndarray]:
+        """Embed queries in one request, skipping queries with cached embeddings."""
+        fingerprint = embedding_model_fingerprint(embedding_model)
+        cache_keys = [
+            (fingerprint, EmbeddingModes.QUERY.value, query) for query in queries
+        ]
+        np_queries = query_embedding_cache.get_many(cache_keys)
+        to_embed = list(
+            dict.fromkeys(
+                q for q, e in zip(queries, np_queries, strict=True) if e is None
+            )
+        )
+        if not to_embed:
+            return cast("list[np.ndarray]", np_queries)
+        # this will only affect models that embedding prompts
+        embedding_model.set_mode(EmbeddingModes.QUERY)
+        embedded = dict(
+            zip(
+                to_embed,
+                (np.array(e) for e in await embedding_model.embed_documents(to_embed)),
+                strict=True,
+            )
+        )
+        embedding_model.set_mode(EmbeddingModes.DOCUMENT)
+        for np_query in embedded.values():
+            np_query.setflags(write=False)  # Guard the cached array from mutation
+        query_embedding_cache.set_many(
+            ((fingerprint, EmbeddingModes.QUERY.value, q), e)
+            for q, e in embedded.items()
+        )
+        return [
+            embedded[q] if e is None else e
+            for q, e in zip(queries, np_queries, strict=True)
+        ]
+
+    def _get_embeddings(self, texts: Sequence[Embeddable]) -> np.ndarray:
+        """Get the embeddings of texts that were returned by a search."""
+        return np.array([t.embedding for t in texts])
+
     async def partitioned_similarity_search(
         self,
         query: str,
@@ -115,6 +470,7 @@ class VectorStore(BaseModel, ABC):
         fetch_k: int,
         embedding_model: EmbeddingModel,
         partitioning_fn: Callable[[Embeddable], int] | None = None,
+        lexical_weight: float = 0.0,
     ) -> tuple[Sequence[Embeddable], list[float]]:
         """Vectorized implementation of Maximal Marginal Relevance (MMR) search.
 
@@ -125,6 +481,9 @@ class VectorStore(BaseModel, ABC):
             embedding_model: model used to embed the query
             partitioning_fn: optional function to partition the documents into
                 different groups, performing MMR within each group.
+            lexical_weight: optional weight in [0, 1] of lexical search results,
+                fused with the similarity search results by reciprocal rank fusion
+                before MMR. Ignored when partitioning.
 
         Returns:
             List of tuples (doc, score) of length k.
@@ -133,38 +492,151 @@ class VectorStore(BaseModel, ABC):
             raise ValueError("fetch_k must be greater or equal to k")
 
         if partitioning_fn is None:
-            texts, scores = await self.similarity_search(
-                query, fetch_k, embedding_model
+            texts, scores = self._fuse_lexical(
+                query,
+                *(await self.similarity_search(query, fetch_k, embedding_model)),
+                fetch_k,
+                lexical_weight,
             )
         else:
             texts, scores = await self.partitioned_similarity_search(
                 query, fetch_k, embedding_model, partitioning_fn
             )
 
-        if len(texts) <= k or self.mmr_lambda >= 1.0:
-            return texts, scores
+        return self._select_by_mmr(texts, scores, k)
+
+    async def max_marginal_relevance_search_batch(
+        self,
+        queries: Sequence[str],
+        k: int,
+        fetch_k: int,
+        embedding_model: EmbeddingModel,
+        partitioning_fn: Callable[[Embeddable], int] | None = None,
+        lexical_weight: float = 0.0,
+    ) -> list[tuple[Sequence[Embeddable], list[float]]]:
+        """Perform MMR search for each query, embedding the queries in one request.
+
+        Args:
+            queries: Query strings.
+            k: Number of results to return per query.
+            fetch_k: Number of results to fetch from the vector store per query.
+            embedding_model: model used to embed the queries
+            partitioning_fn: optional function to partition the documents into
+                different groups, performing MMR within each group.
+            lexical_weight: optional weight in [0, 1] of lexical search results,
+                fused with the similarity search results by reciprocal rank fusion
+                before MMR. Ignored when partitioning.
+
+        Returns:
+            List of two-tuples of Embeddables and scores, one per query.
+        """
+        if (
+            type(self).max_marginal_relevance_search
+            is not VectorStore.max_marginal_relevance_search
+        ):
+            return await self._max_marginal_relevance_search_per_query(
+                queries, k, fetch_k, embedding_model, partitioning_fn, lexical_weight
+            )
+        return await self._max_marginal_relevance_search_batch(
+            queries, k, fetch_k, embedding_model, partitioning_fn, lexical_weight
+        )
 
-        embeddings = np.array([t.embedding for t in texts])
-        np_scores = np.array(scores)
-        similarity_matrix = cosine_similarity(embeddings, embeddings)
+    async def _max_marginal_relevance_search_per_query(
+        self,
+        queries: Sequence[str],
+        k: int,
+        fetch_k: int,
+        embedding_model: EmbeddingModel,
+        partitioning_fn: Callable[[Embeddable], int] | None = None,
+        lexical_weight: float = 0.0,
+    ) -> list[tuple[Sequence[Embeddable], list[float]]]:
+        """Search per query, respecting a subclass's customized single query search."""
+        await self._embed_queries(queries, embedding_model)  # Caches embeddings
+        return [
+            await self.max_marginal_relevance_search(
+                query, k, fetch_k, embedding_model, partitioning_fn, lexical_weight
+            )
+            for query in queries
+        ]
+
+    async def _max_marginal_relevance_search_batch(
+        self,
+        queries: Sequence[str],
+        k: int,
+        fetch_k: int,
+        embedding_model: EmbeddingModel,
+        partitioning_fn: Callable[[Embeddable], int] | None = None,
+        lexical_weight: float = 0.0,
+    ) -> list[tuple[Sequence[Embeddable], list[float]]]:
+        if fetch_k < k:
+            raise ValueError("fetch_k must be greater or equal to k")
 
-        selected_indices = [0]
-        remaining_indices = list(range(1, len(texts)))
+        if partitioning_fn is None:
+            results = [
+                self._fuse_lexical(query, texts, scores, fetch_k, lexical_weight)
+                for query, (texts, scores) in zip(
+                    queries,
+                    await self.similarity_search_batch(
+                        queries, fetch_k, embedding_model
+                    ),
+                    strict=True,
+                )
+            ]
+        else:
+            await self._embed_queries(queries, embedding_model)  # Caches embeddings
+            results = [
+                await self.partitioned_similarity_search(
+                    query, fetch_k, embedding_model, partitioning_fn
+                )
+                for query in queries
+            ]
+        return [self._select_by_mmr(texts, scores, k) for texts, scores in results]
 
-        while len(selected_indices) < k:
-            selected_similarities = similarity_matrix[:, selected_indices]
-            max_sim_to_selected = selected_similarities.max(axis=1)
+    def _fuse_lexical(
+        self,
+        query: str,
+        texts: Sequence[Embeddable],
+        scores: list[float],
+        k: int,
+        lexical_weight: float,
+    ) -> tuple[Sequence[Embeddable], list[float]]:
+        """Fuse texts found by similarity search with those found by lexical search.
 
-            mmr_scores = (
-                self.mmr_lambda * np_scores
-                - (1 - self.mmr_lambda) * max_sim_to_selected
+        Stores not supporting lexical search fall back to only similarity search.
+        """
+        if lexical_weight <= 0.0:
+            return texts, scores
+        try:
+            lexical_texts, _ = self.lexical_search(query, k)
+        except NotImplementedError:
+            warnings.warn(
+                f"{type(self).__name__} doesn't support lexical search,"
+                f" so the lexical weight {lexical_weight} is ignored"
+                " and only similarity search is used.",
+                stacklevel=2,
             )
-            mmr_scores[selected_indices] = -np.inf  # Exclude already selected documents
+            return texts, scores
+        return reciprocal_rank_fusion(
+            [texts, lexical_texts], [1.0 - lexical_weight, lexical_weight], k
+        )
 
-            max_mmr_index = mmr_scores.argmax()
-            selected_indices.append(max_mmr_index)
-            remaining_indices.remove(max_mmr_index)
+    def _select_by_mmr(
+        self, texts: Sequence[Embeddable], scores: list[float], k: int
+    ) -> tuple[Sequence[Embeddable], list[float]]:
+        """Select k of the texts found by a search using MMR."""
+        if len(texts) <= k or self.mmr_lambda >= 1.0:
+            return texts, scores
 
+        selected_indices = max_marginal_relevance(
+            normalize_rows(
+                np.asarray(self._get_embeddings(texts), dtype=np.float32).reshape(
+                    len(texts), -1
+                )
+            ),
+            np.array(scores),
+            k,
+            self.mmr_lambda,
+        )
         return [texts[i] for i in selected_indices], [
             scores[i] for i in selected_indices
         ]
@@ -172,37 +644,317 @@ class VectorStore(BaseModel, ABC):
 
 class NumpyVectorStore(VectorStore):  # noqa: PLW1641  # TODO: add __hash__
     texts: list[Embeddable] = Field(default_factory=list)
+    quantization: Literal["int8", "float16"] | None = Field(
+        default=None,
+        description=(
+            "Optional compact storage of the normalized embeddings, either int8 with"
+            " per-row scales or float16, cutting this store's memory about 8x or 4x"
+            " as raw embeddings aren't kept. Searches score the compact rows, then"
+            " re-score a shortlist exactly using the texts' embeddings. Note numpy"
+            " upcasts float16 slowly, so int8 is both smaller and faster."
+        ),
+    )
+    rescore_multiplier: int = Field(
+        default=4,
+        ge=1,
+        description=(
+            "When quantized, the shortlist of texts to re-score exactly is this"
+            " multiple of the number of texts requested."
+        ),
+    )
+    compaction_threshold: float = Field(
+        default=0.25,
+        ge=0.0,
+        le=1.0,
+        description=(
+            "Removed texts' rows are masked out of searches until they make up more"
+            " than this fraction of rows, at which point the rows are compacted."
+        ),
+    )
+    # Append-only float32 buffers whose capacity doubles when full, so adding texts
+    # only copies the new rows. Only the first _num_embeddings rows are valid
     _embeddings_matrix: np.ndarray | None = None
-    _texts_filter: np.ndarray | None = None
+    _normalized_matrix: np.ndarray | None = None
+    _num_embeddings: int = 0
+    # Per-row scales of int8 quantized rows
+    _row_scales: np.ndarray | None = None
+    _SCORE_BLOCK_SIZE: ClassVar[int] = 1024
+    # Partition labels of the texts, cached per partitioning function
+    _partitioning_fn: Callable[[Embeddable], int] | None = None
+    _partition_labels: np.ndarray | None = None
+    _partition_groups: list[np.ndarray] | None = None
+    # Mask of rows whose texts were removed, pending compaction
+    _removed: np.ndarray | None = None
+    _num_removed: int = 0
+    # Hashes of the texts, lazily computed upon the first removal
+    _row_hashes: np.ndarray | None = None
+    # BM25 index of the texts, lazily built upon the first lexical search
+    _lexical_index: BM25Index | None = None
 
     def __eq__(self, other) -> bool:
         if not isinstance(other, type(self)):
             return NotImplemented
+        # Raw embeddings aren't kept when quantized
+        normalized = self.quantization is not None
+        self_matrix = self._get_matrix(normalized)
+        other_matrix = other._get_matrix(normalized)
         return (
             self.texts == other.texts
             and self.texts_hashes == other.texts_hashes
             and self.mmr_lambda == other.mmr_lambda
+            and self.quantization == other.quantization
             and (
-                other._embeddings_matrix is None
-                if self._embeddings_matrix is None
+                other_matrix is None
+                if self_matrix is None
                 else (
                     False
-                    if other._embeddings_matrix is None
-                    else np.allclose(self._embeddings_matrix, other._embeddings_matrix)
+                    if other_matrix is None
+                    else np.allclose(self_matrix, other_matrix)
                 )
             )
         )
 
+    def _get_matrix(self, normalized: bool = False) -> np.ndarray | None:
+        """Get a view of the valid rows of the (optionally normalized) embeddings."""
+        if normalized:
+            self._ensure_normalized_matrix()
+        buffer = self._normalized_matrix if normalized else self._embeddings_matrix
+        if buffer is None:
+            return None
+        return buffer[: self._num_embeddings]
+
     def clear(self) -> None:
         super().clear()
         self.texts = []
         self._embeddings_matrix = None
-        self._texts_filter = None
+        self._normalized_matrix = None
+        self._num_embeddings = 0
+        self._row_scales = None
+        self._removed = None
+        self._num_removed = 0
+        self._row_hashes = None
+        self._lexical_index = None
+        self._reset_partitions()
+
+    def __getstate__(self) -> dict[Any, Any]:
+        state = super().__getstate__()
+        # Partitioning functions may not be picklable (e.g. a lambda),
+        # and the partition labels are cheap to recompute upon the next search
+        state["__pydantic_private__"] = {
+            **state["__pydantic_private__"],
+            # Leave out the buffers' unused capacity
+            **{
+                key: buffer[: self._num_embeddings]
+                for key in (
+                    "_embeddings_matrix",
+                    "_normalized_matrix",
+                    "_row_scales",
+                    "_removed",
+                )
+                if (buffer := state["__pydantic_private__"][key]) is not None
+            },
+            "_partitioning_fn": None,
+            "_partition_labels": None,
+            "_partition_groups": None,
+            # str hashes are salted per process
+            "_row_hashes": None,
+            # Cheaper to rebuild upon the next lexical search than to store
+            "_lexical_index": None,
+        }
+        if self.quantization is None:
+            # Rebuilt from the raw embeddings upon the next search
+            state["__pydantic_private__"]["_normalized_matrix"] = None
+        return state
+
+    def __setstate__(self, state: dict[Any, Any]) -> None:
+        super().__setstate__(state)
+        # str hashes are salted per process, so rehash to keep
+        # __contains__ and remove_texts working after unpickling elsewhere
+        self.texts_hashes = {
+            hash(t)
+            for t, live in zip(
+                self.texts, self._is_live(np.arange(len(self.texts))), strict=True
+            )
+            if live
+        }
+        self._row_hashes = None
+
+    def _ensure_normalized_matrix(self) -> None:
+        """Rebuild the normalized embeddings if left out (e.g. by unpickling)."""
+        if (
+            self._normalized_matrix is None
+            and self._embeddings_matrix is not None
+            and self.quantization is None
+        ):
+            self._normalized_matrix = normalize_rows(
+                self._embeddings_matrix[: self._num_embeddings]
+            )
+
+    def _reset_partitions(self) -> None:
+        self._partitioning_fn = None
+        self._partition_labels = None
+        self._partition_groups = None
+
+    def _append_embeddings(self, texts: Sequence[Embeddable]) -> None:
+        if not texts:
+            return
+        start, stop = self._num_embeddings, self._num_embeddings + len(texts)
+        self._write_rows(
+            start, np.asarray([t.embedding for t in texts], dtype=np.float32)
+        )
+        if self._partitioning_fn is not None:
+            self._partition_labels = _ensure_capacity(
+                self._partition_labels, stop, dtype=np.int64
+            )
+            self._partition_labels[start:stop] = [
+                self._partitioning_fn(t) for t in texts
+            ]
+            self._partition_groups = None
+        if self._removed is not None:
+            self._removed = _ensure_capacity(self._removed, stop, dtype=np.bool_)
+            self._removed[start:stop] = False
+        if self._row_hashes is not None:
+            self._row_hashes = _ensure_capacity(self._row_hashes, stop, dtype=np.int64)
+            self._row_hashes[start:stop] = [hash(t) for t in texts]
+        if self._lexical_index is not None:
+            self._lexical_index.add(getattr(t, "text", "") for t in texts)
+        self._num_embeddings = stop
+
+    def _write_rows(self, start: int, rows: np.ndarray) -> None:
+        """Write raw and normalized embeddings starting at a row, growing buffers."""
+        stop = start + len(rows)
+        if self.quantization is None:
+            self._ensure_normalized_matrix()
+            self._embeddings_matrix = _ensure_capacity(
+                self._embeddings_matrix, stop, rows.shape[1:]
+            )
+            self._normalized_matrix = _ensure_capacity(
+                self._normalized_matrix, stop, rows.shape[1:]
+            )
+            self._embeddings_matrix[start:stop] = rows
+            self._normalized_matrix[start:stop] = normalize_rows(rows)
+            return
+        normalized_rows = normalize_rows(rows)
+        self._normalized_matrix = _ensure_capacity(
+            self._normalized_matrix,
+            stop,
+            rows.shape[1:],
+            dtype=np.dtype(self.quantization).type,
+        )
+        if self.quantization == "float16":
+            self._normalized_matrix[start:stop] = normalized_rows
+            return
+        # Scale each row's largest magnitude to 127, where an all-zero
+        # embedding gets a NaN scale so it still scores NaN
+        scales = np.abs(normalized_rows).max(axis=1) / 127
+        self._row_scales = _ensure_capacity(self._row_scales, stop)
+        self._row_scales[start:stop] = scales
+        self._normalized_matrix[start:stop] = np.rint(
+            np.nan_to_num(normalized_rows / scales[:, None])
+        )
 
     async def add_texts_and_embeddings(self, texts: Iterable[Embeddable]) -> None:
+        texts = list(texts)
         await super().add_texts_and_embeddings(texts)
+        if self._num_embeddings != len(self.texts):
+            # Someone mutated texts directly, so rebuild the buffers from scratch
+            self._rebuild_embeddings()
         self.texts.extend(texts)
-        self._embeddings_matrix = np.array([t.embedding for t in self.texts])
+        self._append_embeddings(texts)
+
+    def _rebuild_embeddings(self) -> None:
+        """Rebuild the buffers from the texts' embeddings."""
+        self._embeddings_matrix = self._normalized_matrix = None
+        self._num_embeddings = 0
+        self._removed = self._row_hashes = self._lexical_index = None
+        self._num_removed = 0
+        self._reset_partitions()
+        self._append_embeddings(self.texts)
+
+    def remove_texts(self, texts: Iterable[Embeddable]) -> None:
+        """Remove texts, masking their rows out of searches until compaction."""
+        hashes = {hash(t) for t in texts} & self.texts_hashes
+        if not hashes:
+            return
+        self.texts_hashes -= hashes
+        if self._removed is None:
+            self._removed = np.zeros(self._num_embeddings, dtype=np.bool_)
+        if self._row_hashes is None:
+            self._row_hashes = np.array([hash(t) for t in self.texts], dtype=np.int64)
+        removed = self._removed[: self._num_embeddings]
+        newly_removed = ~removed & np.isin(
+            self._row_hashes[: self._num_embeddings],
+            np.fromiter(hashes, dtype=np.int64, count=len(hashes)),
+        )
+        removed |= newly_removed
+        self._num_removed += int(newly_removed.sum())
+        if self._num_removed > self.compaction_threshold * self._num_embeddings:
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop the rows of removed texts, which otherwise are masked out of searches.
+
+        This happens automatically once removed texts' rows
+        make up more than compaction_threshold of the rows.
+        """
+        if not self._num_removed:
+            return
+        keep = np.flatnonzero(
+            ~cast("np.ndarray", self._removed)[: self._num_embeddings]
+        )
+        self._compact_rows(keep)
+        self.texts = [self.texts[i] for i in keep]
+        self._num_embeddings = len(keep)
+        self._removed = None
+        self._num_removed = 0
+
+    def _compact_rows(self, keep: np.ndarray) -> None:
+        """Move the rows to keep to the front of the buffers."""
+        for buffer in (
+            self._embeddings_matrix,
+            self._normalized_matrix,
+            self._row_scales,
+            self._partition_labels,
+            self._row_hashes,
+        ):
+            if buffer is not None:
+                buffer[: len(keep)] = buffer[keep]
+        self._partition_groups = None
+        self._lexical_index = None
+
+    def lexical_search(
+        self, query: str, k: int
+    ) -> tuple[Sequence[Embeddable], list[float]]:
+        k = min(k, len(self.texts) - self._num_removed)
+        if k == 0:
+            return [], []
+
+        if self._lexical_index is None:
+            self._lexical_index = BM25Index()
+            self._lexical_index.add(getattr(t, "text", "") for t in self.texts)
+        scores = self._mask_removed(self._lexical_index.score(query))
+        indices = top_k_indices(scores, k)
+        indices = indices[scores[indices] > 0]
+        return [self.texts[i] for i in indices], scores[indices].tolist()
+
+    def _mask_removed(
+        self, scores: np.ndarray, indices: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Set the scores of removed texts to negative infinity, in place."""
+        if self._num_removed:
+            removed = cast("np.ndarray", self._removed)[: self._num_embeddings]
+            scores[removed if indices is None else removed[indices]] = -np.inf
+        return scores
+
+    def _is_live(self, indices: np.ndarray) -> np.ndarray:
+        """Get a mask of which texts aren't removed.
+
+        Removed texts score negative infinity, so they're only found by a search
+        when tied with texts having an all-zero embedding.
+        """
+        if not self._num_removed:
+            return np.ones(len(indices), dtype=np.bool_)
+        return ~cast("np.ndarray", self._removed)[indices]
 
     async def partitioned_similarity_search(
         self,
@@ -211,67 +963,569 @@ class NumpyVectorStore(VectorStore):  # noqa: PLW1641  # TODO: add __hash__
         embedding_model: EmbeddingModel,
         partitioning_fn: Callable[[Embeddable], int],
     ) -> tuple[Sequence[Embeddable], list[float]]:
-        scores: list[list[float]] = []
-        texts: list[Sequence[Embeddable]] = []
-
-        text_partitions = np.array([partitioning_fn(t) for t in self.texts])
-        # CPU bound so replacing w a gather wouldn't get us anything
-        # plus we need to reset self._texts_filter each iteration
-        for partition in np.unique(text_partitions):
-            self._texts_filter = text_partitions == partition
-            _texts, _scores = await self.similarity_search(query, k, embedding_model)
-            texts.append(_texts)
-            scores.append(_scores)
-        # reset the filter after running
-        self._texts_filter = None
+        """Perform similarity search per partition, interleaving partitions' results.
 
-        return (
-            [
-                t
-                for t in itertools.chain.from_iterable(itertools.zip_longest(*texts))
-                if t is not None
-            ][:k],
+        The query is embedded and scored once, then top k is found within each
+        partition. Partition labels are cached until a different partitioning_fn
+        is used, so partitioning_fn is expected to be deterministic for a given text.
+        """
+        k = min(k, len(self.texts) - self._num_removed)
+        if k == 0:
+            return [], []
+
+        np_query = await self._embed_query(query, embedding_model)
+        scores = self._score(np_query)
+        # Partitions are in ascending order of label, and within a partition
+        # indices are in descending order of score
+        partitioned_indices = []
+        for group in self._get_partition_groups(partitioning_fn):
+            candidates = group
+            if self.quantization is not None:
+                # Quantized scores are approximate, so re-score a shortlist exactly
+                candidates = group[
+                    top_k_indices(scores[group], self.rescore_multiplier * k)
+                ]
+                scores[candidates] = self._exact_score(np_query, candidates)
+            partitioned_indices.append(candidates[top_k_indices(scores[candidates], k)])
+        indices = np.array(
             [
-                s
-                for s in itertools.chain.from_iterable(itertools.zip_longest(*scores))
-                if s is not None
-            ][:k],
+                i
+                for i in itertools.chain.from_iterable(
+                    itertools.zip_longest(*partitioned_indices)
+                )
+                if i is not None
+            ],
+            dtype=np.intp,
         )
+        indices = indices[self._is_live(indices)][:k]
+        return [self.texts[i] for i in indices], scores[indices].tolist()
+
+    def _get_partition_groups(
+        self, partitioning_fn: Callable[[Embeddable], int]
+    ) -> list[np.ndarray]:
+        """Get the text indices of each partition, in ascending order of label."""
+        if self._partitioning_fn is not partitioning_fn:
+            self._partitioning_fn = partitioning_fn
+            self._partition_labels = np.array(
+                [partitioning_fn(t) for t in self.texts], dtype=np.int64
+            )
+            self._partition_groups = None
+        if self._partition_groups is None:
+            labels = cast("np.ndarray", self._partition_labels)[: len(self.texts)]
+            order = np.argsort(labels, kind="stable")
+            _, starts = np.unique(labels[order], return_index=True)
+            self._partition_groups = np.split(order, starts[1:])
+        return self._partition_groups
 
     async def similarity_search(
         self, query: str, k: int, embedding_model: EmbeddingModel
     ) -> tuple[Sequence[Embeddable], list[float]]:
-        k = min(k, len(self.texts))
+        k = min(k, len(self.texts) - self._num_removed)
         if k == 0:
             return [], []
 
-        # this will only affect models that embedding prompts
-        embedding_model.set_mode(EmbeddingModes.QUERY)
+        indices, scores = self._search(
+            await self._embed_query(query, embedding_model), k
+        )
+        return [self.texts[i] for i in indices], scores.tolist()
+
+    async def similarity_search_batch(
+        self, queries: Sequence[str], k: int, embedding_model: EmbeddingModel
+    ) -> list[tuple[Sequence[Embeddable], list[float]]]:
+        """Perform similarity search for each query, scoring them all at once."""
+        k = min(k, len(self.texts) - self._num_removed)
+        if k == 0 or not queries:
+            return [([], []) for _ in queries]
+
+        np_queries = np.stack(await self._embed_queries(queries, embedding_model))
+        return [
+            ([self.texts[i] for i in indices], scores.tolist())
+            for indices, scores in self._search_batch(np_queries, k)
+        ]
 
-        np_query = np.array((await embedding_model.embed_documents([query]))[0])
+    def _search_batch(
+        self, np_queries: np.ndarray, k: int
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Like _search for each query, but scoring as one matrix-matrix product."""
+        all_scores = self._score(np_queries)
+        return [
+            self._search(np_query, k, scores=all_scores[:, i])
+            for i, np_query in enumerate(np_queries)
+        ]
 
-        embedding_model.set_mode(EmbeddingModes.DOCUMENT)
+    def _search(
+        self,
+        np_query: np.ndarray,
+        k: int,
+        candidates: np.ndarray | None = None,
+        scores: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the indices and scores of the top k texts, in descending score order.
 
-        embedding_matrix = self._embeddings_matrix
+        Args:
+            np_query: Query embedding.
+            k: Number of texts to get.
+            candidates: Optional indices of the texts to search, default is all texts.
+            scores: Optional precomputed scores of all texts, to skip scoring.
+
+        Returns:
+            Two-tuple of text indices and their scores.
+        """
+        if scores is None:
+            scores = self._score(np_query, candidates)
+        elif candidates is not None:
+            scores = scores[candidates]
+        if self.quantization is not None:
+            # Quantized scores are approximate, so re-score a shortlist exactly
+            shortlist = top_k_indices(scores, self.rescore_multiplier * k)
+            candidates = shortlist if candidates is None else candidates[shortlist]
+            scores = self._exact_score(np_query, candidates)
+        # Many algorithms expect a sorted list, but only the top k need sorting
+        top_indices = top_k_indices(scores, k)
+        indices = top_indices if candidates is None else candidates[top_indices]
+        live = self._is_live(indices)
+        return indices[live], scores[top_indices[live]]
+
+    def _score(
+        self, np_query: np.ndarray, indices: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Compute cosine similarity of the query against stored embeddings.
+
+        Since rows are stored pre-normalized, this is one matrix-vector product,
+        or one matrix-matrix product for a matrix of queries.
 
-        if self._texts_filter is not None:
-            original_indices = np.where(self._texts_filter)[0]
-            embedding_matrix = embedding_matrix[self._texts_filter]  # type: ignore[index]
+        Args:
+            np_query: Query embedding, or a matrix of query embeddings (one per row).
+            indices: Optional indices of the texts to score, default is all texts.
+
+        Returns:
+            Scores, where texts with an all-zero embedding get negative infinity.
+                For a matrix of queries, there's one column of scores per query.
+        """
+        np_query = np.asarray(np_query, dtype=np.float32)
+        normalized_queries = normalize_rows(np_query.reshape(-1, np_query.shape[-1])).T
+        matrix = cast("np.ndarray", self._get_matrix(normalized=True))
+        if indices is not None:
+            matrix = matrix[indices]
+        if self.quantization is None:
+            scores = matrix @ normalized_queries
         else:
-            original_indices = np.arange(len(self.texts))
+            # Upcast in blocks to bound the temporary float32 memory
+            scores = np.empty(
+                (len(matrix), normalized_queries.shape[1]), dtype=np.float32
+            )
+            for start in range(0, len(matrix), self._SCORE_BLOCK_SIZE):
+                block = matrix[start : start + self._SCORE_BLOCK_SIZE]
+                scores[start : start + len(block)] = (
+                    block.astype(np.float32) @ normalized_queries
+                )
+            if self._row_scales is not None:
+                row_scales = self._row_scales[: self._num_embeddings]
+                scores *= (row_scales if indices is None else row_scales[indices])[
+                    :, None
+                ]
+        scores = self._mask_removed(np.nan_to_num(scores, nan=-np.inf), indices)
+        return scores if np_query.ndim > 1 else scores[:, 0]
+
+    def _exact_score(self, np_query: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """Compute full precision cosine similarity of the query against some texts."""
+        embeddings = normalize_rows(
+            self._get_embeddings([self.texts[i] for i in indices]).reshape(
+                len(indices), -1
+            )
+        )
+        normalized_query = normalize_rows(np.asarray(np_query).reshape(1, -1))[0]
+        return self._mask_removed(
+            np.nan_to_num(embeddings @ normalized_query, nan=-np.inf), indices
+        )
 
-        similarity_scores = cosine_similarity(
-            np_query.reshape(1, -1), embedding_matrix
-        )[0]
-        similarity_scores = np.nan_to_num(similarity_scores, nan=-np.inf)
-        # minus so descending
-        # we could use arg-partition here
-        # but a lot of algorithms expect a sorted list
-        sorted_indices = np.argsort(-similarity_scores)
-        return (
-            [self.texts[i] for i in original_indices[sorted_indices][:k]],
-            [similarity_scores[i] for i in sorted_indices[:k]],
+
+def _assign_to_centroids(
+    data: np.ndarray, centroids: np.ndarray, batch_size: int = 16384
+) -> np.ndarray:
+    """Assign each unit-normalized row to its most similar centroid."""
+    assignments = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), batch_size):
+        batch = np.nan_to_num(data[start : start + batch_size])
+        assignments[start : start + batch_size] = (batch @ centroids.T).argmax(axis=1)
+    return assignments
+
+
+def spherical_kmeans(
+    data: np.ndarray, n_clusters: int, n_iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Cluster unit-normalized rows by cosine similarity.
+
+    Returns:
+        Unit-normalized centroids of shape (n_clusters, data.shape[1]).
+    """
+    data = np.nan_to_num(data)
+    centroids = data[rng.choice(len(data), size=n_clusters, replace=False)]
+    for _ in range(n_iterations):
+        assignments = _assign_to_centroids(data, centroids)
+        order = np.argsort(assignments, kind="stable")
+        clusters, starts = np.unique(assignments[order], return_index=True)
+        sums = np.zeros_like(centroids)
+        sums[clusters] = np.add.reduceat(data[order], starts, axis=0)
+        new_centroids = normalize_rows(sums)
+        # Re-seed empty (or degenerate) clusters with random rows
+        empty = np.flatnonzero(np.isnan(new_centroids).any(axis=1))
+        new_centroids[empty] = data[rng.choice(len(data), size=len(empty))]
+        centroids = new_centroids
+    return centroids
+
+
+class IVFVectorStore(NumpyVectorStore):
+    """Approximate nearest neighbor search using an inverted file (IVF) index.
+
+    Texts are clustered around centroids via spherical k-means, and a search only
+    scores the texts within the n_probe clusters whose centroids best match the
+    query. Clustering happens lazily upon search, once there are at least
+    min_train_size texts, and is redone as the number of texts grows by
+    retrain_growth. Texts added in between are assigned to the nearest existing
+    centroid.
+    """
+
+    n_lists: int | None = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Number of clusters (inverted lists), leaving as the default of None will"
+            " use the square root of the number of texts at training time."
+        ),
+    )
+    n_probe: int = Field(
+        default=16,
+        ge=1,
+        description=(
+            "Number of clusters to search, where a larger value gives better recall at"
+            " the cost of latency."
+        ),
+    )
+    min_train_size: int = Field(
+        default=4096,
+        ge=1,
+        description="Below this many texts, brute force search is used.",
+    )
+    retrain_growth: float = Field(
+        default=2.0,
+        gt=1.0,
+        description=(
+            "Factor of growth in the number of texts since the last training that"
+            " triggers retraining of the clusters."
+        ),
+    )
+    kmeans_iterations: int = Field(default=10, ge=1)
+    kmeans_sample_size: int = Field(
+        default=64,
+        ge=1,
+        description=(
+            "Number of texts per cluster to sample when training, to bound training"
+            " time for large collections."
+        ),
+    )
+    seed: int = Field(default=0, description="Random seed for training.")
+    _centroids: np.ndarray | None = None
+    _list_assignments: np.ndarray | None = None
+    _lists: list[np.ndarray] | None = None
+    _trained_size: int = 0
+
+    def clear(self) -> None:
+        super().clear()
+        self._reset_lists()
+
+    def __getstate__(self) -> dict[Any, Any]:
+        state = super().__getstate__()
+        if self._list_assignments is not None:
+            state["__pydantic_private__"] = {
+                **state["__pydantic_private__"],
+                "_list_assignments": self._list_assignments[: self._num_embeddings],
+                "_lists": None,
+            }
+        return state
+
+    def _reset_lists(self) -> None:
+        self._centroids = None
+        self._list_assignments = None
+        self._lists = None
+        self._trained_size = 0
+
+    def _append_embeddings(self, texts: Sequence[Embeddable]) -> None:
+        start = self._num_embeddings
+        super()._append_embeddings(texts)
+        if self._centroids is None:
+            return
+        self._list_assignments = _ensure_capacity(
+            self._list_assignments, self._num_embeddings, dtype=np.int64
+        )
+        self._list_assignments[start : self._num_embeddings] = _assign_to_centroids(
+            cast("np.ndarray", self._normalized_matrix)[start : self._num_embeddings],
+            self._centroids,
+        )
+        self._lists = None
+
+    def _compact_rows(self, keep: np.ndarray) -> None:
+        super()._compact_rows(keep)
+        if self._list_assignments is not None:
+            self._list_assignments[: len(keep)] = self._list_assignments[keep]
+        self._lists = None
+
+    async def add_texts_and_embeddings(self, texts: Iterable[Embeddable]) -> None:
+        if self._num_embeddings != len(self.texts):
+            # Buffers will get rebuilt, so let's rebuild the clusters too
+            self._reset_lists()
+        await super().add_texts_and_embeddings(texts)
+
+    def train(self) -> None:
+        """(Re)cluster all texts, which otherwise happens lazily upon search."""
+        data = cast("np.ndarray", self._get_matrix(normalized=True))
+        n_lists = min(self.n_lists or max(int(np.sqrt(len(data))), 1), len(data))
+        rng = np.random.default_rng(self.seed)
+        sample_size = n_lists * self.kmeans_sample_size
+        sample = (
+            data[np.sort(rng.choice(len(data), size=sample_size, replace=False))]
+            if len(data) > sample_size
+            else data
+        )
+        # Quantized rows are the normalized embeddings times a per-row scale,
+        # which barely affects cosine-based clustering
+        self._centroids = spherical_kmeans(
+            np.asarray(sample, dtype=np.float32),
+            n_lists,
+            self.kmeans_iterations,
+            rng,
+        )
+        self._list_assignments = _assign_to_centroids(data, self._centroids)
+        self._lists = None
+        self._trained_size = len(data)
+
+    def _get_lists(self) -> list[np.ndarray]:
+        """Get the text indices within each cluster."""
+        if self._lists is None:
+            assignments = cast("np.ndarray", self._list_assignments)[
+                : self._num_embeddings
+            ]
+            order = np.argsort(assignments, kind="stable")
+            boundaries = np.searchsorted(
+                assignments[order],
+                np.arange(1, len(cast("np.ndarray", self._centroids))),
+            )
+            self._lists = np.split(order, boundaries)
+        return self._lists
+
+    def _search_batch(
+        self, np_queries: np.ndarray, k: int
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        if self._num_embeddings < self.min_train_size:
+            return super()._search_batch(np_queries, k)
+        # Each query probes different clusters, so avoid scoring all texts
+        return [self._search(np_query, k) for np_query in np_queries]
+
+    def _search(
+        self,
+        np_query: np.ndarray,
+        k: int,
+        candidates: np.ndarray | None = None,
+        scores: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if (
+            candidates is not None
+            or scores is not None
+            or self._num_embeddings < self.min_train_size
+        ):
+            return super()._search(np_query, k, candidates, scores)
+        if (
+            self._centroids is None
+            or self._num_embeddings >= self.retrain_growth * self._trained_size
+        ):
+            self.train()
+        centroids = cast("np.ndarray", self._centroids)
+        centroid_scores = np.nan_to_num(
+            centroids
+            @ normalize_rows(np.asarray(np_query, dtype=np.float32).reshape(1, -1))[0],
+            nan=-np.inf,
+        )
+        lists = self._get_lists()
+        candidates = np.concatenate(
+            [lists[i] for i in top_k_indices(centroid_scores, self.n_probe)]
         )
+        return super()._search(np_query, k, candidates)
+
+
+class MemmapVectorStore(NumpyVectorStore):
+    """NumpyVectorStore keeping its embeddings in a memory-mapped file on disk.
+
+    Normalized float32 embeddings are written to a raw file in the directory,
+    alongside a file of chunk IDs (one text name per line). Pickling this store
+    (e.g. within a saved Docs) then leaves out the embeddings matrix,
+    and unpickling lazily maps the file read-only,
+    so processes serving the same corpus share pages via the OS page cache.
+
+    Only one process should add texts to a given directory.
+    """
+
+    EMBEDDINGS_FILENAME: ClassVar[str] = "embeddings.f32"
+    CHUNK_IDS_FILENAME: ClassVar[str] = "chunk_ids.txt"
+
+    directory: Path = Field(
+        description="Directory for the memory-mapped embeddings and chunk IDs files."
+    )
+    release_embeddings: bool = Field(
+        default=False,
+        description=(
+            "Opt-in flag to set texts' embedding to None once written to disk,"
+            " so texts (e.g. within a pickled Docs) don't hold lists of floats."
+            " Note this leaves this store as the only holder of the embeddings."
+        ),
+    )
+    _dimension: int = 0
+    # Rows in the file mapped for writing, or 0 if mapped read-only
+    _capacity: int = 0
+    _row_indices: dict[int, int] | None = None
+
+    @model_validator(mode="after")
+    def validate_quantization(self):
+        if self.quantization is not None:
+            # Quantized re-scoring reads the embeddings this store may release
+            raise ValueError(f"{type(self).__name__} doesn't support quantization.")
+        return self
+
+    @property
+    def embeddings_path(self) -> Path:
+        return self.directory / self.EMBEDDINGS_FILENAME
+
+    @property
+    def chunk_ids_path(self) -> Path:
+        return self.directory / self.CHUNK_IDS_FILENAME
+
+    def clear(self) -> None:
+        super().clear()
+        self._dimension = 0
+        self._capacity = 0
+        self._row_indices = None
+
+    def __getstate__(self) -> dict[Any, Any]:
+        state = super().__getstate__()
+        state["__pydantic_private__"] = {
+            **state["__pydantic_private__"],
+            "_normalized_matrix": None,
+            "_capacity": 0,
+            "_row_indices": None,
+        }
+        return state
+
+    def _get_matrix(
+        self, normalized: bool = False  # noqa: ARG002
+    ) -> np.ndarray | None:
+        # Only normalized embeddings are kept, as cosine similarity ignores magnitude
+        if self._normalized_matrix is None and self._num_embeddings:
+            self._normalized_matrix = np.memmap(
+                self.embeddings_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(self._num_embeddings, self._dimension),
+            )
+        return super()._get_matrix(normalized=True)
+
+    def _write_rows(self, start: int, rows: np.ndarray) -> None:
+        stop = start + len(rows)
+        if start == 0:
+            self._dimension = rows.shape[1]
+        elif rows.shape[1:] != (self._dimension,):
+            raise ValueError(
+                f"Embedding shape {rows.shape[1:]} doesn't match existing shape"
+                f" {(self._dimension,)}, was the embedding model changed?"
+            )
+        if stop > self._capacity:
+            # Grow geometrically like NumpyVectorStore, but by extending the file
+            # in place (sparsely), instead of copying into a new buffer
+            capacity = max(stop, 2 * start)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with self.embeddings_path.open("r+b" if start else "wb") as f:
+                f.truncate(capacity * self._dimension * np.dtype(np.float32).itemsize)
+            self._normalized_matrix = np.memmap(
+                self.embeddings_path,
+                dtype=np.float32,
+                mode="r+",
+                shape=(capacity, self._dimension),
+            )
+            self._capacity = capacity
+        matrix = cast("np.memmap", self._normalized_matrix)
+        matrix[start:stop] = normalize_rows(rows)
+        matrix.flush()
+
+    def _append_embeddings(self, texts: Sequence[Embeddable]) -> None:
+        start = self._num_embeddings
+        super()._append_embeddings(texts)
+        if not texts:
+            return
+        with self.chunk_ids_path.open("a" if start else "w", encoding="utf-8") as f:
+            f.writelines(f"{getattr(t, 'name', '')}\n" for t in texts)
+        if self.release_embeddings:
+            for t in texts:
+                t.embedding = None
+        self._row_indices = None
+
+    def _rebuild_embeddings(self) -> None:
+        released = [i for i, t in enumerate(self.texts) if t.embedding is None]
+        if released:
+            # Restore released embeddings from their rows on disk, by chunk ID
+            row_indices = {
+                chunk_id: i
+                for i, chunk_id in enumerate(
+                    self.chunk_ids_path.read_text(encoding="utf-8").splitlines()[
+                        : self._num_embeddings
+                    ]
+                )
+            }
+            try:
+                rows = [
+                    row_indices[getattr(self.texts[i], "name", "")] for i in released
+                ]
+            except KeyError as exc:
+                raise ValueError(
+                    f"Can't rebuild {type(self).__name__} after its texts were"
+                    f" mutated, as the released embedding of text {exc} isn't in"
+                    f" {self.chunk_ids_path}. Use add_texts_and_embeddings and"
+                    " remove_texts instead of mutating texts directly."
+                ) from exc
+            matrix = cast("np.ndarray", self._get_matrix())
+            for i, row in zip(released, rows, strict=True):
+                self.texts[i].embedding = matrix[row].tolist()
+        self._normalized_matrix = None
+        self._capacity = 0
+        self._row_indices = None
+        super()._rebuild_embeddings()
+
+    def _compact_rows(self, keep: np.ndarray) -> None:
+        # Rewrite the files, since the mapping may be read-only
+        rows = np.array(cast("np.ndarray", self._get_matrix())[keep])
+        self._normalized_matrix = None
+        self._capacity = 0
+        self._row_indices = None
+        super()._compact_rows(keep)
+        if len(keep):
+            self._write_rows(0, rows)
+        else:
+            self.embeddings_path.unlink(missing_ok=True)
+        self.chunk_ids_path.write_text(
+            "".join(f"{getattr(self.texts[i], 'name', '')}\n" for i in keep),
+            encoding="utf-8",
+        )
+
+    def _get_embeddings(self, texts: Sequence[Embeddable]) -> np.ndarray:
+        if self._row_indices is None:
+            self._row_indices = {hash(t): i for i, t in enumerate(self.texts)}
+        matrix = cast("np.ndarray", self._get_matrix())
+        return matrix[[self._row_indices[hash(t)] for t in texts]]
+
+
+# Payload key referencing a text's document when documents are deduplicated
+DOC_REFERENCE_KEY = "dockey"
+# Matches how Text.doc is validated, so payloads round trip to the same type
+_DOC_ADAPTER: TypeAdapter[Doc | DocDetails] = TypeAdapter(
+    Annotated[Doc | DocDetails, Field(union_mode="left_to_right")]
+)
 
 
 class QdrantVectorStore(VectorStore):  # noqa: PLW1641  # TODO: add __hash__
@@ -284,7 +1538,36 @@ class QdrantVectorStore(VectorStore):  # noqa: PLW1641  # TODO: add __hash__
     )
     collection_name: str = Field(default_factory=lambda: f"paper-qa-{uuid.uuid4().hex}")
     vector_name: str | None = Field(default=None)
+    upsert_batch_size: int = Field(
+        default=256, ge=1, description="Number of points per upsert request."
+    )
+    max_concurrent_upserts: int = Field(
+        default=4, ge=1, description="Number of upsert requests to have in flight."
+    )
+    deduplicate_docs: bool = Field(
+        default=False,
+        description=(
+            "Opt-in flag to store each text's document metadata once in a companion"
+            " collection, with each point's payload only referencing its dockey."
+            " This avoids duplicating (possibly large) document details per chunk."
+        ),
+    )
+    server_side_mmr: bool = Field(
+        default=False,
+        description=(
+            "Opt-in flag to have Qdrant perform maximal marginal relevance (MMR)"
+            " selection, which requires Qdrant server 1.15 or later, so the"
+            " candidates' vectors aren't transferred. Otherwise, the candidates'"
+            " vectors are fetched for MMR to be performed locally."
+        ),
+    )
     _point_ids: set[str] | None = None
+    # Local cache of documents, keyed by dockey, used to rehydrate texts
+    _docs: dict[DocKey, Doc] = PrivateAttr(default_factory=dict)
+    # Point IDs of texts loaded from the collection, keyed by text hash,
+    # since Qdrant normalizes stored cosine vectors, so the loaded
+    # embeddings no longer give the IDs the points were upserted with
+    _loaded_point_ids: dict[int, str] = PrivateAttr(default_factory=dict)
 
     def __del__(self):
         """Cleanup async client connection."""
@@ -311,6 +1594,8 @@ class QdrantVectorStore(VectorStore):  # noqa: PLW1641  # TODO: add __hash__
             and self.collection_name == other.collection_name
             and self.vector_name == other.vector_name
             and self.client.init_options == other.client.init_options
+            and self.deduplicate_docs == other.deduplicate_docs
+            and self.server_side_mmr == other.server_side_mmr
             and self._point_ids == other._point_ids
         )
 
@@ -335,20 +1620,24 @@ class QdrantVectorStore(VectorStore):  # noqa: PLW1641  # TODO: add __hash__
 
         return self
 
+    @property
+    def docs_collection_name(self) -> str:
+        """Name of the companion collection holding documents when deduplicating."""
+        return f"{self.collection_name}-docs"
+
     async def _collection_exists(self) -> bool:
         return await self.client.collection_exists(self.collection_name)
 
-    @override
-    def clear(self) -> None:
-        """Synchronous clear method that matches parent class."""
-        super().clear()  # Clear the base class attributes first
+    @staticmethod
+    def _run_sync(coroutine: Coroutine[Any, Any, None]) -> None:
+        """Run a coroutine to completion from synchronous code."""
 
         # Create a new event loop in a new thread to avoid nested loop issues
         def run_async():
             new_loop = asyncio.new_event_loop()
             asyncio.set_event_loop(new_loop)
             try:
-                new_loop.run_until_complete(self.aclear())
+                new_loop.run_until_complete(coroutine)
             finally:
                 new_loop.close()
 
@@ -356,18 +1645,168 @@ class QdrantVectorStore(VectorStore):  # noqa: PLW1641  # TODO: add __hash__
         thread.start()
         thread.join()
 
+    @staticmethod
+    def _point_id(text: Embeddable) -> str:
+        return uuid.uuid5(uuid.NAMESPACE_URL, str(text.embedding)).hex
+
+    @staticmethod
+    def _doc_point_id(dockey: DocKey) -> str:
+        return uuid.uuid5(uuid.NAMESPACE_URL, f"dockey:{dockey}").hex
+
+    def _payload(self, text: Embeddable) -> dict[str, Any]:
+        if self.deduplicate_docs and isinstance(text, Text):
+            return text.model_dump(exclude={"embedding", "doc"}) | {
+                DOC_REFERENCE_KEY: text.doc.dockey
+            }
+        return text.model_dump(exclude={"embedding"})
+
+    async def _upsert_docs(self, texts: Iterable[Embeddable]) -> None:
+        """Store the documents of texts not yet in the companion collection."""
+        new_docs = {
+            t.doc.dockey: t.doc
+            for t in texts
+            if isinstance(t, Text) and t.doc.dockey not in self._docs
+        }
+        if not new_docs:
+            return
+        if not await self.client.collection_exists(self.docs_collection_name):
+            await self.client.create_collection(
+                self.docs_collection_name, vectors_config={}
+            )
+        await self.client.upsert(
+            collection_name=self.docs_collection_name,
+            points=[
+                models.PointStruct(
+                    id=self._doc_point_id(dockey),
+                    payload=doc.model_dump(exclude={"embedding"}),
+                    vector={},
+                )
+                for dockey, doc in new_docs.items()
+            ],
+        )
+        self._docs.update(new_docs)
+
+    async def _fetch_docs(self, payloads: Iterable[dict[str, Any] | None]) -> None:
+        """Fetch into the local cache documents referenced by payloads but not cached."""
+        missing = {
+            payload[DOC_REFERENCE_KEY]
+            for payload in payloads
+            if payload
+            and "doc" not in payload
+            and DOC_REFERENCE_KEY in payload
+            and payload[DOC_REFERENCE_KEY] not in self._docs
+        }
+        if not missing or not await self.client.collection_exists(
+            self.docs_collection_name
+        ):
+            return
+        records = await self.client.retrieve(
+            collection_name=self.docs_collection_name,
+            ids=[self._doc_point_id(dockey) for dockey in missing],
+            with_payload=True,
+            with_vectors=False,
+        )
+        for record in records:
+            if record.payload:
+                doc = _DOC_ADAPTER.validate_python(record.payload)
+                self._docs[doc.dockey] = doc
+
+    def _rehydrate(self, payload: dict[str, Any]) -> dict[str, Any] | None:
+        """Replace a payload's dockey reference with its cached document.
+
+        Returns:
+            The payload, or None if its referenced document wasn't found
+                (e.g. the companion collection is missing or incomplete).
+        """
+        if "doc" in payload or DOC_REFERENCE_KEY not in payload:
+            return payload
+        payload = dict(payload)
+        dockey = payload.pop(DOC_REFERENCE_KEY)
+        if dockey not in self._docs:
+            logger.warning(
+                f"Skipping point of text {payload.get('name')!r}, as its document"
+                f" {dockey!r} isn't in collection {self.docs_collection_name!r}."
+            )
+            return None
+        payload["doc"] = self._docs[dockey]
+        return payload
+
+    @override
+    def clear(self) -> None:
+        """Synchronous clear method that matches parent class."""
+        super().clear()  # Clear the base class attributes first
+        self._run_sync(self.aclear())
+
     async def aclear(self) -> None:
         """Asynchronous clear implementation."""
         if not await self._collection_exists():
             return
 
         await self.client.delete_collection(collection_name=self.collection_name)
+        if await self.client.collection_exists(self.docs_collection_name):
+            await self.client.delete_collection(self.docs_collection_name)
         self._point_ids = None
+        self._docs.clear()
+        self._loaded_point_ids.clear()
 
-    async def add_texts_and_embeddings(self, texts: Iterable[Embeddable]) -> None:
-        await super().add_texts_and_embeddings(texts)
+    @override
+    async def aremove_texts(self, texts: Iterable[Embeddable]) -> None:
+        """Asynchronously delete the texts' points, ignoring texts not in the store.
+
+        Only asynchronous removal is supported, since the client is async.
+        """
+        texts = [t for t in texts if t in self]
+        if not texts or not await self._collection_exists():
+            return
+        self.texts_hashes.difference_update(hash(t) for t in texts)
+        ids = [self._loaded_point_ids.pop(hash(t), self._point_id(t)) for t in texts]
+        await self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=models.PointIdsList(points=ids),
+        )
+        if self._point_ids is not None:
+            self._point_ids.difference_update(ids)
+        if self.deduplicate_docs:
+            await self._delete_unreferenced_docs(
+                {t.doc.dockey for t in texts if isinstance(t, Text)}
+            )
+
+    async def _delete_unreferenced_docs(self, dockeys: Iterable[DocKey]) -> None:
+        """Delete documents no longer referenced by any point from the collection."""
+        if not await self.client.collection_exists(self.docs_collection_name):
+            return
+        unreferenced = [
+            dockey
+            for dockey in dockeys
+            if not (
+                await self.client.count(
+                    collection_name=self.collection_name,
+                    count_filter=models.Filter(
+                        must=[
+                            models.FieldCondition(
+                                key=DOC_REFERENCE_KEY,
+                                match=models.MatchValue(value=dockey),
+                            )
+                        ]
+                    ),
+                    exact=True,
+                )
+            ).count
+        ]
+        if not unreferenced:
+            return
+        await self.client.delete(
+            collection_name=self.docs_collection_name,
+            points_selector=models.PointIdsList(
+                points=[self._doc_point_id(dockey) for dockey in unreferenced]
+            ),
+        )
+        for dockey in unreferenced:
+            self._docs.pop(dockey, None)
 
+    async def add_texts_and_embeddings(self, texts: Iterable[Embeddable]) -> None:
         texts_list = list(texts)
+        await super().add_texts_and_embeddings(texts_list)
 
         if texts_list and not await self._collection_exists():
             params = models.VectorParams(
@@ -382,64 +1821,168 @@ class QdrantVectorStore(VectorStore):  # noqa: PLW1641  # TODO: add __hash__
                 ),
             )
 
-        ids, payloads, vectors = [], [], []
-        for text in texts_list:
-            ids.append(uuid.uuid5(uuid.NAMESPACE_URL, str(text.embedding)).hex)
-            payloads.append(text.model_dump(exclude={"embedding"}))
-            vectors.append(
-                {self.vector_name: text.embedding}
-                if self.vector_name
-                else text.embedding
-            )
+        if self.deduplicate_docs:
+            # Store documents before the points referencing them
+            await self._upsert_docs(texts_list)
+        point_ids = self._point_ids = self._point_ids or set()
 
-        await self.client.upsert(
-            collection_name=self.collection_name,
-            points=[
-                models.PointStruct(
-                    id=some_id,
-                    payload=some_payload,
-                    vector=some_vector,
-                )
-                for some_id, some_payload, some_vector in zip(
-                    ids, payloads, vectors, strict=True
-                )
-            ],
+        async def upsert(batch: list[Embeddable]) -> None:
+            ids = [self._point_id(text) for text in batch]
+            await self.client.upsert(
+                collection_name=self.collection_name,
+                points=[
+                    models.PointStruct(
+                        id=some_id,
+                        payload=self._payload(text),
+                        vector=(
+                            {self.vector_name: text.embedding}
+                            if self.vector_name
+                            else text.embedding
+                        ),
+                    )
+                    for some_id, text in zip(ids, batch, strict=True)
+                ],
+            )
+            point_ids.update(ids)
+
+        # Points are built per batch as it's sent, bounding the memory in flight
+        await gather_with_concurrency(
+            self.max_concurrent_upserts,
+            (
+                upsert(texts_list[i : i + self.upsert_batch_size])
+                for i in range(0, len(texts_list), self.upsert_batch_size)
+            ),
         )
-        self._point_ids = set(ids)
 
     async def similarity_search(
         self, query: str, k: int, embedding_model: EmbeddingModel
     ) -> tuple[Sequence[Embeddable], list[float]]:
-        if not await self._collection_exists():
-            return ([], [])
+        return (await self.similarity_search_batch([query], k, embedding_model))[0]
 
-        embedding_model.set_mode(EmbeddingModes.QUERY)
-        np_query = np.array((await embedding_model.embed_documents([query]))[0])
-        embedding_model.set_mode(EmbeddingModes.DOCUMENT)
+    async def similarity_search_batch(
+        self, queries: Sequence[str], k: int, embedding_model: EmbeddingModel
+    ) -> list[tuple[Sequence[Embeddable], list[float]]]:
+        """Perform similarity search for each query in one request."""
+        return await self._query_batch(queries, k, embedding_model, with_vectors=True)
 
-        points = (
-            await self.client.query_points(
-                collection_name=self.collection_name,
-                query=np_query,
-                using=self.vector_name,
-                limit=k,
-                with_vectors=True,
-                with_payload=True,
+    @override
+    async def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int,
+        fetch_k: int,
+        embedding_model: EmbeddingModel,
+        partitioning_fn: Callable[[Embeddable], int] | None = None,
+        lexical_weight: float = 0.0,
+    ) -> tuple[Sequence[Embeddable], list[float]]:
+        return (
+            await self.max_marginal_relevance_search_batch(
+                [query], k, fetch_k, embedding_model, partitioning_fn, lexical_weight
             )
-        ).points
+        )[0]
 
-        return (
-            [
-                Text(
-                    **p.payload,
-                    embedding=(
-                        p.vector[self.vector_name] if self.vector_name else p.vector
+    @override
+    async def max_marginal_relevance_search_batch(
+        self,
+        queries: Sequence[str],
+        k: int,
+        fetch_k: int,
+        embedding_model: EmbeddingModel,
+        partitioning_fn: Callable[[Embeddable], int] | None = None,
+        lexical_weight: float = 0.0,
+    ) -> list[tuple[Sequence[Embeddable], list[float]]]:
+        """Perform MMR search for each query, only fetching vectors if MMR needs them.
+
+        Without MMR, points are fetched without their vectors. With MMR, either
+        Qdrant selects the points (see server_side_mmr) or the candidates'
+        vectors are fetched to select them locally.
+        """
+        if (
+            type(self).max_marginal_relevance_search
+            is not QdrantVectorStore.max_marginal_relevance_search
+        ):
+            return await self._max_marginal_relevance_search_per_query(
+                queries, k, fetch_k, embedding_model, partitioning_fn, lexical_weight
+            )
+        if partitioning_fn is not None or lexical_weight > 0.0:
+            return await self._max_marginal_relevance_search_batch(
+                queries, k, fetch_k, embedding_model, partitioning_fn, lexical_weight
+            )
+        if fetch_k < k:
+            raise ValueError("fetch_k must be greater or equal to k")
+
+        if self.mmr_lambda >= 1.0 or fetch_k <= k:
+            return await self._query_batch(
+                queries, fetch_k, embedding_model, with_vectors=False
+            )
+        if self.server_side_mmr:
+            return await self._query_batch(
+                queries,
+                k,
+                embedding_model,
+                with_vectors=False,
+                mmr=models.Mmr(
+                    diversity=1.0 - self.mmr_lambda, candidates_limit=fetch_k
+                ),
+            )
+        return [
+            self._select_by_mmr(texts, scores, k)
+            for texts, scores in await self._query_batch(
+                queries, fetch_k, embedding_model, with_vectors=True
+            )
+        ]
+
+    async def _query_batch(
+        self,
+        queries: Sequence[str],
+        limit: int,
+        embedding_model: EmbeddingModel,
+        with_vectors: bool,
+        mmr: "models.Mmr | None" = None,
+    ) -> list[tuple[Sequence[Embeddable], list[float]]]:
+        """Query points for each query in one request, optionally with their vectors."""
+        if not queries or not await self._collection_exists():
+            return [([], []) for _ in queries]
+
+        np_queries = await self._embed_queries(queries, embedding_model)
+        responses = await self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=[
+                models.QueryRequest(
+                    query=(
+                        np_query.tolist()
+                        if mmr is None
+                        else models.NearestQuery(nearest=np_query.tolist(), mmr=mmr)
                     ),
+                    using=self.vector_name,
+                    limit=limit,
+                    with_vector=with_vectors,
+                    with_payload=True,
                 )
-                for p in points
+                for np_query in np_queries
             ],
-            [p.score for p in points],
         )
+        await self._fetch_docs(p.payload for r in responses for p in r.points)
+        return [self._points_to_texts(r.points) for r in responses]
+
+    def _points_to_texts(self, points: Sequence[Any]) -> tuple[list[Text], list[float]]:
+        texts: list[Text] = []
+        scores: list[float] = []
+        for p in points:
+            if (payload := self._rehydrate(p.payload)) is None:
+                continue
+            texts.append(
+                Text(
+                    **payload,
+                    embedding=(
+                        p.vector[self.vector_name]
+                        if self.vector_name and p.vector is not None
+                        else p.vector
+                    ),
+                )
+            )
+            scores.append(p.score)
+        return texts, scores
 
     @classmethod
     async def load_docs(
@@ -448,79 +1991,209 @@ class QdrantVectorStore(VectorStore):  # noqa: PLW1641  # TODO: add __hash__
         collection_name: str,
         vector_name: str | None = None,
         batch_size: int = 100,
-        max_concurrent_requests: int = 5,
+        max_concurrent_requests: int | None = None,
     ) -> "Docs":
+        """Load a Docs from a collection, streaming its points a page at a time.
+
+        Pages are fetched by following scroll cursors, fetching the next page
+        while the current page is added to the Docs, so at most two pages of
+        points are held at once.
+        """
         from paperqa.docs import Docs  # Avoid circular imports
 
+        if max_concurrent_requests is not None:
+            warnings.warn(
+                "The 'max_concurrent_requests' argument is deprecated and ignored,"
+                " as pages are fetched in order following scroll cursors,"
+                " this deprecation will conclude in version 6.",
+                category=DeprecationWarning,
+                stacklevel=2,
+            )
+
         vectorstore = cls(
             client=client, collection_name=collection_name, vector_name=vector_name
         )
+        # Points of a collection with documents stored once only reference them
+        vectorstore.deduplicate_docs = await client.collection_exists(
+            vectorstore.docs_collection_name
+        )
         docs = Docs(texts_index=vectorstore)
 
-        collection_info = await client.get_collection(collection_name)
-        total_points = collection_info.points_count or 0
-
-        semaphore = asyncio.Semaphore(max_concurrent_requests)
-        all_points: list[Record] = []
-
-        async def fetch_batch_with_semaphore(offset: int) -> None:
-            async with semaphore:
-                points = await client.scroll(
+        def fetch_page(
+            offset: "ExtendedPointId | None",
+        ) -> "asyncio.Task[tuple[list[Record], ExtendedPointId | None]]":
+            return asyncio.create_task(
+                client.scroll(
                     collection_name=collection_name,
                     limit=batch_size,
                     offset=offset,
                     with_payload=True,  # noqa: FURB120
                     with_vectors=True,
                 )
-                all_points.extend(points[0])
-
-        tasks = [
-            fetch_batch_with_semaphore(offset)
-            for offset in range(0, total_points, batch_size)
-        ]
-        await asyncio.gather(*tasks)
+            )
 
-        for point in all_points:
-            try:
-                if point.payload is None:
+        next_page: asyncio.Task | None = fetch_page(None)
+        while next_page is not None:
+            points, next_offset = await next_page
+            next_page = None if next_offset is None else fetch_page(next_offset)
+            await vectorstore._fetch_docs(p.payload for p in points)
+            for point in points:
+                try:
+                    text = vectorstore._point_to_text(docs, point)
+                except KeyError as e:
+                    logger.warning(
+                        f"Skipping invalid point due to missing field: {e!s}"
+                    )
                     continue
+                if text is not None:
+                    docs.texts.append(text)
+                    # Already stored, so don't upsert it again upon retrieval
+                    vectorstore.texts_hashes.add(hash(text))
+                    vectorstore._loaded_point_ids[hash(text)] = str(point.id)
 
-                payload = point.payload
-                doc_data = payload.get("doc", {})
-                if not isinstance(doc_data, dict):
-                    continue
+        return docs
 
-                if doc_data.get("dockey") not in docs.docs:
-                    docs.docs[doc_data["dockey"]] = Doc(
-                        docname=doc_data.get("docname", ""),
-                        citation=doc_data.get("citation", ""),
-                        dockey=doc_data["dockey"],
-                        content_hash=doc_data.get("content_hash", AUTOPOPULATE_VALUE),
-                    )
-                    docs.docnames.add(doc_data.get("docname", ""))
+    def _point_to_text(self, docs: "Docs", point: "Record") -> Text | None:
+        """Convert a point to a Text, adding its Doc to the Docs if new."""
+        if point.payload is None:
+            return None
+
+        payload = self._rehydrate(point.payload)
+        if payload is None:
+            return None
+        doc_data = payload.get("doc", {})
+        if isinstance(doc_data, Doc):
+            # Deduplicated documents are used as stored
+            doc = docs.docs.setdefault(doc_data.dockey, doc_data)
+        elif isinstance(doc_data, dict):
+            if doc_data.get("dockey") not in docs.docs:
+                docs.docs[doc_data["dockey"]] = Doc(
+                    docname=doc_data.get("docname", ""),
+                    citation=doc_data.get("citation", ""),
+                    dockey=doc_data["dockey"],
+                    content_hash=doc_data.get("content_hash", AUTOPOPULATE_VALUE),
+                )
+            doc = docs.docs[doc_data["dockey"]]
+        else:
+            return None
+        docs.docnames.add(doc.docname)
 
-                if point.vector is None:
-                    continue
+        if point.vector is None:
+            return None
 
-                vector_value = (
-                    point.vector.get(vector_name)
-                    if vector_name and isinstance(point.vector, dict)
-                    else point.vector
-                )
+        vector_value = (
+            point.vector.get(self.vector_name)
+            if self.vector_name and isinstance(point.vector, dict)
+            else point.vector
+        )
 
-                text = Text(
-                    text=payload.get("text", ""),
-                    name=payload.get("name", ""),
-                    doc=docs.docs[doc_data["dockey"]],
-                    embedding=vector_value,
-                )
-                docs.texts.append(text)
+        return Text(
+            text=payload.get("text", ""),
+            name=payload.get("name", ""),
+            doc=doc,
+            embedding=vector_value,
+        )
 
-            except KeyError as e:
-                logger.warning(f"Skipping invalid point due to missing field: {e!s}")
-                continue
 
-        return docs
+def batch_by_tokens(texts: Sequence[str], token_limit: float) -> list[list[str]]:
+    """Group consecutive texts into batches within an estimated token limit.
+
+    A text estimated to exceed the limit on its own gets its own batch.
+    """
+    batches: list[list[str]] = []
+    batch: list[str] = []
+    batch_tokens = 0.0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if batch and batch_tokens + tokens > token_limit:
+            batches.append(batch)
+            batch, batch_tokens = [], 0.0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+# Transient errors worth retrying an embedding batch upon,
+# as other errors (e.g. authentication or validation) would fail again
+RETRYABLE_EMBEDDING_ERRORS: tuple[type[Exception], ...] = (
+    litellm.RateLimitError,
+    litellm.Timeout,
+    litellm.APIConnectionError,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+async def embed_texts(
+    embedding_model: EmbeddingModel,
+    texts: list[str],
+    cache: LRUCache[np.ndarray] | None = None,
+    batch_token_limit: float | None = None,
+    concurrency: int = 1,
+    max_attempts: int = 3,
+) -> list[list[float]]:
+    """Embed texts as documents in concurrent batches, with an optional cache.
+
+    Args:
+        embedding_model: Model to embed the texts.
+        texts: Texts to embed.
+        cache: Optional cache keyed on embedding model fingerprint
+            (see embedding_model_fingerprint), mode, and text,
+            so unchanged texts (e.g. upon re-adding a paper) aren't re-embedded.
+        batch_token_limit: Optional limit on estimated tokens per batch,
+            default is to embed all texts in one batch.
+        concurrency: Maximum number of batches being embedded at once.
+        max_attempts: Attempts per batch, so one batch failing upon a transient
+            error (see RETRYABLE_EMBEDDING_ERRORS) is retried without re-embedding
+            the other batches.
+
+    Returns:
+        Embeddings in the same order as the texts.
+    """
+
+    @retry(
+        retry=retry_if_exception_type(RETRYABLE_EMBEDDING_ERRORS),
+        stop=stop_after_attempt(max_attempts),
+        wait=wait_random_exponential(multiplier=0.5, max=10),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True,
+    )
+    async def embed_batch(batch: list[str]) -> list[list[float]]:
+        return await embedding_model.embed_documents(batch)
+
+    async def embed(to_embed: list[str]) -> list[list[float]]:
+        batches = (
+            [to_embed]
+            if batch_token_limit is None
+            else batch_by_tokens(to_embed, batch_token_limit)
+        )
+        return list(
+            itertools.chain.from_iterable(
+                await gather_with_concurrency(
+                    concurrency, (embed_batch(b) for b in batches if b)
+                )
+            )
+        )
+
+    if cache is None:
+        return await embed(texts)
+    fingerprint = embedding_model_fingerprint(embedding_model)
+    keys = [(fingerprint, EmbeddingModes.DOCUMENT.value, t) for t in texts]
+    cached = await cache.aget_many(keys)
+    embeddings = [None if c is None else c.tolist() for c in cached]
+    missing = [i for i, c in enumerate(cached) if c is None]
+    if missing:
+        new_embeddings = await embed([texts[i] for i in missing])
+        for i, embedding in zip(missing, new_embeddings, strict=True):
+            embeddings[i] = embedding
+        # Stored as float32 to keep the cache compact
+        await cache.aset_many(
+            (keys[i], np.asarray(embedding, dtype=np.float32))
+            for i, embedding in zip(missing, new_embeddings, strict=True)
+        )
+    return cast("list[list[float]]", embeddings)
 
 
 def embedding_model_factory(embedding: str, **kwargs) -> EmbeddingModel:
@@ -1,19 +1,46 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
+import contextlib
 import os
-from collections.abc import Awaitable, Callable
+import re
+import threading
+import weakref
+from collections.abc import (
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+)
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import cache, partial
 from importlib.metadata import version
-from math import ceil
+from itertools import islice, pairwise
+from math import ceil, floor
 from pathlib import Path
-from typing import Literal, Protocol, TypeAlias, cast, overload, runtime_checkable
+from typing import (
+    Any,
+    Literal,
+    Protocol,
+    TypeAlias,
+    cast,
+    overload,
+    runtime_checkable,
+)
 
 import anyio
+import numpy as np
 import tiktoken
 from aviary.core import is_coroutine_callable
 from html2text import __version__ as html2text_version
 from html2text import html2text
 
+from paperqa.caches import LRUCache
 from paperqa.types import (
     ChunkMetadata,
     Doc,
@@ -22,7 +49,7 @@ from paperqa.types import (
     ParsedText,
     Text,
 )
-from paperqa.utils import ImpossibleParsingError
+from paperqa.utils import ImpossibleParsingError, md5sum
 from paperqa.version import __version__ as pqa_version
 
 
@@ -54,6 +81,21 @@ class AsyncPDFParserFn(Protocol):
 
 PDFParserFn: TypeAlias = SyncPDFParserFn | AsyncPDFParserFn
 
+PageContents: TypeAlias = str | tuple[str, list[ParsedMedia]]
+
+
+@runtime_checkable
+class PDFPageIteratorFn(Protocol):
+    """Protocol for parsing a PDF page by page, yielding each page once parsed."""
+
+    def __call__(
+        self,
+        path: str | os.PathLike,
+        page_size_limit: int | None = None,
+        page_range: int | tuple[int, int] | None = None,
+        **kwargs,
+    ) -> Iterator[tuple[str, PageContents]]: ...
+
 
 def resolve_page_range(
     page_range: int | tuple[int, int] | None, page_count: int
@@ -90,11 +132,15 @@ async def parse_image(
 
 
 def _make_chunk(
-    parsed_text: ParsedText, doc: Doc, text: str, lower_page: str, upper_page: str
+    pages: Mapping[str, PageContents],
+    doc: Doc,
+    text: str,
+    lower_page: str,
+    upper_page: str,
 ) -> Text:
     media: list[ParsedMedia] = []
     for pg_num in range(int(lower_page), int(upper_page) + 1):
-        pg_contents = cast(dict, parsed_text.content).get(str(pg_num))
+        pg_contents = pages.get(str(pg_num))
         if isinstance(pg_contents, tuple):
             media.extend(pg_contents[1])
     # pretty formatting of pages (e.g. 1-3, 4, 5-7)
@@ -102,45 +148,115 @@ def _make_chunk(
     return Text(text=text, name=f"{doc.docname} pages {name}", media=media, doc=doc)
 
 
-def chunk_pdf(
-    parsed_text: ParsedText, doc: Doc, chunk_chars: int, overlap: int
-) -> list[Text]:
-    pages: list[str] = []
-    texts: list[Text] = []
-    split: str = ""
+def iter_chunk_pages(
+    pages: Iterable[tuple[str, PageContents]],
+    doc: Doc,
+    chunk_chars: int,
+    overlap: int,
+) -> Generator[Text, None, None]:
+    """Chunk pages as they arrive, yielding each chunk once its pages are complete.
 
-    if not isinstance(parsed_text.content, dict):
-        raise NotImplementedError(
-            f"ParsedText.content must be a `dict`, not {type(parsed_text.content)}."
+    Chunks are taken as offsets into the pages' joined text, and only the text
+    from the next chunk's start on (and its pages) is held, so pages can come
+    from a parser that's still parsing the document.
+
+    Args:
+        pages: Two-tuples of page number and page contents, in page order.
+        doc: The document the pages are from.
+        chunk_chars: Size of chunks.
+        overlap: Size of overlap between chunks.
+    """
+    # Page texts from the next chunk's start on, joined only upon taking chunks
+    held_texts: list[str] = []
+    # Contents of pages from the lower page on, for their media
+    held_pages: dict[str, PageContents] = {}
+    held_start = 0  # Offset of the held text
+    start = 0  # Offset of the next chunk
+    end = 0  # Offset of the current page's end
+    lower_page: str | None = None
+    page_num: str | None = None
+    chunked = False
+    for page_num, page_contents in pages:
+        if lower_page is None:
+            lower_page = page_num
+        held_pages[page_num] = page_contents
+        page_text = (
+            page_contents if isinstance(page_contents, str) else page_contents[0]
         )
+        held_texts.append(page_text)
+        end += len(page_text)
+        # The remaining text could be so long it needs to be split
+        # into multiple chunks. Or it could be so short
+        # that it needs to be combined with the next page.
+        if end - start <= chunk_chars:
+            continue
+        held_text = "".join(held_texts)
+        while end - start > chunk_chars:
+            yield _make_chunk(
+                held_pages,
+                doc,
+                held_text[start - held_start : start - held_start + chunk_chars],
+                lower_page,
+                page_num,
+            )
+            chunked = True
+            start += chunk_chars - overlap
+            lower_page = page_num
+            held_pages = {page_num: page_contents}
+        held_texts = [held_text[start - held_start :]]
+        held_start = start
 
-    if not parsed_text.content:
+    if lower_page is None or page_num is None:
         raise ImpossibleParsingError(
             f"No text was parsed from the document named {doc.docname!r} with ID"
             f" {doc.dockey}, either empty or corrupted."
         )
+    if end - start > overlap or not chunked:
+        yield _make_chunk(
+            held_pages, doc, "".join(held_texts)[:chunk_chars], lower_page, page_num
+        )
 
-    for page_num, page_contents in parsed_text.content.items():
-        page_text = (
-            page_contents if isinstance(page_contents, str) else page_contents[0]
+
+def chunk_pdf(
+    parsed_text: ParsedText, doc: Doc, chunk_chars: int, overlap: int
+) -> list[Text]:
+    if not isinstance(parsed_text.content, dict):
+        raise NotImplementedError(
+            f"ParsedText.content must be a `dict`, not {type(parsed_text.content)}."
         )
-        split += page_text
-        pages.append(page_num)
-        # split could be so long it needs to be split
-        # into multiple chunks. Or it could be so short
-        # that it needs to be combined with the next chunk.
-        while len(split) > chunk_chars:
-            texts.append(
-                _make_chunk(parsed_text, doc, split[:chunk_chars], pages[0], pages[-1])
-            )
-            split = split[chunk_chars - overlap :]
-            pages = [page_num]
 
-    if len(split) > overlap or not texts:
-        texts.append(
-            _make_chunk(parsed_text, doc, split[:chunk_chars], pages[0], pages[-1])
+    return list(
+        iter_chunk_pages(
+            parsed_text.content.items(), doc, chunk_chars=chunk_chars, overlap=overlap
         )
-    return texts
+    )
+
+
+# Some PDF parsers are not thread-safe, so PDF parsing in threads is serialized
+PDF_PARSING_LOCK = threading.Lock()
+
+# Number of characters to decode at a time when streaming a text file
+TEXT_BLOCK_CHARS = 1_000_000
+# Number of chunks to take per thread call when streaming a text file's chunks
+STREAM_CHUNK_BATCH_SIZE = 64
+
+
+def iter_text_blocks(
+    path: str | os.PathLike,
+    split_lines: bool = False,
+    block_chars: int = TEXT_BLOCK_CHARS,
+) -> Generator[str, None, None]:
+    """Incrementally decode a text file as UTF-8, dropping undecodable bytes.
+
+    Args:
+        path: path to file.
+        split_lines: flag to yield lines, with lines longer than block_chars
+            yielded in pieces.
+        block_chars: maximum number of characters per yielded block.
+    """
+    with Path(path).open(encoding="utf-8", errors="ignore") as f:
+        while block := f.readline(block_chars) if split_lines else f.read(block_chars):
+            yield block
 
 
 def parse_text(
@@ -160,12 +276,9 @@ def parse_text(
             relevant when split_lines is True.
     """
     path = Path(path)
-    try:
-        with path.open() as f:
-            text = list(f) if split_lines else f.read()
-    except UnicodeDecodeError:
-        with path.open(encoding="utf-8", errors="ignore") as f:
-            text = f.read()
+    # Decode in one pass, dropping undecodable bytes instead of reading twice
+    with path.open(encoding="utf-8", errors="ignore") as f:
+        text: str | list[str] = list(f) if split_lines else f.read()
 
     parsing_libraries: list[str] = []
     if html:
@@ -183,7 +296,7 @@ def parse_text(
     else:
         total_length = sum(len(t) for t in text)
         for i, t in enumerate(text):
-            if page_size_limit and len(text) > page_size_limit:
+            if page_size_limit and len(t) > page_size_limit:
                 raise ImpossibleParsingError(
                     f"The {parse_summary} on page {i} of {len(text)} was {len(t)} chars"
                     f" long, which exceeds the {page_size_limit} char limit at path"
@@ -255,107 +368,300 @@ def parse_office_doc(
     )
 
 
+# Split points for tokenizing text in pieces, after a line break and before
+# non-whitespace, where tiktoken's pre-tokenization also splits the whole text,
+# so the pieces' tokens are the same as the whole text's tokens
+_TOKENIZATION_SPLIT_POINT = re.compile(r"(?<=\n)\S")
+# Minimum size of a piece when tokenizing text in pieces concurrently
+MIN_TOKENIZATION_PIECE_CHARS = 1_000_000
+_UTF8_CONTINUATION_BYTES = range(0x80, 0xC0)
+
+
+def _encode_text(enc: tiktoken.Encoding, text: str, num_workers: int = 1) -> np.ndarray:
+    """Tokenize the text, concurrently in pieces if it's long enough."""
+    n_pieces = min(num_workers * 4, len(text) // MIN_TOKENIZATION_PIECE_CHARS)
+    if num_workers <= 1 or n_pieces <= 1:
+        return enc.encode_to_numpy(text, disallowed_special=())
+    starts = [0]
+    piece_chars = ceil(len(text) / n_pieces)
+    for target in range(piece_chars, len(text), piece_chars):
+        split_point = _TOKENIZATION_SPLIT_POINT.search(
+            text, max(target, starts[-1] + 1)
+        )
+        if split_point is None:
+            break
+        starts.append(split_point.start())
+    pieces = [text[start:end] for start, end in pairwise([*starts, len(text)])]
+    # tiktoken releases the GIL while tokenizing, so threads tokenize in parallel
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        return np.concatenate(
+            list(
+                executor.map(
+                    partial(enc.encode_to_numpy, disallowed_special=()), pieces
+                )
+            )
+        )
+
+
+@cache
+def _token_byte_lengths(encoding_name: str) -> np.ndarray:
+    """Get the UTF-8 byte length of each token in an encoding's vocabulary."""
+    enc = tiktoken.get_encoding(encoding_name)
+    lengths = np.zeros(enc.n_vocab, dtype=np.int64)
+    for token in range(enc.n_vocab):
+        with contextlib.suppress(KeyError):  # Not every value is a token
+            lengths[token] = len(enc.decode_single_token_bytes(token))
+    return lengths
+
+
+def _byte_to_char_offsets(text: str, byte_offsets: Iterable[int]) -> dict[int, int]:
+    """Map UTF-8 byte offsets into the text to character offsets.
+
+    A byte offset within a multibyte character maps to the character's start.
+    """
+    if text.isascii():
+        return {offset: offset for offset in byte_offsets}
+    encoded = text.encode("utf-8", errors="surrogatepass")
+    char_offsets: dict[int, int] = {}
+    last_byte = last_char = 0
+    for byte_offset in sorted(set(byte_offsets)):
+        start = byte_offset
+        while 0 < start < len(encoded) and encoded[start] in _UTF8_CONTINUATION_BYTES:
+            start -= 1  # Move back from a continuation byte
+        last_char += len(
+            encoded[last_byte:start].decode("utf-8", errors="surrogatepass")
+        )
+        last_byte = start
+        char_offsets[byte_offset] = last_char
+    return char_offsets
+
+
+def _token_to_char_offsets(
+    enc: tiktoken.Encoding,
+    text: str,
+    tokens: np.ndarray,
+    token_offsets: Iterable[int],
+) -> dict[int, int]:
+    """Map offsets into the text's tokens to character offsets into the text."""
+    token_byte_offsets = np.concatenate(
+        ([0], np.cumsum(_token_byte_lengths(enc.name)[tokens]))
+    )
+    token_offsets = set(token_offsets)
+    char_offsets = _byte_to_char_offsets(
+        text, (int(token_byte_offsets[t]) for t in token_offsets)
+    )
+    return {t: char_offsets[int(token_byte_offsets[t])] for t in token_offsets}
+
+
 def chunk_text(
     parsed_text: ParsedText,
     doc: Doc,
     chunk_chars: int,
     overlap: int,
     use_tiktoken: bool = True,
+    num_workers: int = min(os.cpu_count() or 1, 4),
 ) -> list[Text]:
     """Parse a document into chunks, based on tiktoken encoding.
 
-    NOTE: We get some byte continuation errors.
-    Currently ignored, but should explore more to make sure we don't miss anything.
-    """
-    texts: list[Text] = []
-    enc = tiktoken.get_encoding("cl100k_base")
+    Chunks are cut at token boundaries, then sliced from the parsed text,
+    so a character whose bytes span two tokens is kept whole in one chunk.
 
+    Args:
+        parsed_text: Parsed text to chunk.
+        doc: The document the text is from.
+        chunk_chars: Size of chunks.
+        overlap: Size of overlap between chunks.
+        use_tiktoken: Set False to chunk by characters, instead of tokens.
+        num_workers: Number of threads for tokenizing text of at least
+            two pieces of MIN_TOKENIZATION_PIECE_CHARS, default targets 4 threads.
+    """
     if not isinstance(parsed_text.content, str):
         raise NotImplementedError(
             f"ParsedText.content must be a `str`, not {type(parsed_text.content)}."
         )
-
-    content: str | list[int] = (
-        parsed_text.content
-        if not use_tiktoken
-        # we tokenize using tiktoken so cuts are in reasonable places
-        else cast(list[int], parsed_text.encode_content(enc))
-    )
-    if not content:  # Avoid div0 in token calculations
-        raise ImpossibleParsingError(
-            f"No text was parsed from the document named {doc.docname!r} with ID"
-            f" {doc.dockey}, either empty or corrupted."
+    # Chunk the whole text as one window
+    return list(
+        iter_chunk_text(
+            [parsed_text.content],
+            doc,
+            chunk_chars=chunk_chars,
+            overlap=overlap,
+            use_tiktoken=use_tiktoken,
+            num_workers=num_workers,
+            window_chars=len(parsed_text.content) + 1,
         )
+    )
+
+
+def _last_tokenization_split_point(text: str) -> int | None:
+    """Get the last index of a `_TOKENIZATION_SPLIT_POINT` in the text, if any."""
+    newline = text.rfind("\n", 0, len(text) - 1)
+    while newline >= 0 and text[newline + 1].isspace():
+        newline = text.rfind("\n", 0, newline)
+    return newline + 1 if newline >= 0 else None
+
+
+def iter_chunk_text(
+    blocks: Iterable[str],
+    doc: Doc,
+    chunk_chars: int,
+    overlap: int,
+    use_tiktoken: bool = True,
+    num_workers: int = min(os.cpu_count() or 1, 4),
+    window_chars: int = 8 * TEXT_BLOCK_CHARS,
+) -> Generator[Text, None, None]:
+    """Lazily chunk streamed blocks of text, based on tiktoken encoding.
+
+    Blocks are gathered into windows of about window_chars characters,
+    which are tokenized and chunked one at a time, carrying the text
+    not yet chunked over into the next window, so memory stays bounded.
+    The characters per token are estimated per window, so when the text
+    spans multiple windows, chunks can differ slightly from chunking it whole.
 
-    # convert from characters to chunks
-    char_count = parsed_text.metadata.total_parsed_text_length  # e.g., 25,000
-    token_count = len(content)  # e.g., 4,500
-    chars_per_token = char_count / token_count  # e.g., 5.5
-    chunk_tokens = chunk_chars / chars_per_token  # e.g., 3000 / 5.5 = 545
-    overlap_tokens = overlap / chars_per_token  # e.g., 100 / 5.5 = 18
-    chunk_count = ceil(token_count / chunk_tokens)  # e.g., 4500 / 545 = 9
+    Args:
+        blocks: Blocks of text to chunk, e.g. from `iter_text_blocks`.
+        doc: The document the text is from.
+        chunk_chars: Size of chunks.
+        overlap: Size of overlap between chunks.
+        use_tiktoken: Set False to chunk by characters, instead of tokens.
+        num_workers: Number of threads for tokenizing each window, see `chunk_text`.
+        window_chars: Number of characters to tokenize at a time.
+    """
+    enc = tiktoken.get_encoding("cl100k_base")
+    blocks = iter(blocks)
+    pending = ""  # Text not yet chunked
+    base = 0.0  # Token offset in the pending text where the next chunk begins
+    chunk_i = 0
+    exhausted = False
+    while not exhausted:
+        parts = [pending]
+        size = len(pending)
+        while size < window_chars or len(parts) == 1:
+            if (block := next(blocks, None)) is None:
+                exhausted = True
+                break
+            parts.append(block)
+            size += len(block)
+        window = "".join(parts)
+        del parts
+        # Hold back text after the last split point, since its tokens
+        # can change depending on the text in the next blocks,
+        # unless holding back most of the window (e.g. a very long line)
+        cut = None if exhausted else _last_tokenization_split_point(window)
+        if cut is not None and cut < len(window) // 2:
+            cut = None
+        text, held = (window, "") if cut is None else (window[:cut], window[cut:])
+        del window
 
-    for i in range(chunk_count):
-        split = content[
-            max(int(i * chunk_tokens - overlap_tokens), 0) : int(
-                (i + 1) * chunk_tokens + overlap_tokens
+        tokens = _encode_text(enc, text, num_workers) if use_tiktoken else None
+        token_count = len(tokens) if tokens is not None else len(text)
+        if not token_count:
+            if exhausted and not chunk_i:
+                raise ImpossibleParsingError(
+                    f"No text was parsed from the document named {doc.docname!r}"
+                    f" with ID {doc.dockey}, either empty or corrupted."
+                )
+            pending = held
+            continue
+        chars_per_token = len(text) / token_count
+        chunk_tokens = chunk_chars / chars_per_token
+        overlap_tokens = overlap / chars_per_token
+        if exhausted:
+            chunk_count = ceil((token_count - base) / chunk_tokens)
+        else:  # Chunks not ending before the window does wait for the next window
+            chunk_count = max(
+                floor((token_count - base - overlap_tokens) / chunk_tokens), 0
             )
+        bounds = [
+            (
+                max(int(base + i * chunk_tokens - overlap_tokens), 0),
+                min(int(base + (i + 1) * chunk_tokens + overlap_tokens), token_count),
+            )
+            for i in range(chunk_count)
         ]
-        texts.append(
-            Text(
-                text=(
-                    enc.decode(cast("list[int]", split))
-                    if use_tiktoken
-                    else cast("str", split)
-                ),
-                name=f"{doc.docname} chunk {i + 1}",
+        # Start of the next chunk, where the text carried over begins
+        carry = min(
+            max(int(base + chunk_count * chunk_tokens - overlap_tokens), 0),
+            token_count,
+        )
+        if tokens is not None:
+            char_offsets = _token_to_char_offsets(
+                enc, text, tokens, (*(b for bound in bounds for b in bound), carry)
+            )
+        else:
+            char_offsets = {offset: offset for bound in bounds for offset in bound}
+            char_offsets[carry] = carry
+        for start, end in bounds:
+            chunk_i += 1
+            yield Text(
+                text=text[char_offsets[start] : char_offsets[end]],
+                name=f"{doc.docname} chunk {chunk_i}",
+                doc=doc,
+            )
+        if not exhausted:
+            pending = text[char_offsets[carry] :] + held
+            base += chunk_count * chunk_tokens - carry
+
+
+def iter_chunk_code_text(
+    lines: Iterable[str], doc: Doc, chunk_chars: int, overlap: int
+) -> Generator[Text, None, None]:
+    """Lazily chunk lines of text (e.g. code), naming chunks by line numbers.
+
+    Only the text not yet chunked is held in memory, so lines can be streamed
+    (e.g. from `iter_text_blocks`). A piece of text not ending in a newline
+    is continued by the next piece, as part of the same line.
+    """
+    text_buffer = ""
+    yielded_any = False
+    line_i = last_line_i = next_line_i = 0
+    for line in lines:
+        line_i = next_line_i
+        if line.endswith("\n"):
+            next_line_i += 1
+        text_buffer += line
+        start = 0
+        while len(text_buffer) - start > chunk_chars:
+            yield Text(
+                text=text_buffer[start : start + chunk_chars],
+                name=f"{doc.docname} lines {last_line_i}-{line_i}",
                 doc=doc,
             )
+            yielded_any = True
+            start += chunk_chars - overlap
+            last_line_i = line_i
+        text_buffer = text_buffer[start:]
+    if (
+        len(text_buffer) > overlap  # Save meaningful amount of content as a final text
+        or not yielded_any  # Contents were smaller than one chunk, save it anyways
+    ):
+        yield Text(
+            text=text_buffer[:chunk_chars],
+            name=f"{doc.docname} lines {last_line_i}-{line_i}",
+            doc=doc,
         )
-    return texts
 
 
 def chunk_code_text(
     parsed_text: ParsedText, doc: Doc, chunk_chars: int, overlap: int
 ) -> list[Text]:
     """Parse a document into chunks, based on line numbers (for code)."""
-    text_buffer = ""
-    texts: list[Text] = []
-    line_i = last_line_i = 0
-
     if not isinstance(parsed_text.content, str | list):
         raise NotImplementedError(
             f"Didn't yet handle ParsedText.content of type {type(parsed_text.content)}."
         )
-
-    for line_i, line in enumerate(
-        [parsed_text.content]
-        if isinstance(parsed_text.content, str)
-        else parsed_text.content
-    ):
-        text_buffer += line
-        while len(text_buffer) > chunk_chars:
-            texts.append(
-                Text(
-                    text=text_buffer[:chunk_chars],
-                    name=f"{doc.docname} lines {last_line_i}-{line_i}",
-                    doc=doc,
-                )
-            )
-            text_buffer = text_buffer[chunk_chars - overlap :]
-            last_line_i = line_i
-    if (
-        len(text_buffer) > overlap  # Save meaningful amount of content as a final text
-        or not texts  # Contents were smaller than one chunk, save it anyways
-    ):
-        texts.append(
-            Text(
-                text=text_buffer[:chunk_chars],
-                name=f"{doc.docname} lines {last_line_i}-{line_i}",
-                doc=doc,
-            )
+    return list(
+        iter_chunk_code_text(
+            (
+                [parsed_text.content]
+                if isinstance(parsed_text.content, str)
+                else parsed_text.content
+            ),
+            doc,
+            chunk_chars=chunk_chars,
+            overlap=overlap,
         )
-    return texts
+    )
 
 
 IMAGE_EXTENSIONS = tuple({".png", ".jpg", ".jpeg"})
@@ -363,6 +669,313 @@ IMAGE_EXTENSIONS = tuple({".png", ".jpg", ".jpeg"})
 ENRICHMENT_EXTENSIONS = tuple({".pdf", ".docx", ".xlsx", ".pptx", *IMAGE_EXTENSIONS})
 
 
+def is_text_file(path: str | os.PathLike) -> bool:
+    """Check if a document is read as text (or code), so it can be streamed."""
+    return not str(path).endswith(
+        (".pdf", ".html", ".docx", ".xlsx", ".pptx", *IMAGE_EXTENSIONS)
+    )
+
+
+def iter_chunk_text_file(
+    path: str | os.PathLike,
+    doc: Doc,
+    chunk_chars: int,
+    overlap: int,
+    metadata: ParsedMetadata | None = None,
+    page_size_limit: int | None = None,
+    **_,
+) -> Generator[Text, None, None]:
+    """Lazily chunk a text file as it's read, in bounded memory.
+
+    Like `read_doc` upon `parse_text`, a .txt file is chunked by tokens
+    via `iter_chunk_text` and other files are chunked by lines via
+    `iter_chunk_code_text`.
+
+    Args:
+        path: path to file.
+        doc: The document the text is from.
+        chunk_chars: Size of chunks.
+        overlap: Size of overlap between chunks.
+        metadata: Optional parsing metadata to count the read characters into.
+        page_size_limit: Optional limit on the number of characters per line,
+            only relevant when chunking by lines, as in `parse_text`.
+    """
+    split_lines = not str(path).endswith(".txt")
+
+    def iter_blocks() -> Generator[str, None, None]:
+        line_i = line_length = total_length = 0
+        for block in iter_text_blocks(path, split_lines=split_lines):
+            total_length += len(block)
+            if split_lines and page_size_limit:
+                line_length += len(block)
+                if line_length > page_size_limit:
+                    raise ImpossibleParsingError(
+                        f"The txt on line {line_i} was over {page_size_limit} chars"
+                        f" long, which exceeds the {page_size_limit} char limit at"
+                        f" path {path}."
+                    )
+                if block.endswith("\n"):
+                    line_i += 1
+                    line_length = 0
+            yield block
+        if metadata is not None:
+            metadata.total_parsed_text_length = total_length
+
+    if split_lines:
+        yield from iter_chunk_code_text(
+            iter_blocks(), doc, chunk_chars=chunk_chars, overlap=overlap
+        )
+    else:
+        yield from iter_chunk_text(
+            iter_blocks(), doc, chunk_chars=chunk_chars, overlap=overlap
+        )
+
+
+_ParsePoolKey: TypeAlias = tuple[int, Callable[[], Any] | None]
+_PARSE_PROCESS_POOLS: dict[_ParsePoolKey, ProcessPoolExecutor] = {}
+# Keys of every pool handed out, so a broken pool can be replaced
+_PARSE_PROCESS_POOL_KEYS: weakref.WeakKeyDictionary[
+    ProcessPoolExecutor, _ParsePoolKey
+] = weakref.WeakKeyDictionary()
+_PARSE_PROCESS_POOLS_LOCK = threading.Lock()
+
+
+def get_parse_process_pool(
+    max_workers: int, initializer: Callable[[], Any] | None = None
+) -> ProcessPoolExecutor:
+    """Get a process pool for parsing, shared by all parsings using as many workers.
+
+    Args:
+        max_workers: Number of worker processes.
+        initializer: Optional picklable callable run in each worker upon its start,
+            such as ParsingSettings.configure_pdf_parser.
+    """
+    key = max_workers, initializer
+    with _PARSE_PROCESS_POOLS_LOCK:
+        if key not in _PARSE_PROCESS_POOLS:
+            pool = ProcessPoolExecutor(max_workers=max_workers, initializer=initializer)
+            _PARSE_PROCESS_POOLS[key] = pool
+            _PARSE_PROCESS_POOL_KEYS[pool] = key
+        return _PARSE_PROCESS_POOLS[key]
+
+
+def _replace_broken_parse_process_pool(
+    broken: Executor,
+) -> ProcessPoolExecutor | None:
+    """Replace a broken shared pool (e.g. a worker segfaulted), if it's one of ours.
+
+    Returns:
+        The pool replacing the broken one, or None if it's not a shared pool.
+    """
+    if not isinstance(broken, ProcessPoolExecutor):
+        return None
+    with _PARSE_PROCESS_POOLS_LOCK:
+        key = _PARSE_PROCESS_POOL_KEYS.get(broken)
+        if key is None:
+            return None
+        if _PARSE_PROCESS_POOLS.get(key) is broken:
+            # Concurrent parsings may have already replaced it
+            del _PARSE_PROCESS_POOLS[key]
+            broken.shutdown(wait=False, cancel_futures=True)
+    return get_parse_process_pool(*key)
+
+
+@atexit.register
+def shutdown_parse_process_pools() -> None:
+    """Shut down every shared parsing pool."""
+    with _PARSE_PROCESS_POOLS_LOCK:
+        pools = list(_PARSE_PROCESS_POOLS.values())
+        _PARSE_PROCESS_POOLS.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+async def _run_parser(
+    executor: Executor | None, parser: Callable[..., ParsedText], *args, **kwargs
+) -> ParsedText:
+    """Run a synchronous parser in the executor, or a thread if unspecified.
+
+    If a shared process pool broke, it's replaced and the parsing retried once,
+    so one crashing parsing doesn't fail all later parsings.
+    """
+    if executor is None:
+        return await asyncio.to_thread(parser, *args, **kwargs)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, partial(parser, *args, **kwargs)
+        )
+    except BrokenProcessPool:
+        if (replacement := _replace_broken_parse_process_pool(executor)) is None:
+            raise
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            replacement, partial(parser, *args, **kwargs)
+        )
+    except BrokenProcessPool:
+        # Leave a working pool behind for later parsings
+        _replace_broken_parse_process_pool(replacement)
+        raise
+
+
+async def parse_doc(
+    path: str | os.PathLike,
+    parse_pdf: PDFParserFn | None = None,
+    executor: Executor | None = None,
+    **parser_kwargs,
+) -> ParsedText:
+    """Parse a document, using a parser chosen by its file extension.
+
+    Args:
+        path: local document path
+        parse_pdf: Optional function to parse PDF files (if you're parsing a PDF).
+        executor: Optional executor (e.g. from `get_parse_process_pool`) to run
+            synchronous parsers in, so CPU-bound parsing runs off the event loop.
+            Parsers and their arguments must be picklable for a process pool.
+        parser_kwargs: Keyword arguments to pass to the used parsing function.
+    """
+    str_path = str(path)
+    if str_path.endswith(".pdf"):
+        if parse_pdf is None:
+            raise ValueError("When parsing a PDF, a parsing function must be provided.")
+        if is_coroutine_callable(parse_pdf):
+            parsed_text: ParsedText = await cast(AsyncPDFParserFn, parse_pdf)(
+                path, **parser_kwargs
+            )
+        elif executor is not None:
+            parsed_text = await _run_parser(
+                executor, cast(SyncPDFParserFn, parse_pdf), path, **parser_kwargs
+            )
+        else:
+            # Some PDF parsers are not thread-safe,
+            # so can't use multithreading via `asyncio.to_thread` here,
+            # and pages may be getting streamed in a thread by `read_doc_stream`
+            with PDF_PARSING_LOCK:
+                parsed_text = cast(SyncPDFParserFn, parse_pdf)(path, **parser_kwargs)
+    elif str_path.endswith(".txt"):
+        # TODO: Make parse_text async
+        parsed_text = await _run_parser(executor, parse_text, path, **parser_kwargs)
+    elif str_path.endswith(".html"):
+        parsed_text = await _run_parser(
+            executor, parse_text, path, html=True, **parser_kwargs
+        )
+    elif str_path.endswith(IMAGE_EXTENSIONS):
+        parsed_text = await parse_image(path, **parser_kwargs)
+    elif str_path.endswith((".docx", ".xlsx", ".pptx")):
+        # TODO: Make parse_office_doc async
+        parsed_text = await _run_parser(
+            executor, parse_office_doc, path, **parser_kwargs
+        )
+    else:
+        parsed_text = await _run_parser(
+            executor, parse_text, path, split_lines=True, **parser_kwargs
+        )
+    return parsed_text
+
+
+def _parser_identity(path: str | os.PathLike, parse_pdf: PDFParserFn | None) -> str:
+    """Identify the parser used for a path, for keying cached parsings."""
+    identity = f"paper-qa={pqa_version}|suffix={Path(path).suffix}"
+    if str(path).endswith(".pdf") and parse_pdf is not None:
+        name = getattr(parse_pdf, "__qualname__", type(parse_pdf).__qualname__)
+        identity += f"|parse_pdf={parse_pdf.__module__}.{name}"
+    return identity
+
+
+def derive_parsed_text(
+    parsed_text: ParsedText,
+    page_range: int | tuple[int, int] | None = None,
+    parse_media: bool = True,
+) -> ParsedText | None:
+    """Derive a parsing of a page range or without media from a paged parsing.
+
+    Returns:
+        The derived parsing, or None if the parsing isn't keyed by page number.
+    """
+    if not isinstance(parsed_text.content, dict):
+        return None
+    pages: dict[str, str | tuple[str, list[ParsedMedia]]] = dict(parsed_text.content)
+    if page_range is not None:
+        try:
+            page_count = max(map(int, pages), default=0)
+        except ValueError:  # Not keyed by page number
+            return None
+        pages = {
+            str(i + 1): pages[str(i + 1)]
+            for i in resolve_page_range(page_range, page_count)
+            if str(i + 1) in pages
+        }
+    if not parse_media:
+        pages = {k: v if isinstance(v, str) else v[0] for k, v in pages.items()}
+    return ParsedText(
+        content=cast(
+            "dict[str, str] | dict[str, tuple[str, list[ParsedMedia]]]", pages
+        ),
+        metadata=parsed_text.metadata.model_copy(
+            update={
+                "total_parsed_text_length": sum(
+                    len(v if isinstance(v, str) else v[0]) for v in pages.values()
+                ),
+                "count_parsed_media": sum(
+                    len(v[1]) for v in pages.values() if not isinstance(v, str)
+                ),
+            }
+        ),
+    )
+
+
+async def _parse_doc_with_cache(
+    path: str | os.PathLike,
+    content_hash: str,
+    cache: LRUCache[ParsedText],
+    parse_pdf: PDFParserFn | None = None,
+    executor: Executor | None = None,
+    **parser_kwargs,
+) -> ParsedText:
+    """Parse a document unless its parsing, or one to derive it from, is cached."""
+    parser = _parser_identity(path, parse_pdf)
+
+    def make_key(kwargs: Mapping[str, Any]) -> tuple:
+        return (
+            content_hash,
+            parser,
+            tuple(sorted((k, repr(v)) for k, v in kwargs.items())),
+        )
+
+    # Besides this exact parsing, a parsing of all pages or with media will do,
+    # where parsers parse media by default
+    candidates: list[dict[str, Any]] = [parser_kwargs]
+    if parser_kwargs.get("page_range") is not None:
+        candidates.append({k: v for k, v in parser_kwargs.items() if k != "page_range"})
+    if parser_kwargs.get("parse_media") is False:
+        candidates.extend(
+            [
+                *(c | {"parse_media": True} for c in candidates),
+                *(
+                    {k: v for k, v in c.items() if k != "parse_media"}
+                    for c in candidates
+                ),
+            ]
+        )
+    for i, cached in enumerate(
+        await cache.aget_many([make_key(c) for c in candidates])
+    ):
+        if cached is None:
+            continue
+        if i == 0:
+            return cached
+        derived = derive_parsed_text(
+            cached,
+            page_range=parser_kwargs.get("page_range"),
+            parse_media=parser_kwargs.get("parse_media", True),
+        )
+        if derived is not None:
+            return derived
+
+    parsed_text = await parse_doc(path, parse_pdf, executor, **parser_kwargs)
+    await cache.aset(make_key(parser_kwargs), parsed_text)
+    return parsed_text
+
+
 @overload
 async def read_doc(
     path: str | os.PathLike,
@@ -373,6 +986,9 @@ async def read_doc(
     overlap: int = ...,
     multimodal_enricher: Callable[[ParsedText], Awaitable] | None = ...,
     parse_pdf: PDFParserFn | None = ...,
+    parsed_text_cache: LRUCache[ParsedText] | None = ...,
+    parsed_text: ParsedText | None = ...,
+    parse_executor: Executor | None = ...,
     **parser_kwargs,
 ) -> ParsedText: ...
 @overload
@@ -385,6 +1001,9 @@ async def read_doc(
     overlap: int = ...,
     multimodal_enricher: Callable[[ParsedText], Awaitable] | None = ...,
     parse_pdf: PDFParserFn | None = ...,
+    parsed_text_cache: LRUCache[ParsedText] | None = ...,
+    parsed_text: ParsedText | None = ...,
+    parse_executor: Executor | None = ...,
     **parser_kwargs,
 ) -> ParsedText: ...
 @overload
@@ -397,6 +1016,9 @@ async def read_doc(
     overlap: int = ...,
     multimodal_enricher: Callable[[ParsedText], Awaitable] | None = ...,
     parse_pdf: PDFParserFn | None = ...,
+    parsed_text_cache: LRUCache[ParsedText] | None = ...,
+    parsed_text: ParsedText | None = ...,
+    parse_executor: Executor | None = ...,
     **parser_kwargs,
 ) -> tuple[list[Text], ParsedMetadata]: ...
 @overload
@@ -409,6 +1031,9 @@ async def read_doc(
     overlap: int = ...,
     multimodal_enricher: Callable[[ParsedText], Awaitable] | None = ...,
     parse_pdf: PDFParserFn | None = ...,
+    parsed_text_cache: LRUCache[ParsedText] | None = ...,
+    parsed_text: ParsedText | None = ...,
+    parse_executor: Executor | None = ...,
     **parser_kwargs,
 ) -> list[Text]: ...
 @overload
@@ -421,6 +1046,9 @@ async def read_doc(
     overlap: int = ...,
     multimodal_enricher: Callable[[ParsedText], Awaitable] | None = ...,
     parse_pdf: PDFParserFn | None = ...,
+    parsed_text_cache: LRUCache[ParsedText] | None = ...,
+    parsed_text: ParsedText | None = ...,
+    parse_executor: Executor | None = ...,
     **parser_kwargs,
 ) -> tuple[list[Text], ParsedMetadata]: ...
 async def read_doc(  # noqa: PLR0912
@@ -432,10 +1060,18 @@ async def read_doc(  # noqa: PLR0912
     overlap: int = 250,
     multimodal_enricher: Callable[[ParsedText], Awaitable[str]] | None = None,
     parse_pdf: PDFParserFn | None = None,
+    parsed_text_cache: LRUCache[ParsedText] | None = None,
+    parsed_text: ParsedText | None = None,
+    parse_executor: Executor | None = None,
     **parser_kwargs,
 ) -> list[Text] | ParsedText | tuple[list[Text], ParsedMetadata]:
     """Parse a document and split into chunks.
 
+    Text and code files (see `is_text_file`) are chunked as they're read,
+    via `iter_chunk_text_file`, unless parsed_text is specified
+    or parsed_text_only is set, so they're never held whole
+    (and their parsings aren't cached).
+
     Args:
         path: local document path
         doc: object with document metadata
@@ -446,38 +1082,68 @@ async def read_doc(  # noqa: PLR0912
         multimodal_enricher: Optional function to enrich the parsed text
             and return a hashable string summary before chunking.
         parse_pdf: Optional function to parse PDF files (if you're parsing a PDF).
+        parsed_text_cache: Optional cache of parsed texts to reuse parsings from.
+        parsed_text: Optional parsed text of the document at path, to chunk it
+            without parsing it again.
+        parse_executor: Optional executor to run synchronous parsers in,
+            see `parse_doc`.
         parser_kwargs: Keyword arguments to pass to the used parsing function.
     """
     str_path = str(path)
 
+    if (
+        parsed_text is None
+        and not parsed_text_only
+        and chunk_chars
+        and is_text_file(path)
+    ):
+        # Chunk text as it's read, so large files are never held whole,
+        # in a thread so the event loop isn't blocked
+        parsed_metadata = ParsedMetadata(
+            parsing_libraries=[],
+            paperqa_version=pqa_version,
+            total_parsed_text_length=0,
+            name=f"txt|split-lines={not str_path.endswith('.txt')}",
+        )
+        chunked_text = await asyncio.to_thread(
+            list,
+            iter_chunk_text_file(
+                path,
+                doc,
+                chunk_chars=chunk_chars,
+                overlap=overlap,
+                metadata=parsed_metadata,
+                **parser_kwargs,
+            ),
+        )
+        algorithm = "overlap-text" if str_path.endswith(".txt") else "overlap-code"
+        parsed_metadata.chunk_metadata = ChunkMetadata(
+            size=chunk_chars,
+            overlap=overlap,
+            name=(
+                f"paper-qa={pqa_version}|algorithm={algorithm}|reduction=cl100k_base"
+                f"|size={chunk_chars}|overlap={overlap}"
+            ),
+        )
+        if include_metadata:
+            return chunked_text, parsed_metadata
+        return chunked_text
+
     # start with parsing -- users may want to store this separately
-    if str_path.endswith(".pdf"):
-        if parse_pdf is None:
-            raise ValueError("When parsing a PDF, a parsing function must be provided.")
-        # Some PDF parsers are not thread-safe,
-        # so can't use multithreading via `asyncio.to_thread` here
-        if is_coroutine_callable(parse_pdf):
-            parsed_text: ParsedText = await cast(AsyncPDFParserFn, parse_pdf)(
-                path, **parser_kwargs
+    if parsed_text is None:
+        if parsed_text_cache is None:
+            parsed_text = await parse_doc(
+                path, parse_pdf, parse_executor, **parser_kwargs
             )
         else:
-            parsed_text = cast(SyncPDFParserFn, parse_pdf)(path, **parser_kwargs)
-    elif str_path.endswith(".txt"):
-        # TODO: Make parse_text async
-        parsed_text = await asyncio.to_thread(parse_text, path, **parser_kwargs)
-    elif str_path.endswith(".html"):
-        parsed_text = await asyncio.to_thread(
-            parse_text, path, html=True, **parser_kwargs
-        )
-    elif str_path.endswith(IMAGE_EXTENSIONS):
-        parsed_text = await parse_image(path, **parser_kwargs)
-    elif str_path.endswith((".docx", ".xlsx", ".pptx")):
-        # TODO: Make parse_office_doc async
-        parsed_text = await asyncio.to_thread(parse_office_doc, path, **parser_kwargs)
-    else:
-        parsed_text = await asyncio.to_thread(
-            parse_text, path, split_lines=True, **parser_kwargs
-        )
+            parsed_text = await _parse_doc_with_cache(
+                path,
+                doc.content_hash or md5sum(path),
+                parsed_text_cache,
+                parse_pdf,
+                parse_executor,
+                **parser_kwargs,
+            )
 
     if parsed_text_only:
         return parsed_text
@@ -555,3 +1221,106 @@ async def read_doc(  # noqa: PLR0912
         return chunked_text, parsed_text.metadata
 
     return chunked_text
+
+
+async def _iter_in_thread(
+    chunks: Generator[Text, None, None],
+    batch_size: int,
+    lock: threading.Lock | None = None,
+) -> AsyncGenerator[Text, None]:
+    """Advance a blocking chunk generator in a thread, yielding its chunks.
+
+    Args:
+        chunks: Generator of chunks, e.g. reading and chunking a file.
+        batch_size: Number of chunks to take per thread call,
+            to amortize its overhead.
+        lock: Optional lock to hold while advancing the generator,
+            for parsers that aren't thread-safe.
+    """
+    if lock is None:
+        # Still lock, so closing waits for a thread call abandoned by cancellation
+        lock = threading.Lock()
+
+    def take() -> list[Text]:
+        with lock:
+            return list(islice(chunks, batch_size))
+
+    def close() -> None:
+        with lock:
+            chunks.close()
+
+    try:
+        while batch := await asyncio.to_thread(take):
+            for text in batch:
+                yield text
+    finally:
+        # Close the parser's file if the consumer stopped early
+        await asyncio.to_thread(close)
+
+
+async def read_doc_stream(
+    path: str | os.PathLike,
+    doc: Doc,
+    chunk_chars: int = 5000,
+    overlap: int = 250,
+    parse_pdf: PDFParserFn | None = None,
+    iter_pdf_pages: PDFPageIteratorFn | None = None,
+    **parser_kwargs,
+) -> AsyncGenerator[Text, None]:
+    """Parse a document and yield its chunks, streaming the pages of PDFs.
+
+    With iter_pdf_pages, a PDF's chunks are yielded as soon as their pages are
+    parsed (in a thread, holding `PDF_PARSING_LOCK`), so consumers
+    (e.g. embedding) run while parsing continues,
+    and only the pages not yet chunked are held in memory.
+    Chunks match those of `read_doc` without multimodal enrichment.
+    Text and code files are chunked in a thread by `iter_chunk_text_file`,
+    so multi-GB files are chunked in bounded memory.
+    Other documents are parsed whole by `read_doc`, then their chunks are yielded.
+
+    Args:
+        path: local document path
+        doc: object with document metadata
+        chunk_chars: size of chunks
+        overlap: size of overlap between chunks
+        parse_pdf: Optional function to parse PDF files,
+            used if iter_pdf_pages isn't specified.
+        iter_pdf_pages: Optional function to parse PDF files page by page.
+        parser_kwargs: Keyword arguments to pass to the used parsing function.
+    """
+    if str(path).endswith(".pdf") and iter_pdf_pages is not None and chunk_chars:
+        # Parse in a thread, so other tasks (e.g. embedding yielded chunks) run
+        # meanwhile, taking one chunk per call to yield chunks as soon as possible
+        async for text in _iter_in_thread(
+            iter_chunk_pages(
+                iter_pdf_pages(path, **parser_kwargs),
+                doc,
+                chunk_chars=chunk_chars,
+                overlap=overlap,
+            ),
+            batch_size=1,
+            lock=PDF_PARSING_LOCK,
+        ):
+            yield text
+        return
+
+    if chunk_chars and is_text_file(path):
+        # Read and tokenize in a thread, so the event loop isn't blocked
+        async for text in _iter_in_thread(
+            iter_chunk_text_file(
+                path, doc, chunk_chars=chunk_chars, overlap=overlap, **parser_kwargs
+            ),
+            batch_size=STREAM_CHUNK_BATCH_SIZE,
+        ):
+            yield text
+        return
+
+    for text in await read_doc(
+        path,
+        doc,
+        chunk_chars=chunk_chars,
+        overlap=overlap,
+        parse_pdf=parse_pdf,
+        **parser_kwargs,
+    ):
+        yield text
@@ -7,6 +7,7 @@ import re
 import warnings
 from collections import defaultdict
 from collections.abc import Awaitable, Callable, Mapping, Sequence
+from concurrent.futures import Executor
 from contextlib import suppress
 from enum import IntEnum, StrEnum
 from itertools import starmap
@@ -24,6 +25,7 @@ from typing import (
 
 import anyio
 import litellm
+import numpy as np
 from aviary.core import Message, Tool, ToolSelector
 from lmi import (
     CommonLLMNames,
@@ -58,6 +60,7 @@ from paperqa._ldp_shims import (
     _Memories,
     set_training_mode,
 )
+from paperqa.caches import LRUCache, get_persistent_cache
 from paperqa.prompts import (
     CONTEXT_INNER_PROMPT,
     CONTEXT_OUTER_PROMPT,
@@ -74,7 +77,7 @@ from paperqa.prompts import (
     summary_json_system_prompt,
     summary_prompt,
 )
-from paperqa.readers import PDFParserFn
+from paperqa.readers import PDFPageIteratorFn, PDFParserFn, get_parse_process_pool
 from paperqa.types import Context, ParsedMedia, ParsedText
 from paperqa.utils import (
     get_stable_str,
@@ -285,6 +288,53 @@ class ParsingSettings(BaseModel):
             " summarization."
         ),
     )
+    parsed_text_cache_path: str | os.PathLike | None = Field(
+        default=None,
+        description=(
+            "Optional SQLite file to persist parsed documents, keyed on the file's"
+            " contents, parser, and parser configuration (excluding chunking), so"
+            " re-adding a file (e.g. to re-index with different chunk sizes) skips"
+            " parsing. A parse of a page range or without media can also be served"
+            " from a cached parse of the whole document."
+        ),
+    )
+    parsed_text_cache_max_entries: int = Field(
+        default=1_000,
+        ge=1,
+        description=(
+            "Maximum number of parsed documents kept in the parsed text cache,"
+            " beyond which least recently used parsings are evicted."
+        ),
+    )
+    citation_cache_path: str | os.PathLike | None = Field(
+        default=None,
+        description=(
+            "Optional SQLite file to persist the LLM's responses to the citation and"
+            " structured citation prompts, keyed on the document's content hash, LLM"
+            " name, and prompt, so re-adding a document (e.g. when rebuilding an index"
+            " after changing unrelated settings) makes no citation LLM calls."
+        ),
+    )
+    citation_cache_max_entries: int = Field(
+        default=100_000,
+        ge=1,
+        description=(
+            "Maximum number of LLM responses kept in the citation cache,"
+            " beyond which least recently used responses are evicted."
+        ),
+    )
+    parse_workers: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Number of worker processes to parse documents in, so CPU-bound parsing"
+            " runs off the event loop and concurrent document additions (e.g. in an"
+            " index build) parse on multiple cores. The default of 0 parses in this"
+            " process. A synchronous parse_pdf must be picklable to use workers,"
+            " as must configure_pdf_parser, which runs in each worker upon its start,"
+            " and an asynchronous parse_pdf always runs in this process."
+        ),
+    )
     parse_pdf: SkipJsonSchema[PDFParserFn] = Field(
         default_factory=get_default_pdf_parser,
         description="Function to parse PDF, or a fully qualified name to import.",
@@ -299,6 +349,24 @@ class ParsingSettings(BaseModel):
         ),
         exclude=True,
     )
+    stream_pdf_pages: bool = Field(
+        default=False,
+        description=(
+            "Whether to add PDFs by streaming their pages into chunks, embedding"
+            " chunks while later pages are still being parsed and holding only"
+            " the pages not yet chunked. Parsing uses iter_pdf_pages instead of"
+            " parse_pdf, and bypasses the parsed text cache. Not applicable when"
+            " enriching media, since enrichment views the whole parsed document."
+        ),
+    )
+    iter_pdf_pages: SkipJsonSchema[PDFPageIteratorFn | None] = Field(
+        default=None,
+        description=(
+            "Optional function to parse PDFs page by page when streaming PDF pages,"
+            " if unspecified paper-qa-pymupdf's iter_pdf_pages is used."
+        ),
+        exclude=True,
+    )
 
     @field_validator("parse_pdf", mode="before")
     @classmethod
@@ -384,6 +452,47 @@ class ParsingSettings(BaseModel):
         mm_enum = MultimodalOptions.from_value(self.multimodal)
         return mm_enum.should_parse_and_enrich_media
 
+    def get_parsed_text_cache(self) -> LRUCache[ParsedText] | None:
+        if self.parsed_text_cache_path is None:
+            return None
+        # Not cached in memory, since parsings can be large and media get enriched
+        return get_persistent_cache(
+            self.parsed_text_cache_path,
+            max_persisted=self.parsed_text_cache_max_entries,
+            maxsize=0,
+        )
+
+    def get_parse_executor(self) -> Executor | None:
+        if not self.parse_workers:
+            return None
+        # Configure the PDF parser (e.g. its logging) within each worker process
+        return get_parse_process_pool(
+            self.parse_workers, initializer=self.configure_pdf_parser
+        )
+
+    def get_pdf_page_iterator(self) -> PDFPageIteratorFn | None:
+        """Get the function to parse PDFs page by page, if streaming PDF pages."""
+        if not self.stream_pdf_pages or self.should_parse_and_enrich_media[1]:
+            return None
+        if self.iter_pdf_pages is not None:
+            return self.iter_pdf_pages
+        try:
+            from paperqa_pymupdf import iter_pdf_pages
+        except ImportError as exc:
+            raise ImportError(
+                "To stream PDF pages we need a function parsing PDFs page by page."
+                " Please either specify ParsingSettings.iter_pdf_pages or install"
+                " paper-qa-pymupdf via `pip install paper-qa[pymupdf]`."
+            ) from exc
+        return iter_pdf_pages
+
+    def get_citation_cache(self) -> LRUCache[str] | None:
+        if self.citation_cache_path is None:
+            return None
+        return get_persistent_cache(
+            self.citation_cache_path, max_persisted=self.citation_cache_max_entries
+        )
+
 
 class _FormatDict(dict):  # noqa: FURB189
     """Mock a dictionary and store any missing items."""
@@ -799,11 +908,54 @@ class Settings(BaseSettings):
         default=None,
         description="Optional configuration for the embedding model.",
     )
+    embedding_cache_path: str | os.PathLike | None = Field(
+        default=None,
+        description=(
+            "Optional SQLite file to persist text chunk embeddings, keyed on"
+            " embedding model configuration and embeddable text (including"
+            " enrichment),"
+            " so re-adding unchanged chunks (e.g. when a paper is pulled into a new"
+            " session or an index is rebuilt) makes no embedding calls."
+        ),
+    )
+    embedding_batch_token_limit: int = Field(
+        default=32_000,
+        ge=1,
+        description=(
+            "Limit on estimated tokens per batch of text chunks being embedded,"
+            " where batches are embedded concurrently and retried individually."
+        ),
+    )
+    embedding_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description="Maximum number of batches of text chunks being embedded at once.",
+    )
+    embedding_cache_max_entries: int = Field(
+        default=1_000_000,
+        ge=1,
+        description=(
+            "Maximum number of embeddings kept in the embedding cache,"
+            " beyond which least recently used embeddings are evicted."
+        ),
+    )
     temperature: float = Field(default=0.0, description="Temperature for LLMs.")
     batch_size: int = Field(default=1, description="Batch size for calling LLMs.")
     texts_index_mmr_lambda: float = Field(
         default=1.0, description="Lambda for MMR in text index."
     )
+    texts_index_lexical_weight: float = Field(
+        default=0.0,
+        ge=0.0,
+        le=1.0,
+        description=(
+            "Weight of lexical (BM25) search in text index retrieval, fused with"
+            " embedding similarity search by reciprocal rank fusion, to find exact"
+            " terms such as gene names or acronyms. The default of 0 disables lexical"
+            " search, which needs a text index supporting it (e.g. NumpyVectorStore),"
+            " otherwise only similarity search is used, with a warning."
+        ),
+    )
     verbosity: int = Field(
         default=0,
         description=(
@@ -950,6 +1102,16 @@ class Settings(BaseSettings):
     def get_embedding_model(self) -> EmbeddingModel:
         return embedding_model_factory(self.embedding, **(self.embedding_config or {}))
 
+    def get_embedding_cache(self) -> LRUCache[np.ndarray] | None:
+        if self.embedding_cache_path is None:
+            return None
+        # Not cached in memory, since texts hold onto their embeddings
+        return get_persistent_cache(
+            self.embedding_cache_path,
+            max_persisted=self.embedding_cache_max_entries,
+            maxsize=0,
+        )
+
     def get_enrichment_llm(self) -> LiteLLMModel:
         return LiteLLMModel(
             name=self.parsing.enrichment_llm,
@@ -4,7 +4,7 @@ import asyncio
 import contextlib
 import os
 import shutil
-from collections.abc import AsyncIterator, Coroutine, Iterator
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine, Iterator
 from importlib.metadata import version
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
@@ -16,6 +16,7 @@ import pytest
 import vcr.stubs.aiohttp_stubs
 import vcr.stubs.httpcore_stubs
 from dotenv import load_dotenv
+from lmi import EmbeddingModel
 from lmi.utils import (
     ANTHROPIC_API_KEY_HEADER,
     CROSSREF_KEY_HEADER,
@@ -23,10 +24,11 @@ from lmi.utils import (
     SEMANTIC_SCHOLAR_KEY_HEADER,
     update_litellm_max_callbacks,
 )
+from pydantic import Field
 
 if TYPE_CHECKING:
     from paperqa.settings import Settings
-    from paperqa.types import PQASession
+    from paperqa.types import Doc, PQASession
 
 TESTS_DIR = Path(__file__).parent
 CASSETTES_DIR = TESTS_DIR / "cassettes"
@@ -34,6 +36,41 @@ CASSETTES_DIR = TESTS_DIR / "cassettes"
 IN_GITHUB_ACTIONS: bool = os.getenv("GITHUB_ACTIONS") == "true"
 
 
+class StubEmbeddingModel(EmbeddingModel):
+    """Embedding model stub, recording the batches of texts it embeds.
+
+    Texts in embeddings get their looked up embedding, other texts get the
+    constant embedding if set, otherwise [1.0, len(text)]. Embeddings are fields
+    so they're part of the configuration keying cached embeddings, whereas the
+    recorded batches and on_embed hook are excluded from it.
+    """
+
+    name: str = "stub_embed"
+    embedding: list[float] | None = None
+    embeddings: dict[str, list[float]] = Field(default_factory=dict)
+    on_embed: Callable[[list[str]], Awaitable[None]] | None = Field(
+        default=None, exclude=True, description="Awaited before each batch."
+    )
+    batches: list[list[str]] = Field(default_factory=list, exclude=True)
+
+    @property
+    def calls(self) -> int:
+        return len(self.batches)
+
+    @property
+    def embedded(self) -> list[str]:
+        return [t for batch in self.batches for t in batch]
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(texts)
+        if self.on_embed is not None:
+            await self.on_embed(texts)
+        return [
+            self.embeddings.get(t, self.embedding or [1.0, float(len(t))])
+            for t in texts
+        ]
+
+
 @pytest.fixture(autouse=True, scope="session")
 def _load_env() -> None:
     load_dotenv()
@@ -180,6 +217,14 @@ def agent_stub_session() -> PQASession:
     return PQASession(question="What is a self-explanatory model?")
 
 
+@pytest.fixture(name="stub_doc")
+def fixture_stub_doc() -> Doc:
+    # Lazily import from paperqa so typeguard doesn't throw, as above
+    from paperqa.types import Doc
+
+    return Doc(docname="stub", citation="stub", dockey="stub")
+
+
 @pytest.fixture
 def stub_data_dir_w_near_dupes(stub_data_dir: Path, tmp_path: Path) -> Iterator[Path]:
 
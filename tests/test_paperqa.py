@@ -2,14 +2,18 @@ import asyncio
 import contextlib
 import csv
 import io
+import itertools
 import json
+import os
 import pathlib
 import pickle
 import random
 import re
 import string
 import sys
-from collections.abc import AsyncIterable, Sequence
+from collections.abc import AsyncIterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from copy import deepcopy
 from datetime import datetime, timedelta
 from functools import partial
@@ -30,7 +34,6 @@ from aviary.core import Message
 from lmi import (
     CommonLLMNames,
     Embeddable,
-    EmbeddingModel,
     HybridEmbeddingModel,
     LiteLLMEmbeddingModel,
     LiteLLMModel,
@@ -42,6 +45,7 @@ from lmi.llms import rate_limited
 from lmi.utils import VCR_DEFAULT_MATCH_ON, validate_image
 from paperqa_docling import parse_pdf_to_pages as docling_parse_pdf_to_pages
 from paperqa_nemotron import parse_pdf_to_pages as nemotron_parse_pdf_to_pages
+from paperqa_pymupdf import iter_pdf_pages as pymupdf_iter_pdf_pages
 from paperqa_pymupdf import parse_pdf_to_pages as pymupdf_parse_pdf_to_pages
 from paperqa_pypdf import parse_pdf_to_pages as pypdf_parse_pdf_to_pages
 from pydantic import ValidationError
@@ -51,6 +55,8 @@ from paperqa import (
     Doc,
     DocDetails,
     Docs,
+    IVFVectorStore,
+    MemmapVectorStore,
     NumpyVectorStore,
     PQASession,
     QdrantVectorStore,
@@ -58,6 +64,7 @@ from paperqa import (
     Text,
     VectorStore,
 )
+from paperqa.caches import LRUCache, close_persistent_caches
 from paperqa.clients import CrossrefProvider
 from paperqa.clients.journal_quality import JournalQualityPostProcessor
 from paperqa.core import (
@@ -66,13 +73,30 @@ from paperqa.core import (
     llm_parse_json,
     map_fxn_summary,
 )
+from paperqa.llms import (
+    BM25Index,
+    cosine_similarity,
+    embed_texts,
+    embedding_model_fingerprint,
+    lexical_tokenize,
+    max_marginal_relevance,
+    normalize_rows,
+    query_embedding_cache,
+)
 from paperqa.prompts import CANNOT_ANSWER_PHRASE, summary_json_multimodal_system_prompt
 from paperqa.prompts import qa_prompt as default_qa_prompt
 from paperqa.readers import (
     PDFParserFn,
+    _run_parser,
+    chunk_code_text,
     chunk_pdf,
+    chunk_text,
+    iter_chunk_text,
+    iter_text_blocks,
     parse_image,
+    parse_text,
     read_doc,
+    read_doc_stream,
     resolve_page_range,
 )
 from paperqa.settings import (
@@ -90,6 +114,7 @@ from paperqa.types import (
     ParsedText,
 )
 from paperqa.utils import (
+    ImpossibleParsingError,
     clean_possessives,
     encode_id,
     extract_score,
@@ -100,6 +125,7 @@ from paperqa.utils import (
     strings_similarity,
     strip_citations,
 )
+from tests.conftest import StubEmbeddingModel
 
 if TYPE_CHECKING:
     import vcr.request
@@ -767,11 +793,9 @@ async def test_docs_lifecycle(subtests: SubTests, stub_data_dir: Path) -> None:
         assert not [
             t for t in docs.texts if t.doc == grav_hill_details
         ], "Texts should be gone"
-        if len(docs.texts_index) == prior_texts_index_size:
-            pytest.xfail(
-                "Per https://github.com/Future-House/paper-qa/issues/1140"
-                " this can be improved"
-            )
+        assert len(docs.texts_index) < prior_texts_index_size
+        assert all(t in docs.texts_index for t in docs.texts)
+        assert not docs.deleted_dockeys, "Expected removal from the texts index"
 
     with subtests.test(msg="cleanup"):
         docs.texts_index.clear()
@@ -1253,17 +1277,11 @@ async def test_duplicate(stub_data_dir: Path, tmp_path) -> None:
 async def test_docs_with_custom_embedding(
     subtests: SubTests, stub_data_dir: Path, vector_store: type[VectorStore]
 ) -> None:
-    class MyEmbeds(EmbeddingModel):
-        name: str = "my_embed"
-
-        async def embed_documents(self, texts):
-            return [[0.0, 0.28, 0.95] for _ in texts]
-
     docs = Docs(texts_index=vector_store())
     await docs.aadd(
         stub_data_dir / "bates.txt",
         citation="WikiMedia Foundation, 2023, Accessed now",
-        embedding_model=MyEmbeds(),
+        embedding_model=StubEmbeddingModel(embedding=[0.0, 0.28, 0.95]),
     )
 
     with subtests.test(msg="confirm-embedding"):
@@ -1287,7 +1305,8 @@ async def test_docs_with_custom_embedding(
         # After getting evidence, a shallow copy of Docs is not the same because its
         # texts index gets lazily populated, while a deep copy should preserve it
         _ = await docs.aget_evidence(
-            "What country is Frederick Bates from?", embedding_model=MyEmbeds()
+            "What country is Frederick Bates from?",
+            embedding_model=StubEmbeddingModel(embedding=[0.0, 0.28, 0.95]),
         )
         docs_shallow_copy = Docs(
             texts_index=type(docs.texts_index)(**docs.texts_index.model_dump()),
@@ -1321,6 +1340,177 @@ async def test_docs_with_custom_embedding(
         assert not docs.texts_index.texts_hashes
 
 
+@pytest.mark.asyncio
+async def test_qdrant_batched_upserts_and_load_docs() -> None:
+    store = QdrantVectorStore(upsert_batch_size=4, max_concurrent_upserts=2)
+    docs = [
+        Doc(docname=f"doc{i}", citation=f"Citation {i}", dockey=f"key{i}")
+        for i in range(3)
+    ]
+    texts = [
+        Text(
+            text=f"chunk {i}",
+            name=f"doc{i % 3} chunk {i}",
+            doc=docs[i % 3],
+            embedding=[float(i), 1.0, 0.0],
+        )
+        for i in range(25)
+    ]
+    with patch.object(
+        store.client, "upsert", side_effect=store.client.upsert
+    ) as mock_upsert:
+        await store.add_texts_and_embeddings(texts[:10])
+        await store.add_texts_and_embeddings(texts[10:])
+    assert mock_upsert.call_count == 3 + 4, "Expected batches of at most 4 points"
+    assert store._point_ids is not None
+    assert len(store._point_ids) == 25, "Point IDs should accumulate across adds"
+    assert (await store.client.count(store.collection_name)).count == 25
+
+    loaded = await QdrantVectorStore.load_docs(
+        store.client, store.collection_name, batch_size=7
+    )
+    assert sorted(t.name for t in loaded.texts) == sorted(t.name for t in texts)
+    assert set(loaded.docs) == {d.dockey for d in docs}
+    assert all(
+        t in loaded.texts_index for t in loaded.texts
+    ), "Loaded texts should be known to the index, so they aren't upserted again"
+
+    with pytest.warns(DeprecationWarning, match="max_concurrent_requests"):
+        await QdrantVectorStore.load_docs(
+            store.client, store.collection_name, max_concurrent_requests=2
+        )
+
+    # Synchronous deletion can only filter texts out of retrieval,
+    # whereas asynchronous deletion removes the points
+    collection = Docs(texts_index=store)
+    for doc in docs:
+        await collection.aadd_texts([t for t in texts if t.doc == doc], doc)
+    collection.delete(dockey="key0")
+    assert collection.deleted_dockeys == {"key0"}
+    assert (await store.client.count(store.collection_name)).count == 25
+    await collection.adelete(dockey="key1")
+    assert collection.deleted_dockeys == {"key0"}
+    assert (await store.client.count(store.collection_name)).count == 25 - 8
+
+    # Loaded texts' points can also be removed, despite their normalized vectors
+    await loaded.adelete(dockey="key2")
+    assert not loaded.deleted_dockeys
+    assert (await store.client.count(store.collection_name)).count == 25 - 8 - 8
+
+
+@pytest.mark.asyncio
+async def test_qdrant_deduplicate_docs() -> None:
+    store = QdrantVectorStore(deduplicate_docs=True)
+    docs = [
+        DocDetails(
+            citation=f"Citation {i}",
+            docname=f"Document{i}",
+            dockey=f"key{i}",
+            title=f"Title {i}",
+            bibtex=f"@article{{Document{i}, title={{Title {i}}}}}",
+        )
+        for i in range(2)
+    ]
+    texts = [
+        Text(
+            text=f"chunk {i}",
+            name=f"chunk {i}",
+            doc=docs[i % 2],
+            embedding=[float(i), 1.0, 0.0],
+        )
+        for i in range(6)
+    ]
+    await store.add_texts_and_embeddings(texts)
+
+    points, _ = await store.client.scroll(store.collection_name, limit=10)
+    assert all(
+        p.payload is not None and "doc" not in p.payload and "dockey" in p.payload
+        for p in points
+    ), "Points should only reference their document"
+    assert (await store.client.count(store.docs_collection_name)).count == 2
+
+    # A store without the local document cache fetches documents as needed
+    reopened = QdrantVectorStore(
+        client=store.client, collection_name=store.collection_name
+    )
+    matches = cast(
+        "list[Text]",
+        (
+            await reopened.similarity_search(
+                "query",
+                k=6,
+                embedding_model=StubEmbeddingModel(embedding=[1.0, 1.0, 0.0]),
+            )
+        )[0],
+    )
+    assert sorted(t.name for t in matches) == sorted(t.name for t in texts)
+    assert {t.doc for t in matches} == set(docs)
+    assert all(
+        isinstance(t.doc, DocDetails) and t.doc.bibtex for t in matches
+    ), "Expected documents to round trip with their details"
+
+    loaded = await QdrantVectorStore.load_docs(store.client, store.collection_name)
+    assert loaded.texts_index.deduplicate_docs  # type: ignore[attr-defined]
+    assert loaded.docs == {d.dockey: d for d in docs}
+    assert {t.name for t in loaded.texts} == {t.name for t in texts}
+
+    # Removing a document's last text should also delete the document
+    await store.aremove_texts(texts[:4])  # Each document keeps a text
+    assert (await store.client.count(store.docs_collection_name)).count == 2
+    await store.aremove_texts(texts[4:5])
+    assert (await store.client.count(store.docs_collection_name)).count == 1
+    # Delete the other document directly, as if the collection were incomplete
+    await store.client.delete_collection(store.docs_collection_name)
+
+    # Points referencing missing documents should be skipped, not crash searches
+    reopened = QdrantVectorStore(
+        client=store.client, collection_name=store.collection_name
+    )
+    orphan_matches, orphan_scores = await reopened.similarity_search(
+        "query", k=6, embedding_model=StubEmbeddingModel(embedding=[1.0, 1.0, 0.0])
+    )
+    assert not orphan_matches
+    assert not orphan_scores
+
+    await store.aclear()
+    assert not await store.client.collection_exists(store.docs_collection_name)
+
+
+@pytest.mark.asyncio
+async def test_qdrant_mmr_only_fetches_vectors_when_needed(stub_doc: Doc) -> None:
+    rng = np.random.default_rng(0)
+    embedding_model = StubEmbeddingModel(embedding=rng.standard_normal(8).tolist())
+    store = QdrantVectorStore()
+    await store.add_texts_and_embeddings(
+        Text(text=f"Sentence {i}.", name=f"sentence{i}", doc=stub_doc, embedding=e)
+        for i, e in enumerate(rng.standard_normal((40, 8)).tolist())
+    )
+
+    results: dict[str, list[str]] = {}
+    for mode, mmr_lambda, server_side_mmr in (
+        ("no_mmr", 1.0, False),
+        ("local_mmr", 0.5, False),
+        ("server_mmr", 0.5, True),
+    ):
+        store.mmr_lambda, store.server_side_mmr = mmr_lambda, server_side_mmr
+        with patch.object(
+            store.client,
+            "query_batch_points",
+            side_effect=store.client.query_batch_points,
+        ) as mock_query:
+            texts, scores = await store.max_marginal_relevance_search(
+                "query", k=5, fetch_k=20, embedding_model=embedding_model
+            )
+        (request,) = mock_query.call_args.kwargs["requests"]
+        assert request.with_vector == (mode == "local_mmr")
+        assert all((t.embedding is not None) == request.with_vector for t in texts)
+        assert len(texts) == len(scores) == (20 if mode == "no_mmr" else 5)
+        results[mode] = [cast("Text", t).name for t in texts]
+
+    assert results["server_mmr"] == results["local_mmr"]
+    assert results["local_mmr"] != results["no_mmr"][:5], "Expected MMR to diversify"
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize("vector_store", [NumpyVectorStore, QdrantVectorStore])
 async def test_sparse_embedding(
@@ -1602,7 +1792,7 @@ async def test_pdf_reader_w_no_chunks(stub_data_dir: Path) -> None:
 @pytest.mark.vcr
 @pytest.mark.parametrize("defer_embeddings", [True, False])
 @pytest.mark.asyncio
-async def test_partly_embedded_texts(defer_embeddings: bool) -> None:
+async def test_partly_embedded_texts(defer_embeddings: bool, stub_doc: Doc) -> None:
     settings = Settings.from_name("fast")
     settings.parsing.defer_embedding = defer_embeddings
     docs = Docs()
@@ -1610,7 +1800,6 @@ async def test_partly_embedded_texts(defer_embeddings: bool) -> None:
         docs.texts_index, NumpyVectorStore
     ), "We want this test to cover NumpyVectorStore"
 
-    stub_doc = Doc(docname="stub", citation="stub", dockey="stub")
     pre_embedded_text = Text(text="I like turtles.", name="sentence1", doc=stub_doc)
     pre_embedded_text.embedding = (
         await settings.get_embedding_model().embed_documents([pre_embedded_text.text])
@@ -1642,6 +1831,896 @@ async def test_partly_embedded_texts(defer_embeddings: bool) -> None:
     assert len(docs.texts_index.texts_hashes) == len(texts_to_add)
 
 
+@pytest.mark.asyncio
+async def test_numpy_vector_store_incremental_add(stub_doc: Doc) -> None:
+    rng = np.random.default_rng(seed=42)
+    texts = [
+        Text(
+            text=f"Sentence {i}.",
+            name=f"sentence{i}",
+            doc=stub_doc,
+            embedding=rng.standard_normal(8).tolist(),
+        )
+        for i in range(9)
+    ]
+    index = NumpyVectorStore()
+    await index.add_texts_and_embeddings(texts[:4])
+    buffer = index._embeddings_matrix
+    assert buffer is not None
+    assert buffer.dtype == np.float32
+    await index.add_texts_and_embeddings(texts[4:5])
+    assert index._embeddings_matrix is not buffer, "Expected capacity to grow"
+    buffer = index._embeddings_matrix
+    await index.add_texts_and_embeddings(texts[5:8])
+    assert index._embeddings_matrix is buffer, "Expected in-place append"
+    await index.add_texts_and_embeddings(texts[8:])
+
+    expected = np.array([t.embedding for t in texts], dtype=np.float32)
+    expected_normalized = expected / np.linalg.norm(expected, axis=1, keepdims=True)
+
+    def assert_matrices(index: NumpyVectorStore, n_rows: int) -> None:
+        matrix = index._get_matrix()
+        normalized = index._get_matrix(normalized=True)
+        assert matrix is not None
+        assert normalized is not None
+        np.testing.assert_allclose(matrix, expected[:n_rows])
+        np.testing.assert_allclose(normalized, expected_normalized[:n_rows], rtol=1e-6)
+
+    assert_matrices(index, len(texts))
+
+    # Pickling should leave out unused capacity and the normalized embeddings
+    state = index.__getstate__()["__pydantic_private__"]
+    assert state["_embeddings_matrix"].shape[0] == len(texts)
+    assert state["_normalized_matrix"] is None
+    loaded = pickle.loads(pickle.dumps(index))
+    assert loaded == index
+    assert_matrices(loaded, len(texts))
+
+    # Mutating texts directly should get the matrix rebuilt on the next add
+    index.texts = index.texts[:3]
+    await index.add_texts_and_embeddings(texts[3:4])
+    assert_matrices(index, 4)
+
+
+@pytest.mark.asyncio
+async def test_numpy_vector_store_top_k_matches_full_sort(stub_doc: Doc) -> None:
+    rng = np.random.default_rng(seed=42)
+    query_embedding = rng.standard_normal(16).tolist()
+    embedding_model = StubEmbeddingModel(embedding=query_embedding)
+    texts = [
+        Text(
+            text=f"Sentence {i}.",
+            name=f"sentence{i}",
+            doc=stub_doc,
+            embedding=rng.standard_normal(16).tolist(),
+        )
+        for i in range(200)
+    ]
+    texts[7].embedding = [0.0] * 16  # Zero vectors should rank last
+    index = NumpyVectorStore()
+    await index.add_texts_and_embeddings(texts)
+
+    embeddings = np.array([t.embedding for t in texts])
+    with np.errstate(invalid="ignore"):
+        expected_scores = (embeddings @ query_embedding) / (
+            np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query_embedding)
+        )
+    expected_scores = np.nan_to_num(expected_scores, nan=-np.inf)
+    expected_order = np.argsort(-expected_scores)
+    for k in (1, 10, 199, 200, 500):
+        matches, scores = await index.similarity_search("query", k, embedding_model)
+        assert [cast(Text, m).name for m in matches] == [
+            texts[i].name for i in expected_order[:k]
+        ]
+        assert all(isinstance(s, float) for s in scores)
+        np.testing.assert_allclose(
+            scores, expected_scores[expected_order[:k]], atol=1e-6
+        )
+
+
+@pytest.mark.asyncio
+async def test_numpy_vector_store_partitioned_search(stub_doc: Doc) -> None:
+    rng = np.random.default_rng(seed=42)
+    embedding_model = StubEmbeddingModel(embedding=rng.standard_normal(16).tolist())
+    texts = [
+        Text(
+            text=f"Sentence {i}.",
+            name=f"sentence{i}",
+            doc=stub_doc,
+            embedding=rng.standard_normal(16).tolist(),
+        )
+        for i in range(60)
+    ]
+    partitioning_fn = MagicMock(side_effect=lambda t: int(t.name[8:]) % 3)
+    index = NumpyVectorStore()
+    await index.add_texts_and_embeddings(texts[:40])
+
+    async def expected_search(k: int) -> list[str]:
+        # Reference implementation: a separate full search per partition
+        ranked, _ = await index.similarity_search("query", 60, embedding_model)
+        names = [cast("Text", t).name for t in ranked]
+        partitions = [[n for n in names if int(n[8:]) % 3 == p] for p in range(3)]
+        return [
+            n
+            for n in itertools.chain.from_iterable(
+                itertools.zip_longest(*(p[:k] for p in partitions))
+            )
+            if n is not None
+        ][:k]
+
+    query_embedding_cache.clear()  # Count requests from a cold cache
+    for k in (1, 5, 40):
+        matches, scores = await index.partitioned_similarity_search(
+            "query", k, embedding_model, partitioning_fn
+        )
+        assert [cast(Text, m).name for m in matches] == await expected_search(k)
+        assert len(scores) == len(matches)
+    assert embedding_model.calls == 1, "Expected the query embedding to be cached"
+    assert partitioning_fn.call_count == 40, "Expected labels to be cached"
+
+    # Adding texts should only label the new texts
+    await index.add_texts_and_embeddings(texts[40:])
+    matches, _ = await index.partitioned_similarity_search(
+        "query", 10, embedding_model, partitioning_fn
+    )
+    assert [cast(Text, m).name for m in matches] == await expected_search(10)
+    assert partitioning_fn.call_count == 60
+
+    # The partitioning function shouldn't be pickled
+    assert pickle.loads(pickle.dumps(index)) == index
+
+
+@pytest.mark.asyncio
+async def test_query_embedding_cache(tmp_path: Path, stub_doc: Doc) -> None:
+    texts = [
+        Text(text="Sentence.", name="sentence", doc=stub_doc, embedding=[1.0, 5.0])
+    ]
+    stores: list[VectorStore] = [NumpyVectorStore(), NumpyVectorStore()]
+    for store in stores:
+        await store.add_texts_and_embeddings(texts)
+
+    query_embedding_cache.clear()  # Count hits and misses from a cold cache
+    embedding_model = StubEmbeddingModel()
+    for store in stores:  # The cache is shared across stores
+        for query in ("query", "other query", "query"):
+            await store.similarity_search(query, 1, embedding_model)
+    assert embedding_model.calls == 2
+    assert (query_embedding_cache.hits, query_embedding_cache.misses) == (4, 2)
+
+    # Models sharing a name but not a configuration shouldn't share embeddings
+    for ndim in (64, 128):
+        sparse_model = SparseEmbeddingModel(ndim=ndim)
+        (embedding,) = await sparse_model.embed_documents(["Sentence."])
+        store = NumpyVectorStore()
+        await store.add_texts_and_embeddings(
+            [Text(text="Sentence.", name="s", doc=stub_doc, embedding=embedding)]
+        )
+        (match,), _ = await store.similarity_search("query", 1, sparse_model)
+        assert match.embedding is not None
+
+    cache: LRUCache[list[float]] = LRUCache(maxsize=1, path=tmp_path / "cache.db")
+    cache.set(("a",), [1.0])
+    cache.set(("b",), [2.0])
+    assert len(cache) == 1, "Expected least recently used entry to be evicted"
+    assert cache.get(("a",)) == [1.0], "Expected fallback to the persisted entry"
+    assert LRUCache(path=tmp_path / "cache.db").get(("b",)) == [2.0]
+    assert cache.get(("c",)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_persistent_cache(tmp_path: Path) -> None:
+    settings = Settings(
+        embedding_cache_path=tmp_path / "embeddings.db", embedding_cache_max_entries=20
+    )
+    cache = cast(LRUCache[np.ndarray], settings.get_embedding_cache())
+    assert settings.get_embedding_cache() is cache, "Expected one cache per path"
+
+    await cache.aset_many((str(i), np.full(2, i)) for i in range(20))
+    assert cache._num_persisted == 20
+    await cache.aset("0", np.zeros(2))  # Replacing shouldn't count as a new entry
+    assert cache._num_persisted == 20
+    await cache.aget("1")  # Touching makes it most recently used
+    await cache.aset("20", np.full(2, 20))
+    assert cache._num_persisted == 18, "Expected eviction down to below the max"
+    values = await cache.aget_many([str(i) for i in range(21)])
+    evicted = [i for i, v in enumerate(values) if v is None]
+    assert len(evicted) == 3
+    assert not {0, 1, 20}.intersection(evicted), "Expected recent entries kept"
+
+    close_persistent_caches()
+    assert cache._connection is None
+    reopened = cast(LRUCache[np.ndarray], settings.get_embedding_cache())
+    assert reopened is not cache
+    value = await reopened.aget("20")
+    assert value is not None
+    np.testing.assert_array_equal(value, np.full(2, 20))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("vector_store_cls", "kwargs"),
+    [
+        (NumpyVectorStore, {}),
+        (NumpyVectorStore, {"quantization": "int8"}),
+        (IVFVectorStore, {"min_train_size": 10, "n_probe": 100}),
+        (QdrantVectorStore, {}),
+    ],
+)
+async def test_similarity_search_batch(
+    vector_store_cls: type[VectorStore], kwargs: dict[str, Any], stub_doc: Doc
+) -> None:
+    vector_store = vector_store_cls(**kwargs)
+    rng = np.random.default_rng(seed=42)
+    queries = {f"query {i}": rng.standard_normal(8).tolist() for i in range(5)}
+    await vector_store.add_texts_and_embeddings(
+        Text(text=f"Sentence {i}.", name=f"sentence{i}", doc=stub_doc, embedding=e)
+        for i, e in enumerate(normalize_rows(rng.standard_normal((50, 8))).tolist())
+    )
+    embedding_model = StubEmbeddingModel(embeddings=queries)
+    query_embedding_cache.clear()  # Count requests from a cold cache
+    query_list = [*queries, "query 0"]
+    results = await vector_store.similarity_search_batch(query_list, 5, embedding_model)
+    assert embedding_model.batches == [list(queries)], "Expected one request"
+    assert len(results) == len(query_list)
+    for query, (texts, scores) in zip(query_list, results, strict=True):
+        expected_texts, expected_scores = await vector_store.similarity_search(
+            query, 5, embedding_model
+        )
+        assert texts == expected_texts
+        assert scores == pytest.approx(expected_scores, abs=1e-5)
+    assert len(embedding_model.batches) == 1, "Expected cached query embeddings"
+
+    vector_store.mmr_lambda = 0.5
+    mmr_results = await vector_store.max_marginal_relevance_search_batch(
+        list(queries), 3, 10, embedding_model
+    )
+    for query, (texts, _) in zip(queries, mmr_results, strict=True):
+        expected_texts, _ = await vector_store.max_marginal_relevance_search(
+            query, 3, 10, embedding_model
+        )
+        assert texts == expected_texts
+    assert await vector_store.similarity_search_batch([], 5, embedding_model) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_partition", [True, False])
+async def test_retrieve_texts_many(use_partition: bool) -> None:
+    rng = np.random.default_rng(seed=42)
+    queries = {f"query {i}": rng.standard_normal(8).tolist() for i in range(4)}
+    settings = Settings(texts_index_mmr_lambda=0.5)
+    docs = Docs()
+    for dockey in ("a", "b"):
+        doc = Doc(docname=dockey, citation=dockey, dockey=dockey)
+        await docs.aadd_texts(
+            [
+                Text(text=f"{dockey}{i}", name=f"{dockey}{i}", doc=doc, embedding=e)
+                for i, e in enumerate(rng.standard_normal((20, 8)).tolist())
+            ],
+            doc,
+            settings=settings,
+        )
+    docs.delete(dockey="b")
+
+    def partitioning_fn(t: Embeddable) -> int:
+        return int(cast("Text", t).name[1:]) % 2
+
+    embedding_model = StubEmbeddingModel(embeddings=queries)
+    query_embedding_cache.clear()  # Count requests from a cold cache
+    results = await docs.retrieve_texts_many(
+        list(queries),
+        5,
+        settings=settings,
+        embedding_model=embedding_model,
+        partitioning_fn=partitioning_fn if use_partition else None,
+    )
+    assert embedding_model.calls == 1, "Expected queries embedded in one request"
+    for query, matches in zip(queries, results, strict=True):
+        assert len(matches) == 5
+        assert all(m.doc.dockey == "a" for m in matches)
+        assert matches == await docs.retrieve_texts(
+            query,
+            5,
+            settings=settings,
+            embedding_model=embedding_model,
+            partitioning_fn=partitioning_fn if use_partition else None,
+        )
+
+    # Gathering evidence for many queries should retrieve in one batch
+    settings.answer.evidence_k = 5
+    settings.answer.evidence_skip_summary = True
+    with patch.object(
+        Docs, "retrieve_texts_many", autospec=True, wraps=Docs.retrieve_texts_many
+    ) as mock_retrieve_texts_many:
+        sessions = await docs.aget_evidence_many(
+            list(queries),
+            settings=settings,
+            embedding_model=embedding_model,
+            partitioning_fn=partitioning_fn if use_partition else None,
+        )
+    mock_retrieve_texts_many.assert_awaited_once()
+    for session, matches in zip(sessions, results, strict=True):
+        assert {c.text for c in session.contexts} == set(matches)
+
+    # Whereas gathering evidence per query doesn't batch implicitly
+    with patch.object(
+        Docs, "retrieve_texts_many", autospec=True
+    ) as mock_retrieve_texts_many:
+        await asyncio.gather(
+            *(
+                docs.aget_evidence(
+                    query, settings=settings, embedding_model=embedding_model
+                )
+                for query in queries
+            )
+        )
+    mock_retrieve_texts_many.assert_not_awaited()
+
+    class FirstDocs(Docs):
+        async def retrieve_texts(self, *args, **kwargs) -> list[Text]:
+            return (await super().retrieve_texts(*args, **kwargs))[:1]
+
+    first_docs = FirstDocs(**dict(docs))
+    sessions = await first_docs.aget_evidence_many(
+        list(queries), settings=settings, embedding_model=embedding_model
+    )
+    assert all(
+        len(s.contexts) == 1 for s in sessions
+    ), "Expected the retrieve_texts override to be respected"
+
+
+@pytest.mark.asyncio
+async def test_max_marginal_relevance_search_batch_respects_override(
+    stub_doc: Doc,
+) -> None:
+    class ReversingStore(NumpyVectorStore):
+        async def max_marginal_relevance_search(self, *args, **kwargs):
+            texts, scores = await super().max_marginal_relevance_search(*args, **kwargs)
+            return texts[::-1], scores[::-1]
+
+    embedding_model = StubEmbeddingModel(embeddings={"a": [1.0, 1.0], "bb": [2.0, 1.0]})
+    store = ReversingStore()
+    await store.add_texts_and_embeddings(
+        Text(text=str(i), name=str(i), doc=stub_doc, embedding=[float(i), 1.0])
+        for i in range(10)
+    )
+    results = await store.max_marginal_relevance_search_batch(
+        ["a", "bb"], 3, 6, embedding_model
+    )
+    for query, result in zip(("a", "bb"), results, strict=True):
+        assert result == await store.max_marginal_relevance_search(
+            query, 3, 6, embedding_model
+        )
+
+
+def test_bm25_index(monkeypatch: pytest.MonkeyPatch) -> None:
+    corpus = [
+        "BRCA1 mutations raise the risk of breast cancer.",
+        "The risk of cancer rises with age, age being the main risk factor.",
+        "See doi 10.1038/nature12373 for the CRISPR screen.",
+        "",
+    ]
+    index = BM25Index()
+    # Sort upon the first search
+    monkeypatch.setattr(BM25Index, "MIN_UNSORTED_POSTINGS", 0)
+    index.add(corpus[:2])
+    index.score("risk")
+    # Leave the postings added next unsorted
+    monkeypatch.setattr(BM25Index, "MIN_UNSORTED_POSTINGS", 1000)
+    index.add(corpus[2:])
+
+    # Reference implementation
+    documents = [lexical_tokenize(text) for text in corpus]
+    avg_length = np.mean([len(d) for d in documents])
+
+    def bm25(query: str, document: list[str], k1: float = 1.5, b: float = 0.75):
+        score = 0.0
+        for term in set(lexical_tokenize(query)):
+            df = sum(term in d for d in documents)
+            count = document.count(term)
+            idf = np.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+            score += (
+                idf
+                * count
+                * (k1 + 1)
+                / (count + k1 * (1 - b + b * len(document) / avg_length))
+            )
+        return score
+
+    for query in ("cancer risk", "brca1", "nature12373 CRISPR", "unknown"):
+        np.testing.assert_allclose(
+            index.score(query), [bm25(query, d) for d in documents], rtol=1e-5
+        )
+    assert len(index) == 4
+    assert index._num_sorted < index._num_postings
+
+
+@pytest.mark.asyncio
+async def test_hybrid_retrieval(stub_doc: Doc) -> None:
+    rng = np.random.default_rng(seed=42)
+    query_embedding = rng.standard_normal(8)
+    embedding_model = StubEmbeddingModel(embedding=query_embedding.tolist())
+    texts = [
+        Text(
+            text=f"Passage {i} on tumor suppressors.",
+            name=f"passage{i}",
+            doc=stub_doc,
+            # Dense similarity decreases with i
+            embedding=(query_embedding + 0.1 * i * rng.standard_normal(8)).tolist(),
+        )
+        for i in range(50)
+    ]
+    texts[-1].text = "Passage on BRCA1."
+    docs = Docs()
+    await docs.aadd_texts(texts, stub_doc, settings=Settings())
+    dense_matches = await docs.retrieve_texts(
+        "BRCA1", 5, settings=Settings(), embedding_model=embedding_model
+    )
+    assert texts[-1] not in dense_matches
+
+    settings = Settings(texts_index_lexical_weight=0.6)
+    hybrid_matches = await docs.retrieve_texts(
+        "BRCA1", 5, settings=settings, embedding_model=embedding_model
+    )
+    assert hybrid_matches[0] == texts[-1], "Expected the more weighted top rank"
+    assert hybrid_matches[1:] == dense_matches[:4]
+
+    lexical_matches, scores = docs.texts_index.lexical_search("brca1 unknown", 5)
+    assert lexical_matches == [texts[-1]]
+    assert scores[0] > 0
+    docs.delete(dockey="stub")
+    assert docs.texts_index.lexical_search("BRCA1", 5) == ([], [])
+
+    # Stores not supporting lexical search fall back to only similarity search
+    docs = Docs(texts_index=QdrantVectorStore())
+    await docs.aadd_texts(texts, stub_doc, settings=Settings())
+    with pytest.warns(UserWarning, match="doesn't support lexical search"):
+        fallback_matches = await docs.retrieve_texts(
+            "BRCA1", 5, settings=settings, embedding_model=embedding_model
+        )
+    assert [t.name for t in fallback_matches] == [t.name for t in dense_matches]
+
+
+@pytest.mark.asyncio
+async def test_embedding_cache(tmp_path: Path) -> None:
+    def make_texts(doc: Doc) -> list[Text]:
+        return [
+            Text(text=f"Sentence {i}.", name=f"{doc.docname} chunk {i}", doc=doc)
+            for i in range(1, 4)
+        ]
+
+    settings = Settings(embedding_cache_path=tmp_path / "embeddings.db")
+    embedding_model = StubEmbeddingModel()
+    for _ in range(2):  # Re-adding to a new Docs shouldn't embed again
+        doc = Doc(docname="stub", citation="stub", dockey="stub")
+        texts = make_texts(doc)
+        assert await Docs().aadd_texts(
+            texts, doc, settings=settings, embedding_model=embedding_model
+        )
+        assert [t.embedding for t in texts] == [[1.0, 11.0]] * 3
+    assert len(embedding_model.embedded) == 3
+
+    # A model sharing the name but not the configuration shouldn't hit the cache
+    other_model = StubEmbeddingModel(ndim=2)
+    doc = Doc(docname="stub", citation="stub", dockey="stub")
+    assert await Docs().aadd_texts(
+        make_texts(doc), doc, settings=settings, embedding_model=other_model
+    )
+    assert len(other_model.embedded) == 3
+
+    # Deferred embedding also uses the cache upon building the index
+    settings.parsing.defer_embedding = True
+    docs = Docs()
+    doc = Doc(docname="other", citation="other", dockey="other")
+    texts = [*make_texts(doc), Text(text="New sentence.", name="new", doc=doc)]
+    await docs.aadd_texts(texts, doc, settings=settings)
+    assert all(t.embedding is None for t in texts)
+    await docs._build_texts_index(embedding_model, settings=settings)
+    assert embedding_model.embedded[3:] == ["New sentence."]
+    assert len(docs.texts_index) == 4
+
+    # Least recently used embeddings get evicted beyond the max entries
+    settings.embedding_cache_max_entries = 2
+    cache = cast(LRUCache[np.ndarray], settings.get_embedding_cache())
+    cache.set_many([(("a",), np.ones(2)), (("b",), np.ones(2))])
+    a, b, evicted = cache.get_many(
+        [
+            ("a",),
+            ("b",),
+            (
+                embedding_model_fingerprint(embedding_model),
+                "document",
+                "New sentence.",
+            ),
+        ]
+    )
+    assert a is not None
+    assert b is not None
+    assert evicted is None
+
+
+@pytest.mark.asyncio
+async def test_embed_texts_batching() -> None:
+    in_flight = max_in_flight = 0
+
+    def make_flaky_model() -> StubEmbeddingModel:
+        """Make a model failing its first attempt at the batch of text 2."""
+        failed = False
+
+        async def on_embed(texts: list[str]) -> None:
+            nonlocal in_flight, max_in_flight, failed
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if texts[0].startswith("02") and not failed:
+                failed = True
+                raise ConnectionError("Simulated provider error.")
+
+        return StubEmbeddingModel(on_embed=on_embed)
+
+    # 40 chars is about 10 tokens, so 2 texts per 25-token batch
+    texts = [f"{i:02d}" * 20 for i in range(10)]
+    embedding_model = make_flaky_model()
+    embeddings = await embed_texts(
+        embedding_model, texts, batch_token_limit=25, concurrency=3
+    )
+    assert embeddings == [[1.0, 40.0]] * 10
+    assert max_in_flight == 3
+    assert all(len(b) == 2 for b in embedding_model.batches)
+    # Only the failed batch should be retried
+    assert len(embedding_model.batches) == 6
+    assert embedding_model.batches.count(texts[2:4]) == 2
+
+    with pytest.raises(ConnectionError, match="Simulated"):
+        await embed_texts(make_flaky_model(), texts[2:], max_attempts=1)
+
+    # Non-transient errors shouldn't be retried
+    failing_model = make_flaky_model()
+    with (
+        patch.object(
+            StubEmbeddingModel,
+            "embed_documents",
+            side_effect=ValueError("Invalid input."),
+        ) as mock_embed_documents,
+        pytest.raises(ValueError, match="Invalid"),
+    ):
+        await embed_texts(failing_model, texts)
+    mock_embed_documents.assert_called_once()
+
+
+@pytest.mark.parametrize("mmr_lambda", [0.0, 0.5, 0.9])
+def test_max_marginal_relevance(mmr_lambda: float) -> None:
+    rng = np.random.default_rng(seed=42)
+    embeddings = rng.standard_normal((200, 16))
+    scores = np.sort(rng.uniform(size=200))[::-1]
+
+    # Reference implementation using the full similarity matrix
+    similarity_matrix = cosine_similarity(embeddings, embeddings)
+    expected = [0]
+    while len(expected) < 20:
+        mmr_scores = mmr_lambda * scores - (1 - mmr_lambda) * similarity_matrix[
+            :, expected
+        ].max(axis=1)
+        mmr_scores[expected] = -np.inf
+        expected.append(int(mmr_scores.argmax()))
+
+    selected = max_marginal_relevance(
+        normalize_rows(embeddings), scores, 20, mmr_lambda
+    )
+    assert selected == expected
+    assert len(set(selected)) == 20
+    assert sorted(
+        max_marginal_relevance(normalize_rows(embeddings[:5]), scores[:5], 20, 0.5)
+    ) == list(range(5)), "Expected all rows when asking for more rows than exist"
+
+
+@pytest.mark.asyncio
+async def test_ivf_vector_store_recall(stub_doc: Doc) -> None:
+    rng = np.random.default_rng(seed=42)
+    centers = rng.standard_normal((20, 32))
+    embeddings = centers[rng.integers(0, 20, size=3000)] + 0.5 * rng.standard_normal(
+        (3000, 32)
+    )
+    queries = {
+        f"query {i}": (centers[i] + 0.5 * rng.standard_normal(32)).tolist()
+        for i in range(20)
+    }
+
+    embedding_model = StubEmbeddingModel(embeddings=queries)
+    texts = [
+        Text(text=f"Sentence {i}.", name=f"sentence{i}", doc=stub_doc, embedding=e)
+        for i, e in enumerate(embeddings.tolist())
+    ]
+    exact_index = NumpyVectorStore()
+    ivf_index = IVFVectorStore(min_train_size=1000, n_probe=4)
+    for index in (exact_index, ivf_index):
+        await index.add_texts_and_embeddings(texts[:2500])
+
+    async def recall(k: int = 10) -> float:
+        hits = 0
+        for query in queries:
+            expected, _ = await exact_index.similarity_search(query, k, embedding_model)
+            actual, _ = await ivf_index.similarity_search(query, k, embedding_model)
+            hits += len({t.name for t in actual} & {t.name for t in expected})  # type: ignore[attr-defined]
+        return hits / (k * len(queries))
+
+    assert await recall() >= 0.9
+    assert ivf_index._centroids is not None, "Expected lazy training upon search"
+    assert ivf_index._trained_size == 2500
+
+    # Incrementally added texts should be searchable without retraining
+    for index in (exact_index, ivf_index):
+        await index.add_texts_and_embeddings(texts[2500:])
+    assert await recall() >= 0.9
+    assert ivf_index._trained_size == 2500, "Growth was below retraining threshold"
+
+    # Probing every cluster should match brute force
+    ivf_index.n_probe = len(ivf_index._centroids)
+    assert await recall() == 1.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("vector_store_cls", "kwargs"),
+    [
+        (NumpyVectorStore, {"quantization": "int8"}),
+        (NumpyVectorStore, {"quantization": "float16"}),
+        (IVFVectorStore, {"min_train_size": 10, "n_probe": 100}),
+        (MemmapVectorStore, {}),
+    ],
+)
+async def test_vector_store_variants_match_exact(
+    tmp_path: Path,
+    stub_doc: Doc,
+    vector_store_cls: type[NumpyVectorStore],
+    kwargs: dict[str, Any],
+) -> None:
+    rng = np.random.default_rng(seed=42)
+    *embeddings, query_embedding = rng.standard_normal((301, 64)).tolist()
+    embeddings[7] = [0.0] * 64  # Zero vectors should still score last
+    embedding_model = StubEmbeddingModel(embedding=query_embedding)
+    texts = [
+        Text(text=f"Sentence {i}.", name=f"sentence{i}", doc=stub_doc, embedding=e)
+        for i, e in enumerate(embeddings)
+    ]
+    if vector_store_cls is MemmapVectorStore:
+        kwargs = {**kwargs, "directory": tmp_path}
+    exact_index = NumpyVectorStore(mmr_lambda=0.5)
+    index = vector_store_cls(mmr_lambda=0.5, **kwargs)
+    for store in (exact_index, index):
+        for batch in (texts[:100], texts[100:]):
+            await store.add_texts_and_embeddings(batch)
+    if quantization := kwargs.get("quantization"):
+        assert index._embeddings_matrix is None, "Raw embeddings shouldn't stay"
+        assert cast(np.ndarray, index._normalized_matrix).dtype == quantization
+
+    # Shortlists are re-scored exactly, so results match with exact scores
+    for search in (
+        partial(NumpyVectorStore.similarity_search, query="query", k=300),
+        partial(
+            NumpyVectorStore.max_marginal_relevance_search,
+            query="query",
+            k=5,
+            fetch_k=20,
+        ),
+        partial(
+            NumpyVectorStore.partitioned_similarity_search,
+            query="query",
+            k=20,
+            partitioning_fn=lambda t: (
+                int(cast("Text", t).name.removeprefix("sentence")) % 3
+            ),
+        ),
+    ):
+        expected_texts, expected_scores = await search(
+            exact_index, embedding_model=embedding_model
+        )
+        actual_texts, actual_scores = await search(
+            index, embedding_model=embedding_model
+        )
+        assert actual_texts == expected_texts
+        assert actual_scores == pytest.approx(expected_scores, abs=1e-6)
+        assert all(isinstance(s, float) for s in actual_scores)
+    (*_, last_text), _ = await index.similarity_search("query", 300, embedding_model)
+    assert last_text == texts[7]
+
+
+@pytest.mark.asyncio
+async def test_memmap_vector_store(tmp_path: Path, stub_doc: Doc) -> None:
+    # Unit norm since MMR on NumpyVectorStore uses the texts' embeddings as is
+    *embeddings, query_embedding = normalize_rows(
+        np.random.default_rng(seed=42).standard_normal((51, 8))
+    ).tolist()
+    embedding_model = StubEmbeddingModel(embedding=query_embedding)
+
+    def make_texts() -> list[Text]:
+        return [
+            Text(text=f"Sentence {i}.", name=f"sentence{i}", doc=stub_doc, embedding=e)
+            for i, e in enumerate(embeddings)
+        ]
+
+    numpy_index = NumpyVectorStore(mmr_lambda=0.5)
+    await numpy_index.add_texts_and_embeddings(make_texts())
+    memmap_index = MemmapVectorStore(
+        directory=tmp_path / "index", release_embeddings=True, mmr_lambda=0.5
+    )
+    texts = make_texts()
+    for batch in (texts[:20], texts[20:30]):  # Second batch grows the file
+        await memmap_index.add_texts_and_embeddings(batch)
+    assert all(t.embedding is None for t in texts[:30])
+    assert (tmp_path / "index" / "chunk_ids.txt").read_text().splitlines() == [
+        f"sentence{i}" for i in range(30)
+    ]
+
+    async def assert_matches_numpy(index: MemmapVectorStore) -> None:
+        expected_texts, expected_scores = (
+            await numpy_index.max_marginal_relevance_search(
+                "query", 5, 10, embedding_model
+            )
+        )
+        actual_texts, actual_scores = await index.max_marginal_relevance_search(
+            "query", 5, 10, embedding_model
+        )
+        assert actual_texts == expected_texts
+        assert actual_scores == pytest.approx(expected_scores, abs=1e-6)
+
+    await memmap_index.add_texts_and_embeddings(texts[30:])
+    await assert_matches_numpy(memmap_index)
+
+    # Pickling leaves out the embeddings, which get lazily mapped read-only
+    loaded = pickle.loads(pickle.dumps(memmap_index))
+    assert loaded._normalized_matrix is None
+    assert texts[0] in loaded
+    await assert_matches_numpy(loaded)
+    assert isinstance(loaded._get_matrix(), np.memmap)
+    assert loaded == memmap_index
+
+    # Loaded stores can still be added to
+    extra_text = Text(
+        text="Extra.", name="extra", doc=stub_doc, embedding=embeddings[0]
+    )
+    await loaded.add_texts_and_embeddings([extra_text])
+    assert len(loaded) == 51
+    assert extra_text.embedding is None
+    np.testing.assert_allclose(
+        loaded._get_matrix(),
+        normalize_rows(np.array([*embeddings, embeddings[0]])),
+        atol=1e-6,
+    )
+
+    # Mutating texts directly should rebuild from the released embeddings' rows
+    loaded.texts = loaded.texts[:40]
+    await loaded.add_texts_and_embeddings(
+        [Text(text="New.", name="new", doc=stub_doc, embedding=embeddings[1])]
+    )
+    assert len(loaded.texts) == 41
+    assert all(t.embedding is None for t in loaded.texts)
+    np.testing.assert_allclose(
+        loaded._get_matrix(),
+        normalize_rows(np.array([*embeddings[:40], embeddings[1]])),
+        atol=1e-6,
+    )
+    loaded.texts = [*loaded.texts[:5], Text(text="?", name="?", doc=stub_doc)]
+    with pytest.raises(ValueError, match="released embedding"):
+        await loaded.add_texts_and_embeddings([extra_text])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "vector_store_cls", [NumpyVectorStore, IVFVectorStore, MemmapVectorStore]
+)
+async def test_vector_store_remove_texts(
+    tmp_path: Path, stub_doc: Doc, vector_store_cls: type[NumpyVectorStore]
+) -> None:
+    *embeddings, query_embedding = normalize_rows(
+        np.random.default_rng(seed=42).standard_normal((41, 8))
+    ).tolist()
+    embedding_model = StubEmbeddingModel(embedding=query_embedding)
+    texts = [
+        Text(text=f"Sentence {i}.", name=f"sentence{i}", doc=stub_doc, embedding=e)
+        for i, e in enumerate(embeddings)
+    ]
+    kwargs: dict[str, Any] = {"compaction_threshold": 0.5}
+    if vector_store_cls is MemmapVectorStore:
+        kwargs["directory"] = tmp_path
+    elif vector_store_cls is IVFVectorStore:
+        kwargs.update(min_train_size=10, n_probe=100)
+    index = vector_store_cls(**kwargs)
+    await index.add_texts_and_embeddings(texts)
+    all_matches, _ = await index.similarity_search("query", 40, embedding_model)
+
+    async def assert_removed(removed: list[Embeddable]) -> None:
+        assert len(index) == len(texts) - len(removed)
+        assert not any(t in index for t in removed)
+        matches, scores = await index.similarity_search("query", 10, embedding_model)
+        assert matches == [t for t in all_matches if t not in removed][:10]
+        assert scores == sorted(scores, reverse=True)
+        partitioned_matches, _ = await index.partitioned_similarity_search(
+            "query", 40, embedding_model, lambda t: int(cast("Text", t).name[-1]) % 2
+        )
+        assert len(partitioned_matches) == len(texts) - len(removed)
+        assert not set(partitioned_matches) & set(removed)
+
+    # Below the compaction threshold, rows are masked
+    removed = list(all_matches[:10])
+    index.remove_texts(removed)
+    index.remove_texts(removed)  # Removing twice is a no-op
+    assert index._num_removed == 10
+    assert len(index.texts) == len(texts)
+    await assert_removed(removed)
+
+    # Beyond the compaction threshold, rows are dropped
+    removed += all_matches[10:25]
+    index.remove_texts(all_matches[10:25])
+    assert index._num_removed == 0
+    assert index.texts == [t for t in texts if t not in removed]
+    await assert_removed(removed)
+    if isinstance(index, MemmapVectorStore):
+        assert (tmp_path / "chunk_ids.txt").read_text().splitlines() == [
+            cast("Text", t).name for t in index.texts
+        ]
+        loaded = pickle.loads(pickle.dumps(index))
+        assert loaded == index
+
+    # Removed texts can be added back
+    await index.add_texts_and_embeddings(removed)
+    await assert_removed([])
+
+
+_REMOVE_AFTER_UNPICKLE_SCRIPT = """
+import asyncio, pickle, sys
+from paperqa import Doc, NumpyVectorStore, SparseEmbeddingModel, Text
+from paperqa.llms import IVFVectorStore
+
+async def main(mode, path, cls_name):
+    model = SparseEmbeddingModel(ndim=8)
+    if mode == "dump":
+        doc = Doc(docname="stub", citation="stub", dockey="stub")
+        texts = [Text(text=f"Sentence {i}.", name=str(i), doc=doc) for i in range(3)]
+        for t, e in zip(texts, await model.embed_documents([t.text for t in texts])):
+            t.embedding = e
+        store = {"NumpyVectorStore": NumpyVectorStore, "IVFVectorStore": IVFVectorStore}[
+            cls_name
+        ]()
+        await store.add_texts_and_embeddings(texts)
+        with open(path, "wb") as f:
+            pickle.dump(store, f)
+        return
+    with open(path, "rb") as f:
+        store = pickle.load(f)
+    assert all(t in store for t in store.texts)
+    store.remove_texts(list(store.texts))
+    matches, _ = await store.similarity_search("Sentence", 3, model)
+    print(len(store), len(matches))
+
+asyncio.run(main(*sys.argv[1:]))
+"""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("vector_store_cls", [NumpyVectorStore, IVFVectorStore])
+async def test_vector_store_remove_texts_after_unpickling_elsewhere(
+    tmp_path: Path, vector_store_cls: type[NumpyVectorStore]
+) -> None:
+    # str hashes are salted per process, so pickle and load under different seeds
+    path = tmp_path / "store.pkl"
+    for seed, mode in ((1, "dump"), (2, "load")):
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            _REMOVE_AFTER_UNPICKLE_SCRIPT,
+            mode,
+            str(path),
+            vector_store_cls.__name__,
+            stdout=asyncio.subprocess.PIPE,
+            env={**os.environ, "PYTHONHASHSEED": str(seed)},
+        )
+        stdout, _ = await process.communicate()
+        assert process.returncode == 0
+    assert stdout.decode().split() == ["0", "0"]
+
+
 # some of the stored requests will be identical on
 # method, scheme, host, port, path, and query (if defined)
 # body will always be different between requests
@@ -1996,6 +3075,517 @@ async def test_image_aggregation(stub_data_dir: Path) -> None:
     ), "Expected tables to be hashed differently"
 
 
+@pytest.mark.asyncio
+async def test_parsed_text_cache(stub_data_dir: Path, tmp_path: Path) -> None:
+    parse_calls: list[dict[str, Any]] = []
+
+    def counting_parse_pdf(
+        path: str | os.PathLike,
+        page_size_limit: int | None = None,
+        page_range: int | tuple[int, int] | None = None,
+        **kwargs,
+    ) -> ParsedText:
+        parse_calls.append(kwargs)
+        return pymupdf_parse_pdf_to_pages(
+            path, page_size_limit=page_size_limit, page_range=page_range, **kwargs
+        )
+
+    settings = ParsingSettings(parsed_text_cache_path=tmp_path / "parsed.db")
+    doc = Doc(docname="foo", citation="Foo et al, 2002", dockey="1")
+    read_kwargs: dict[str, Any] = {
+        "parse_pdf": counting_parse_pdf,
+        "parsed_text_cache": settings.get_parsed_text_cache(),
+    }
+    path = stub_data_dir / "paper.pdf"
+
+    large_chunks = await read_doc(
+        path, doc, chunk_chars=3000, overlap=100, **read_kwargs
+    )
+    small_chunks = await read_doc(
+        path, doc, chunk_chars=1000, overlap=100, **read_kwargs
+    )
+    assert len(parse_calls) == 1, "Re-chunking shouldn't reparse"
+    assert len(small_chunks) > len(large_chunks)
+
+    # Peeking text-only pages is derived from the full parsing
+    peek = await read_doc(
+        path,
+        doc,
+        parsed_text_only=True,
+        page_range=(1, 3),
+        parse_media=False,
+        **read_kwargs,
+    )
+    assert len(parse_calls) == 1, "Peeking should reuse the full parsing"
+    expected_peek = pymupdf_parse_pdf_to_pages(
+        stub_data_dir / "paper.pdf", page_range=(1, 3), parse_media=False
+    )
+    assert peek.content == expected_peek.content
+    assert (
+        peek.metadata.total_parsed_text_length
+        == expected_peek.metadata.total_parsed_text_length
+    )
+    assert peek.metadata.count_parsed_media == 0
+
+    # Another parser configuration misses, and a new cache reads the same file
+    await read_doc(path, doc, use_block_parsing=True, **read_kwargs)
+    assert len(parse_calls) == 2
+    read_kwargs["parsed_text_cache"] = settings.get_parsed_text_cache()
+    await read_doc(path, doc, use_block_parsing=True, **read_kwargs)
+    assert len(parse_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_aadd_parses_once(stub_data_dir: Path) -> None:
+    parse_calls: list[dict[str, Any]] = []
+
+    def counting_parse_pdf(path, **kwargs) -> ParsedText:
+        parse_calls.append(kwargs)
+        return pymupdf_parse_pdf_to_pages(path, **kwargs)
+
+    settings = Settings(
+        parsing=ParsingSettings(
+            parse_pdf=counting_parse_pdf,
+            use_doc_details=False,
+            defer_embedding=True,
+            multimodal=False,
+        )
+    )
+    docs = Docs()
+    with patch.object(
+        LiteLLMModel,
+        "call_single",
+        autospec=True,
+        return_value=LLMResult(model="stub", text="Wellawatte et al, XAI Review, 2023"),
+    ) as mock_call_single:
+        await docs.aadd(stub_data_dir / "paper.pdf", settings=settings)
+    assert len(parse_calls) == 1, "Citation inference should reuse the parsing"
+    assert "page_range" not in parse_calls[0]
+    mock_call_single.assert_awaited_once()
+    (message,) = mock_call_single.call_args.kwargs["messages"]
+    assert docs.texts[0].text[:100] in message.content, "Expected the first chunk"
+    assert next(iter(docs.docs.values())).citation.startswith("Wellawatte")
+
+
+@pytest.mark.asyncio
+async def test_citation_cache(stub_data_dir: Path, tmp_path: Path) -> None:
+    settings = Settings(
+        parsing=ParsingSettings(
+            citation_cache_path=tmp_path / "citations.db",
+            defer_embedding=True,
+            multimodal=False,
+        )
+    )
+
+    async def call_single(self, messages, **_) -> LLMResult:  # noqa: ARG001, RUF029
+        # No title or DOI in the structured citation, to skip metadata lookups
+        return LLMResult(
+            model="stub",
+            text=(
+                "{}"
+                if "JSON" in messages[0].content
+                else "Wellawatte et al, XAI Review, 2023"
+            ),
+        )
+
+    with patch.object(
+        LiteLLMModel, "call_single", autospec=True, side_effect=call_single
+    ) as mock_call_single:
+        for _ in range(2):
+            docs = Docs()
+            await docs.aadd(stub_data_dir / "paper.pdf", settings=settings)
+            assert next(iter(docs.docs.values())).citation.startswith("Wellawatte")
+    assert (
+        mock_call_single.await_count == 2
+    ), "Re-adding the document shouldn't call the LLM for its citation"
+
+
+@pytest.mark.asyncio
+async def test_aadd_many(stub_data_dir: Path, tmp_path: Path) -> None:
+    settings = Settings(
+        parsing=ParsingSettings(
+            use_doc_details=False, defer_embedding=True, multimodal=False
+        )
+    )
+    (tmp_path / "paper_copy.pdf").write_bytes(
+        (stub_data_dir / "paper.pdf").read_bytes()
+    )
+    paths = [
+        stub_data_dir / "paper.pdf",
+        stub_data_dir / "pasa.pdf",
+        tmp_path / "missing.pdf",
+        tmp_path / "paper_copy.pdf",
+        stub_data_dir / "duplicate_media.pdf",
+    ]
+
+    in_flight = max_in_flight = 0
+
+    async def call_single(*_, **__) -> LLMResult:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return LLMResult(model="stub", text="Stub et al, Stub Journal, 2024")
+
+    docs = Docs()
+    with patch.object(
+        LiteLLMModel, "call_single", autospec=True, side_effect=call_single
+    ) as mock_call_single:
+        results = await docs.aadd_many(
+            paths, concurrency=3, llm_concurrency=1, settings=settings
+        )
+    assert len(results) == len(paths), "Expected a result per path, in order"
+    assert isinstance(results[2], FileNotFoundError)
+    assert all(isinstance(results[i], str) for i in (0, 1, 4))
+    assert results[3] is None, "Duplicate contents should only be added once"
+    assert len(docs.docs) == 3
+    assert (
+        mock_call_single.await_count == 3
+    ), "Duplicate contents shouldn't be cited, even when added concurrently"
+    assert max_in_flight == 1, "Expected the LLM concurrency limit to be respected"
+
+    # Contents already present are skipped without parsing or citing
+    with patch.object(LiteLLMModel, "call_single", autospec=True) as mock_call_single:
+        assert await docs.aadd_many(paths[3:4], settings=settings) == [None]
+    mock_call_single.assert_not_awaited()
+    assert {d.docname for d in docs.docs.values()} == {
+        r for r in results if isinstance(r, str)
+    }
+
+    # Streamed documents release the parse limit before their embedding finishes,
+    # so another document's parsing can proceed meanwhile
+    (tmp_path / "other.txt").write_text(
+        "Other text about the synthesis of many catalysts. " * 500
+    )
+    embedding_docs: set[str] = set()
+    both_embedding = asyncio.Event()
+
+    async def wait_for_both_embedding(texts: list[str]) -> None:
+        embedding_docs.add("other" if "catalysts" in texts[0] else "bates")
+        if len(embedding_docs) == 2:
+            both_embedding.set()
+        await asyncio.wait_for(both_embedding.wait(), timeout=10)
+
+    settings.parsing.defer_embedding = False
+    with patch.object(
+        LiteLLMModel, "call_single", autospec=True, side_effect=call_single
+    ):
+        results = await Docs().aadd_many(
+            [stub_data_dir / "bates.txt", tmp_path / "other.txt"],
+            settings=settings,
+            embedding_model=StubEmbeddingModel(on_embed=wait_for_both_embedding),
+        )
+    assert all(isinstance(r, str) for r in results)
+
+
+def _mark_parser_configured() -> None:
+    os.environ["PQA_TEST_PARSER_CONFIGURED"] = "true"
+
+
+def _parse_configuration(crashes_dir: str | os.PathLike) -> ParsedText:
+    """Parse to whether the worker ran its initializer, first crashing once per file."""
+    if crashes := list(Path(crashes_dir).iterdir()):
+        crashes[0].unlink()
+        os._exit(1)  # Like a segfault in a native parser
+    return ParsedText(
+        content=os.environ.get("PQA_TEST_PARSER_CONFIGURED", "false"),
+        metadata=ParsedMetadata(parsing_libraries=[], total_parsed_text_length=0),
+    )
+
+
+@pytest.mark.asyncio
+async def test_parse_workers(stub_data_dir: Path) -> None:
+    assert ParsingSettings().get_parse_executor() is None
+    settings = ParsingSettings(parse_workers=2)
+    executor = settings.get_parse_executor()
+    assert isinstance(executor, ProcessPoolExecutor)
+    assert executor is settings.get_parse_executor(), "Expected a shared pool"
+
+    doc = Doc(docname="stub", citation="stub", dockey="stub")
+    for filename in ("paper.pdf", "bates.txt", "flag_day.html"):
+        path = stub_data_dir / filename
+        expected, parsed = await asyncio.gather(
+            read_doc(
+                path, doc, parsed_text_only=True, parse_pdf=pymupdf_parse_pdf_to_pages
+            ),
+            read_doc(
+                path,
+                doc,
+                parsed_text_only=True,
+                parse_pdf=pymupdf_parse_pdf_to_pages,
+                parse_executor=executor,
+            ),
+        )
+        assert parsed.content == expected.content
+        assert parsed.metadata == expected.metadata
+
+
+@pytest.mark.asyncio
+async def test_parse_workers_recover(tmp_path: Path) -> None:
+    settings = ParsingSettings(
+        parse_workers=1, configure_pdf_parser=_mark_parser_configured
+    )
+    executor = cast(ProcessPoolExecutor, settings.get_parse_executor())
+    parsed = await _run_parser(executor, _parse_configuration, tmp_path)
+    assert parsed.content == "true", "Expected the initializer to run in the worker"
+
+    # A crashed worker breaks the pool, which gets replaced and the parsing retried
+    (tmp_path / "crash").touch()
+    parsed = await _run_parser(executor, _parse_configuration, tmp_path)
+    assert parsed.content == "true"
+    assert not os.listdir(tmp_path), "Expected the crashing parsing to have run"
+    replacement = settings.get_parse_executor()
+    assert replacement is not executor
+
+    # Crashing again upon the retry raises, still leaving a working pool behind
+    for i in range(2):
+        (tmp_path / f"crash{i}").touch()
+    with pytest.raises(BrokenProcessPool):
+        await _run_parser(replacement, _parse_configuration, tmp_path)
+    assert settings.get_parse_executor() is not replacement
+    parsed = await _run_parser(
+        settings.get_parse_executor(), _parse_configuration, tmp_path
+    )
+    assert parsed.content == "true"
+
+
+@pytest.mark.asyncio
+async def test_read_doc_stream(stub_data_dir: Path) -> None:
+    path = stub_data_dir / "pasa.pdf"
+    doc = Doc(docname="stub", citation="stub", dockey="stub")
+    parsed_pages: list[str] = []
+
+    def counting_iter_pdf_pages(
+        path: str | os.PathLike,
+        page_size_limit: int | None = None,
+        page_range: int | tuple[int, int] | None = None,
+        **kwargs,
+    ) -> Iterator[tuple[str, str | tuple[str, list[ParsedMedia]]]]:
+        for page_num, page_contents in pymupdf_iter_pdf_pages(
+            path, page_size_limit=page_size_limit, page_range=page_range, **kwargs
+        ):
+            parsed_pages.append(page_num)
+            yield page_num, page_contents
+
+    streamed: list[Text] = []
+    async for text in read_doc_stream(
+        path,
+        doc,
+        chunk_chars=3000,
+        overlap=100,
+        iter_pdf_pages=counting_iter_pdf_pages,
+    ):
+        if not streamed:
+            assert len(parsed_pages) <= 2, "Expected a chunk before parsing finished"
+        streamed.append(text)
+    assert len(parsed_pages) > 2
+
+    texts = await read_doc(
+        path,
+        doc,
+        chunk_chars=3000,
+        overlap=100,
+        parse_pdf=pymupdf_parse_pdf_to_pages,
+    )
+    assert [(t.text, t.name, t.media) for t in streamed] == [
+        (t.text, t.name, t.media) for t in texts
+    ], "Streamed chunks should match read_doc's chunks"
+
+
+@pytest.mark.asyncio
+async def test_aadd_stream_pdf_pages(
+    stub_data_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = stub_data_dir / "pasa.pdf"
+    parsed_pages: list[str] = []
+
+    def counting_iter_pdf_pages(
+        path: str | os.PathLike,
+        page_size_limit: int | None = None,
+        page_range: int | tuple[int, int] | None = None,
+        **kwargs,
+    ) -> Iterator[tuple[str, str | tuple[str, list[ParsedMedia]]]]:
+        for page_num, page_contents in pymupdf_iter_pdf_pages(
+            path, page_size_limit=page_size_limit, page_range=page_range, **kwargs
+        ):
+            parsed_pages.append(page_num)
+            yield page_num, page_contents
+
+    pages_parsed_per_call: list[int] = []
+
+    async def count_pages_parsed(_: list[str]) -> None:  # noqa: RUF029
+        pages_parsed_per_call.append(len(parsed_pages))
+
+    async def call_single(*_, **__) -> LLMResult:  # noqa: RUF029
+        assert len(parsed_pages) <= 2, "Peeking should parse only the first pages"
+        return LLMResult(model="stub", text="Stub et al, Stub Journal, 2024")
+
+    monkeypatch.setattr("paperqa.docs.STREAM_EMBEDDING_BATCH_SIZE", 2)
+    settings = Settings(
+        parsing=ParsingSettings(
+            use_doc_details=False,
+            multimodal=MultimodalOptions.ON_WITHOUT_ENRICHMENT,
+            stream_pdf_pages=True,
+            iter_pdf_pages=counting_iter_pdf_pages,
+            parse_pdf=pymupdf_parse_pdf_to_pages,
+            reader_config={"chunk_chars": 3000, "overlap": 100},
+        )
+    )
+    streamed_docs = Docs()
+    with patch.object(
+        LiteLLMModel, "call_single", autospec=True, side_effect=call_single
+    ):
+        assert await streamed_docs.aadd(
+            path,
+            settings=settings,
+            embedding_model=StubEmbeddingModel(on_embed=count_pages_parsed),
+        )
+    assert len(pages_parsed_per_call) > 1
+    assert (
+        pages_parsed_per_call[0] < 15
+    ), "Expected embedding to start before parsing finished"
+
+    settings.parsing.stream_pdf_pages = False
+    docs = Docs()
+    await docs.aadd(
+        path,
+        citation="Stub et al, Stub Journal, 2024",
+        settings=settings,
+        embedding_model=StubEmbeddingModel(),
+    )
+    assert [(t.text, t.media, t.embedding) for t in streamed_docs.texts] == [
+        (t.text, t.media, t.embedding) for t in docs.texts
+    ], "Streamed chunks should match those of parsing whole"
+
+
+def test_parse_text_page_size_limit(tmp_path: Path) -> None:
+    path = tmp_path / "stub.py"
+    path.write_text("short line\n" * 30)
+    # Each line is a page, so many short lines are within the limit
+    parsed = parse_text(path, split_lines=True, page_size_limit=20)
+    assert isinstance(parsed.content, list)
+    assert len(parsed.content) == 30
+
+    path.write_text("short line\n" + "x" * 30 + "\n")
+    with pytest.raises(ImpossibleParsingError, match="page 1 of 2 was 31 chars"):
+        parse_text(path, split_lines=True, page_size_limit=20)
+
+
+@pytest.mark.asyncio
+async def test_read_doc_stream_text(tmp_path: Path) -> None:
+    doc = Doc(docname="stub", citation="stub", dockey="stub")
+    lines = [f"def f{i}(x):  # Résumé 🙂\n    return x * {i}\n" for i in range(2000)]
+    content = "".join(lines)
+    for filename in ("stub.py", "stub.txt"):
+        path = tmp_path / filename
+        # Undecodable bytes should be dropped in one pass, keeping split lines
+        path.write_bytes(content.encode() + b"\xff\xfeend\n")
+        parsed = parse_text(path, split_lines=True)
+        assert isinstance(parsed.content, list)
+        assert parsed.content[-1] == "end\n"
+
+        streamed = [
+            t async for t in read_doc_stream(path, doc, chunk_chars=1000, overlap=50)
+        ]
+        with patch("paperqa.readers.parse_text", side_effect=AssertionError):
+            texts, metadata = await read_doc(
+                path, doc, chunk_chars=1000, overlap=50, include_metadata=True
+            )
+        assert [(t.text, t.name) for t in streamed] == [
+            (t.text, t.name) for t in texts
+        ], "Streamed chunks should match read_doc's chunks"
+        whole_text_chunks = (
+            chunk_text(parse_text(path), doc, chunk_chars=1000, overlap=50)
+            if filename.endswith(".txt")
+            else chunk_code_text(parsed, doc, chunk_chars=1000, overlap=50)
+        )
+        assert [(t.text, t.name) for t in texts] == [
+            (t.text, t.name) for t in whole_text_chunks
+        ], "Chunks of text read as a stream should match those of the whole text"
+        assert (
+            metadata.total_parsed_text_length
+            == parsed.metadata.total_parsed_text_length
+        )
+        assert metadata.name == f"txt|split-lines={filename.endswith('.py')}"
+
+        if filename.endswith(".py"):
+            # Lines beyond the page size limit are rejected, as when parsed whole
+            with pytest.raises(ImpossibleParsingError, match="char limit"):
+                parse_text(path, split_lines=True, page_size_limit=20)
+            with pytest.raises(ImpossibleParsingError, match="char limit"):
+                await read_doc(
+                    path, doc, chunk_chars=1000, overlap=50, page_size_limit=20
+                )
+
+    # Text spanning many windows should still be chunked with overlap
+    windowed = list(
+        iter_chunk_text(
+            iter_text_blocks(tmp_path / "stub.txt", block_chars=3000),
+            doc,
+            chunk_chars=1000,
+            overlap=50,
+            window_chars=10_000,
+        )
+    )
+    assert abs(len(windowed) - len(texts)) <= 1
+    full_text = content + "end\n"
+    assert full_text.startswith(windowed[0].text)
+    assert full_text.endswith(windowed[-1].text)
+    for previous, text in itertools.pairwise(windowed):
+        assert text.text in full_text
+        assert previous.text[-25:] in text.text, "Expected overlapping chunks"
+
+
+@pytest.mark.asyncio
+async def test_aadd_text_streams(stub_data_dir: Path, tmp_path: Path) -> None:
+    settings = Settings(
+        parsing=ParsingSettings(use_doc_details=False, defer_embedding=True)
+    )
+    docs = Docs()
+    with (
+        patch("paperqa.readers.parse_text", side_effect=AssertionError),
+        patch.object(
+            LiteLLMModel,
+            "call_single",
+            autospec=True,
+            return_value=LLMResult(model="stub", text="Bates et al, 2024"),
+        ) as mock_call_single,
+    ):
+        assert await docs.aadd(stub_data_dir / "bates.txt", settings=settings)
+    mock_call_single.assert_awaited_once()
+    expected = await read_doc(
+        stub_data_dir / "bates.txt",
+        next(iter(docs.docs.values())),
+        **settings.parsing.reader_config,
+    )
+    assert [t.text for t in docs.texts] == [t.text for t in expected]
+
+    # Neither an already added nor a non-text document should be embedded
+    embedding_model = StubEmbeddingModel()
+    settings.parsing.defer_embedding = False
+    (tmp_path / "repeated.txt").write_text("a\n" * 50_000)
+    with patch.object(
+        LiteLLMModel,
+        "call_single",
+        autospec=True,
+        return_value=LLMResult(model="stub", text="Bates et al, 2024"),
+    ):
+        assert not await docs.aadd(
+            stub_data_dir / "bates.txt",
+            settings=settings,
+            embedding_model=embedding_model,
+        )
+        with pytest.raises(ValueError, match="does not look like a text document"):
+            await docs.aadd(
+                tmp_path / "repeated.txt",
+                citation="Repeated, 2024",
+                settings=settings,
+                embedding_model=embedding_model,
+            )
+    assert not embedding_model.embedded
+
+
 @pytest.mark.asyncio
 async def test_read_doc_images_metadata(stub_data_dir: Path) -> None:
     png_path = stub_data_dir / "sf_districts.png"
@@ -2560,7 +4150,7 @@ async def test_equations(stub_data_dir: Path, parser: PDFParserFn) -> None:
     )
 
 
-def test_missing_page_doesnt_crash_us() -> None:
+def test_missing_page_doesnt_crash_us(stub_doc: Doc) -> None:
     stub_parsed_text = ParsedText(
         content={
             "1": "A",
@@ -2569,13 +4159,47 @@ def test_missing_page_doesnt_crash_us() -> None:
         },
         metadata=ParsedMetadata(parsing_libraries=["stub"], total_parsed_text_length=2),
     )
-    stub_doc = Doc(docname="stub", citation="stub", dockey="stub")
     (text,) = chunk_pdf(stub_parsed_text, stub_doc, chunk_chars=100, overlap=5)
     assert text.doc == stub_doc
     assert "1-3" in text.name
     assert text.text == "AC"
 
 
+def test_chunk_pdf_overlap_and_page_ranges(stub_doc: Doc) -> None:
+    stub_parsed_text = ParsedText(
+        content={"1": "abcdefghij", "2": "klm", "3": "nopqrstuvwxyz"},
+        metadata=ParsedMetadata(
+            parsing_libraries=["stub"], total_parsed_text_length=26
+        ),
+    )
+    texts = chunk_pdf(stub_parsed_text, stub_doc, chunk_chars=8, overlap=2)
+    assert [t.text for t in texts] == ["abcdefgh", "ghijklmn", "mnopqrst", "stuvwxyz"]
+    assert [t.name.split()[-1] for t in texts] == ["1-1", "1-3", "3-3", "3-3"]
+
+
+def test_chunk_text_slices_whole_characters(stub_doc: Doc) -> None:
+    content = "Résumé of 日本語 text 🙂.\n" * 200
+    stub_parsed_text = ParsedText(
+        content=content,
+        metadata=ParsedMetadata(
+            parsing_libraries=["stub"], total_parsed_text_length=len(content)
+        ),
+    )
+    texts = chunk_text(stub_parsed_text, stub_doc, chunk_chars=100, overlap=10)
+    assert len(texts) > 2, "Expected multiple chunks, for meaningful assertions"
+    assert all(t.text in content for t in texts), "Expected slices of the content"
+    assert not any("\N{REPLACEMENT CHARACTER}" in t.text for t in texts)
+    assert content.startswith(texts[0].text)
+    assert content.endswith(texts[-1].text)
+
+    # Tokenizing in pieces across threads should give the same chunks
+    with patch("paperqa.readers.MIN_TOKENIZATION_PIECE_CHARS", 1000):
+        threaded_texts = chunk_text(
+            stub_parsed_text, stub_doc, chunk_chars=100, overlap=10, num_workers=2
+        )
+    assert [t.text for t in threaded_texts] == [t.text for t in texts]
+
+
 def test_zotero() -> None:
     from paperqa.contrib import ZoteroDB
 